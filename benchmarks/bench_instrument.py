@@ -0,0 +1,83 @@
+"""Cost of the instrumentation hooks, recording and not.
+
+Times a serial scan of a generated tree with instrument disabled and
+enabled (best of a few rounds), and the per-call cost of the hooks on
+their own: span(), count() and the active() check used in hot loops.
+
+    python benchmarks/bench_instrument.py --files 100000
+"""
+import os
+import sys
+import time
+import shutil
+import timeit
+import argparse
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import instrument
+from core.rules import compile_rules, scan_rules
+from core.session import ScanSession
+
+
+def build_tree(root, count, per_dir=500):
+    for i in range(count):
+        folder = os.path.join(root, f'd{i // per_dir}')
+        if i % per_dir == 0:
+            os.makedirs(folder, exist_ok=True)
+        open(os.path.join(folder, f'f{i}.tmp'), 'wb').close()
+
+
+def best_scan(root, rounds):
+    rules = compile_rules([{'category': 'Bench', 'roots': ['%BENCH_ROOT%'], 'globs': ['*.tmp']}])
+    session = ScanSession({'BENCH_ROOT': root}, admin=False)
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        scan_rules(rules, session)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def hook_costs(number):
+    def _span():
+        with instrument.span('x', 'Bench'):
+            pass
+    return {
+        'span': timeit.timeit(_span, number=number) / number,
+        'count': timeit.timeit(lambda: instrument.count('x', 1, 'Bench'), number=number) / number,
+        'active': timeit.timeit(instrument.active, number=number) / number,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=100_000)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--calls', type=int, default=200_000)
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix='bench_instrument_')
+    try:
+        build_tree(work, args.files)
+        instrument.disable()
+        # Warm the directory cache so neither mode pays for the first listing
+        best_scan(work, 1)
+        off = best_scan(work, args.rounds)
+        off_hooks = hook_costs(args.calls)
+        instrument.enable()
+        on = best_scan(work, args.rounds)
+        on_hooks = hook_costs(args.calls)
+        instrument.disable()
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    print(f"scan of {args.files} files: disabled {off * 1000:.0f} ms, recording {on * 1000:.0f} ms "
+          f"({(on / off - 1) * 100:+.1f}%)")
+    for name in off_hooks:
+        print(f"{name + '()':<10} disabled {off_hooks[name] * 1e9:>6.0f} ns, recording {on_hooks[name] * 1e9:>6.0f} ns")
+
+
+if __name__ == '__main__':
+    main()
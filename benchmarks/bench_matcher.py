@@ -0,0 +1,97 @@
+"""Per-entry cost of file name matching, before and after NameMatcher.
+
+Matches synthetic cache-like names against the rule shapes used by the
+built-in categories:
+
+    python benchmarks/bench_matcher.py --names 1000000
+
+"loop" is the original per-file `any(name.lower().endswith(ext) ...)`
+check plus the thumbnail predicate that lowercased each name twice;
+"regex" is one combined regex per rule; "matcher" is NameMatcher.
+"""
+import os
+import re
+import sys
+import time
+import random
+import fnmatch
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.rules import NameMatcher
+
+RULES = [
+    {'extensions': ['.log']},
+    {'extensions': ['.pf']},
+    {'extensions': ['.tmp', '.dmp', '.etl', '.bak', '.old', '.chk']},
+    {'prefixes': ['thumbcache_', 'iconcache_']},
+    {'extensions': ['.log', '.txt'], 'globs': ['report*.wer']},
+]
+
+
+def make_names(count, seed=42):
+    rng = random.Random(seed)
+    stems = ['f_000a1b', 'data_1', 'index', 'thumbcache_256', 'IconCache_32', 'Report.WER', 'CBS', 'setup']
+    exts = ['.tmp', '.LOG', '.pf', '.dat', '', '.db', '.etl', '.json', '.Old', '.wer']
+    return [f"{rng.choice(stems)}{i}{rng.choice(exts)}" for i in range(count)]
+
+
+def legacy_predicate(rule):
+    extensions = rule.get('extensions')
+    prefixes = [p.lower() for p in rule.get('prefixes') or ()]
+    globs = rule.get('globs') or ()
+
+    def _match(name):
+        if prefixes:
+            # The thumbnail predicate lowercased the name once per prefix
+            if any(name.lower().startswith(p) for p in prefixes):
+                return True
+        if globs and any(fnmatch.fnmatch(name.lower(), g) for g in globs):
+            return True
+        if extensions:
+            return any(name.lower().endswith(ext) for ext in extensions)
+        return not prefixes and not globs
+    return _match
+
+
+def regex_predicate(rule):
+    alternatives = ['.*' + re.escape(ext) + r'\Z' for ext in rule.get('extensions') or ()]
+    alternatives += [re.escape(p) + '.*' for p in rule.get('prefixes') or ()]
+    alternatives += [fnmatch.translate(g) for g in rule.get('globs') or ()]
+    pattern = re.compile('(?:' + '|'.join(alternatives) + ')', re.IGNORECASE | re.DOTALL)
+    return lambda name: pattern.match(name) is not None
+
+
+def matcher_predicate(rule):
+    return NameMatcher(rule.get('extensions'), rule.get('prefixes'), rule.get('globs')).match
+
+
+def run(names, predicates):
+    started = time.perf_counter()
+    hits = 0
+    for match in predicates:
+        for name in names:
+            if match(name):
+                hits += 1
+    return time.perf_counter() - started, hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--names', type=int, default=1000000)
+    args = parser.parse_args()
+    names = make_names(args.names)
+    checks = len(names) * len(RULES)
+
+    results = {}
+    for label, factory in (('loop', legacy_predicate), ('regex', regex_predicate), ('matcher', matcher_predicate)):
+        elapsed, hits = run(names, [factory(rule) for rule in RULES])
+        results[label] = hits
+        print(f"{label:>8}: {elapsed:6.2f}s  {elapsed / checks * 1e9:6.0f} ns/check  {hits} hits")
+    if len(set(results.values())) != 1:
+        print("warning: implementations disagree", results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Throughput of quarantine staging against send2trash and plain deletes.
+
+Creates a temp tree of small files for each mode and removes them the way
+Cleaner.clean_files does: a rename into a quarantine session, send2trash,
+or os.remove. Quarantine restore is timed too. send2trash is skipped when
+it is not installed; on Linux it moves files into the freedesktop trash,
+so empty the trash afterwards.
+
+    python benchmarks/bench_quarantine.py --files 2000 20000
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.quarantine import Quarantine
+
+
+def build_tree(root, count, per_dir=500):
+    paths = []
+    for i in range(count):
+        folder = os.path.join(root, f'd{i // per_dir}')
+        if i % per_dir == 0:
+            os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f'f{i}.tmp')
+        with open(path, 'wb') as f:
+            f.write(b'x' * 512)
+        paths.append(path)
+    return paths
+
+
+def run_quarantine(paths, work):
+    quarantine = Quarantine(os.path.join(work, 'quarantine'))
+    start = time.perf_counter()
+    with quarantine.begin() as session:
+        for path in paths:
+            session.stage(path, 'Bench')
+    staged = time.perf_counter() - start
+    start = time.perf_counter()
+    quarantine.restore(session.id)
+    return staged, time.perf_counter() - start
+
+
+def run_send2trash(paths, _work):
+    import send2trash
+    start = time.perf_counter()
+    for path in paths:
+        send2trash.send2trash(path)
+    return time.perf_counter() - start, None
+
+
+def run_remove(paths, _work):
+    start = time.perf_counter()
+    for path in paths:
+        os.remove(path)
+    return time.perf_counter() - start, None
+
+
+MODES = (('quarantine', run_quarantine), ('send2trash', run_send2trash), ('os.remove', run_remove))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, nargs='+', default=[2_000, 20_000])
+    parser.add_argument('--dir', default=None, help='Where to build the trees (default: a temp dir)')
+    args = parser.parse_args()
+
+    print(f"{'files':>8}  {'mode':<11} {'remove':>10} {'files/s':>10} {'restore':>10}")
+    for count in args.files:
+        for mode, run in MODES:
+            work = tempfile.mkdtemp(prefix='bench_quarantine_', dir=args.dir)
+            try:
+                paths = build_tree(os.path.join(work, 'tree'), count)
+                try:
+                    elapsed, restore = run(paths, work)
+                except ImportError as e:
+                    print(f"{count:>8}  {mode:<11} skipped ({e})")
+                    continue
+                restored = f"{restore * 1000:>7.1f} ms" if restore is not None else f"{'-':>10}"
+                print(f"{count:>8}  {mode:<11} {elapsed * 1000:>7.1f} ms {count / elapsed:>10.0f} {restored}")
+            finally:
+                shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
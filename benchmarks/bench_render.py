@@ -0,0 +1,116 @@
+"""CPU cost of the animated hero art and card shadows, rendered offscreen.
+
+Builds a window like the Cleaner view's top half (CatIllustration plus a
+few shadowed cards) on Qt's offscreen platform and reports:
+
+    * idle CPU: process CPU seconds per wall second while the window sits
+      shown, then hidden (the animation timer should stop);
+    * resize paints: average milliseconds per synchronous repaint while
+      the window is resized through a range of widths.
+
+    python benchmarks/bench_render.py --seconds 5 --shadow cached
+    python benchmarks/bench_render.py --seconds 5 --shadow live
+
+"live" uses QGraphicsDropShadowEffect as the views did before; "cached"
+uses the nine-slice CachedShadowEffect.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtCore import QEventLoop, QTimer
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import QApplication, QFrame, QGraphicsDropShadowEffect, QHBoxLayout, QVBoxLayout, QWidget
+
+from gui_qt.theme import get_stylesheet
+from gui_qt.widgets.illustrations import CatIllustration
+from gui_qt.widgets.shadows import apply_shadow
+
+
+def _shadow(widget, mode):
+    if mode == 'live':
+        effect = QGraphicsDropShadowEffect(widget)
+        effect.setBlurRadius(20)
+        effect.setOffset(0, 4)
+        effect.setColor(QColor(0, 0, 0, 8))
+        widget.setGraphicsEffect(effect)
+    elif mode == 'cached':
+        apply_shadow(widget)
+
+
+def build_window(shadow, cards):
+    window = QWidget()
+    layout = QVBoxLayout(window)
+    hero = QFrame()
+    hero.setObjectName("HeroCard")
+    hero_layout = QHBoxLayout(hero)
+    hero_layout.addWidget(CatIllustration())
+    hero_layout.addStretch(1)
+    _shadow(hero, shadow)
+    layout.addWidget(hero)
+    row = QHBoxLayout()
+    for _ in range(cards):
+        card = QFrame()
+        card.setObjectName("Card")
+        card.setMinimumSize(160, 120)
+        _shadow(card, shadow)
+        row.addWidget(card)
+    layout.addLayout(row)
+    return window
+
+
+def _spin(app, seconds):
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec()
+
+
+def idle_cpu(app, window, seconds):
+    start_cpu = time.process_time()
+    start = time.perf_counter()
+    _spin(app, seconds)
+    return (time.process_time() - start_cpu) / (time.perf_counter() - start)
+
+
+def resize_paint_ms(app, window, steps):
+    widths = [800 + (i % 40) * 10 for i in range(steps)]
+    start = time.perf_counter()
+    for width in widths:
+        window.resize(width, 500)
+        app.processEvents()
+        window.repaint()
+    return (time.perf_counter() - start) * 1000 / steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5.0, help='idle measurement length')
+    parser.add_argument('--resizes', type=int, default=200)
+    parser.add_argument('--cards', type=int, default=4)
+    parser.add_argument('--shadow', choices=('cached', 'live', 'none'), default='cached')
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    app.setStyleSheet(get_stylesheet())
+    window = build_window(args.shadow, args.cards)
+    window.resize(900, 500)
+    window.show()
+    _spin(app, 0.5)
+
+    shown = idle_cpu(app, window, args.seconds)
+    paint = resize_paint_ms(app, window, args.resizes)
+    window.hide()
+    hidden = idle_cpu(app, window, args.seconds)
+
+    print(f"shadow={args.shadow} cards={args.cards}")
+    print(f"  idle CPU shown  {shown * 100:6.2f}% of a core")
+    print(f"  idle CPU hidden {hidden * 100:6.2f}% of a core")
+    print(f"  resize paint    {paint:6.2f} ms per frame")
+
+
+if __name__ == '__main__':
+    main()
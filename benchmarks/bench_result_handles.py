@@ -0,0 +1,111 @@
+"""UI-thread stall when a scan hands its results to the GUI.
+
+A worker thread builds scan results of the given sizes and delivers them
+to the main thread the way ScanWorker did before (the dict through a
+`Signal(dict, int)`) and the way it does now (a ResultStore handle and a
+summary). A 1 ms heartbeat timer runs on the main thread; the longest
+gap between its ticks around delivery is the stall the user sees.
+
+    python benchmarks/bench_result_handles.py --items 10000 100000 1000000
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtCore import QCoreApplication, QEventLoop, QObject, QThread, QTimer, Signal
+
+from core.results import ResultStore, scan_summary
+
+
+def make_results(count):
+    per_cat = count // 4
+    results = {}
+    for cat in ('System Temp', 'Chrome Cache', 'Windows Logs', 'Thumbnail Cache'):
+        files = [f"C:\\Users\\me\\AppData\\Local\\{cat}\\f_{i:07d}.tmp" for i in range(per_cat)]
+        results[cat] = {
+            'files': files,
+            'items': [{'path': path, 'size': 4096} for path in files],
+            'size': 4096 * per_cat,
+            'skipped_recent': 0,
+            'skipped_recent_size': 0,
+        }
+    return results
+
+
+class DictWorker(QObject):
+    finished = Signal(dict, int)
+
+    def __init__(self, results):
+        super().__init__()
+        self.results = results
+
+    def run(self):
+        self.finished.emit(self.results, 0)
+
+
+class HandleWorker(QObject):
+    finished = Signal(int, object, int)
+
+    def __init__(self, results, store):
+        super().__init__()
+        self.results = results
+        self.store = store
+
+    def run(self):
+        handle = self.store.put(self.results)
+        self.finished.emit(handle, scan_summary(self.results), 0)
+
+
+def measure(worker):
+    """Returns (ms from thread start to slot, longest heartbeat gap in ms)."""
+    loop = QEventLoop()
+    ticks = []
+    heartbeat = QTimer()
+    heartbeat.setInterval(1)
+    heartbeat.timeout.connect(lambda: ticks.append(time.perf_counter()))
+    done = []
+
+    def _on_finished(*_args):
+        done.append(time.perf_counter())
+        # A few more ticks so a stall after the slot shows up too
+        QTimer.singleShot(50, loop.quit)
+
+    thread = QThread()
+    worker.moveToThread(thread)
+    thread.started.connect(worker.run)
+    worker.finished.connect(_on_finished)
+    worker.finished.connect(thread.quit)
+    heartbeat.start()
+    start = time.perf_counter()
+    ticks.append(start)
+    thread.start()
+    loop.exec()
+    heartbeat.stop()
+    thread.wait()
+    gaps = [b - a for a, b in zip(ticks, ticks[1:])]
+    return (done[0] - start) * 1000, max(gaps, default=0) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    store = ResultStore()
+    print(f"{'items':>10}  {'mode':<7} {'delivered':>12} {'max stall':>12}")
+    for count in args.items:
+        results = make_results(count)
+        for mode, worker in (('dict', DictWorker(results)), ('handle', HandleWorker(results, store))):
+            delivered, stall = measure(worker)
+            print(f"{count:>10}  {mode:<7} {delivered:>9.1f} ms {stall:>9.1f} ms")
+        del results
+    app.quit()
+
+
+if __name__ == '__main__':
+    main()
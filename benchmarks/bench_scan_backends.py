@@ -0,0 +1,80 @@
+"""Compares the serial, thread-pool and process-pool scan backends.
+
+Builds a synthetic cache tree (1M entries by default), warms the OS
+directory cache with one untimed pass, then times each backend over
+predicate-heavy rules that all share the tree's root:
+
+    python benchmarks/bench_scan_backends.py --entries 1000000 --workers 8
+
+The tree is kept between runs under --dir so only the first run pays for
+creating it.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.rules import compile_rules, scan_rules
+from core.session import ScanSession
+
+EXTENSIONS = ['.tmp', '.log', '.dmp', '.bak', '.old', '.etl', '.chk', '.gid', '.cache', '.dat']
+
+
+def build_tree(root, entries, per_dir=500):
+    marker = os.path.join(root, f'.entries-{entries}')
+    if os.path.exists(marker):
+        return
+    for i in range(entries):
+        folder = os.path.join(root, f'd{i // (per_dir * 20)}', f's{(i // per_dir) % 20}')
+        if i % per_dir == 0:
+            os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f'f{i}{EXTENSIONS[i % len(EXTENSIONS)]}'), 'wb'):
+            pass
+    open(marker, 'w').close()
+
+
+def make_rules(count):
+    rules = []
+    for i in range(count):
+        rules.append({
+            'category': f'Bench {i}',
+            'roots': ['%BENCH_ROOT%'],
+            'extensions': EXTENSIONS[i % 3::3],
+            'globs': [f'f*{i}?.*', f'*{i}{i}*'],
+            'prefixes': [f'f{i}'],
+        })
+    return compile_rules(rules)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=1000000)
+    parser.add_argument('--rules', type=int, default=12)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--dir', default=os.path.join(tempfile.gettempdir(), 'cw-bench-tree'))
+    args = parser.parse_args()
+
+    os.makedirs(args.dir, exist_ok=True)
+    started = time.perf_counter()
+    build_tree(args.dir, args.entries)
+    print(f"tree: {args.entries} entries in {args.dir} ({time.perf_counter() - started:.1f}s to prepare)")
+
+    session = ScanSession({'BENCH_ROOT': args.dir}, admin=False)
+    rules = make_rules(args.rules)
+    scan_rules(rules, session)  # warm the directory cache
+
+    baseline = None
+    for backend in ('serial', 'thread', 'process'):
+        started = time.perf_counter()
+        results = scan_rules(rules, session, backend=backend, workers=args.workers)
+        elapsed = time.perf_counter() - started
+        matched = sum(len(r['files']) for r in results.values())
+        baseline = baseline or elapsed
+        print(f"{backend:>8}: {elapsed:7.2f}s  {matched} matches  x{baseline / elapsed:.2f}")
+
+
+if __name__ == '__main__':
+    main()
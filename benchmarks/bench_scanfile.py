@@ -0,0 +1,76 @@
+"""Save and load times of scan files.
+
+Builds scan results with the given number of entries (spread over a few
+thousand folders, with mtimes over the last 60 days), saves them with
+and without compression and loads them back, reporting file size and
+the best of a few rounds. Revalidation is timed on the files a clean
+at the saved threshold would touch; they do not exist, so every stat
+fails fast and this is a lower bound.
+
+    python benchmarks/bench_scanfile.py --items 100000 1000000
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.ages import AgeIndex, refilter
+from core.scanfile import load, revalidate, save
+
+
+def make_results(count, min_age_days):
+    now = time.time()
+    ages = AgeIndex(now)
+    rng = random.Random(0)
+    for i in range(count):
+        path = os.path.join('C:\\Users\\me\\AppData\\Local\\Google\\Chrome\\User Data\\Default\\Cache',
+                            f'd{i % 2000:04d}', f'f_{i:08x}')
+        ages.add(now - rng.uniform(0, 60 * 86400), rng.randint(1, 1 << 20), path)
+    data = {'files': [], 'items': [], 'size': 0, 'skipped_recent': 0, 'skipped_recent_size': 0,
+            'retained': 0, 'retained_size': 0, 'ages': ages}
+    refilter(data, min_age_days)
+    return {'Chrome Cache': data}
+
+
+def best(func, rounds):
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--min-age-days', type=int, default=7)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix='bench_scanfile_')
+    try:
+        print(f"{'items':>9} {'compress':>9} {'size':>9} {'save':>9} {'load':>9} {'revalidate':>11}")
+        for count in args.items:
+            results = make_results(count, args.min_age_days)
+            path = os.path.join(work, 'scan.cwscan')
+            for compress in (True, False):
+                saved = best(lambda: save(path, results, args.min_age_days, compress=compress), args.rounds)
+                loaded = best(lambda: load(path), args.rounds)
+                data = load(path)[0]['Chrome Cache']
+                start = time.perf_counter()
+                revalidate(data, args.min_age_days)
+                checked = time.perf_counter() - start
+                print(f"{count:>9} {str(compress):>9} {os.path.getsize(path) / 1e6:>6.1f} MB "
+                      f"{saved * 1000:>6.0f} ms {loaded * 1000:>6.0f} ms {checked * 1000:>8.0f} ms")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
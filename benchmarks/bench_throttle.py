@@ -0,0 +1,107 @@
+"""Foreground I/O latency while a scan and clean run in the background.
+
+Builds a tree of small files, then scans and cleans it on a worker
+thread, either at full speed or in background mode (a Throttle plus
+lower_thread_priority). Meanwhile the main thread plays a foreground
+app: every 20 ms it writes and fsyncs 4 KB and lists a directory, and
+the latency of each round is recorded. An idle run gives the baseline.
+
+    python benchmarks/bench_throttle.py --files 50000 --files-per-sec 5000
+
+The tree is built under --dir (default: a temp dir); put it on the disk
+you care about, since a tmpfs shows no I/O contention.
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.cleaner import Cleaner
+from core.rules import compile_rules, scan_rules
+from core.session import ScanSession
+from core.throttle import Throttle, lower_thread_priority
+
+
+def build_tree(root, count, per_dir=500):
+    for i in range(count):
+        folder = os.path.join(root, f'd{i // per_dir}')
+        if i % per_dir == 0:
+            os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f'f{i}.tmp'), 'wb') as f:
+            f.write(b'x' * 2048)
+
+
+def background(root, throttle, done):
+    if throttle is not None:
+        lower_thread_priority()
+    rules = compile_rules([{'category': 'Bench', 'roots': ['%BENCH_ROOT%'], 'globs': ['*.tmp']}])
+    session = ScanSession({'BENCH_ROOT': root}, admin=False)
+    start = time.perf_counter()
+    results = scan_rules(rules, session, throttle=throttle)
+    Cleaner().clean_files(results['Bench']['files'], throttle=throttle)
+    done.append(time.perf_counter() - start)
+
+
+def foreground(work, stop, interval=0.02):
+    latencies = []
+    probe = os.path.join(work, 'foreground.bin')
+    payload = os.urandom(4096)
+    while not stop():
+        start = time.perf_counter()
+        with open(probe, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.listdir(work)
+        latencies.append(time.perf_counter() - start)
+        time.sleep(interval)
+    return latencies
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] * 1000 if ordered else 0.0
+
+
+def run(mode, args):
+    work = tempfile.mkdtemp(prefix='bench_throttle_', dir=args.dir)
+    try:
+        root = os.path.join(work, 'tree')
+        build_tree(root, args.files)
+        if mode == 'idle':
+            deadline = time.perf_counter() + args.idle_seconds
+            return None, foreground(work, lambda: time.perf_counter() > deadline)
+        throttle = Throttle(files_per_sec=args.files_per_sec) if mode == 'throttled' else None
+        done = []
+        worker = threading.Thread(target=background, args=(root, throttle, done))
+        worker.start()
+        latencies = foreground(work, lambda: not worker.is_alive())
+        worker.join()
+        return done[0], latencies
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=50_000)
+    parser.add_argument('--files-per-sec', type=int, default=5_000)
+    parser.add_argument('--idle-seconds', type=float, default=3.0)
+    parser.add_argument('--dir', default=None, help='Where to build the tree (default: a temp dir)')
+    args = parser.parse_args()
+
+    print(f"{'mode':<10} {'background':>11} {'rounds':>7} {'p50':>9} {'p99':>9} {'max':>9}")
+    for mode in ('idle', 'full', 'throttled'):
+        elapsed, latencies = run(mode, args)
+        took = f"{elapsed:>9.2f} s" if elapsed is not None else f"{'-':>11}"
+        print(f"{mode:<10} {took} {len(latencies):>7} {percentile(latencies, 50):>6.2f} ms "
+              f"{percentile(latencies, 99):>6.2f} ms {max(latencies, default=0) * 1000:>6.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+"""Scan candidates kept by age, so the age filter can change without a rescan.
+
+Each category's result carries an AgeIndex under 'ages' with every file
+that the scan's own age filter could have let through, recent or not:
+modification times in an array('d'), sizes in an array('Q') and the
+paths, in matching order. Once sorted by time with running size totals,
+the items and bytes older than any threshold are one bisect away, so
+re-filtering a finished scan costs a few lookups per category, and
+rebuilding its file lists is a slice.
+
+Files too new for their rule's own min_age_days never become eligible
+whatever the threshold; they are only counted (`pinned`).
+"""
+import os
+import time
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+from itertools import accumulate
+
+
+class AgeIndex:
+    """A category's candidate files, sorted by modification time once frozen.
+
+    After freeze(), changes are kept aside instead of re-sorting: added
+    files go to an unsorted tail and discarded ones are tombstoned by
+    position. summary() folds both in, so a batch of watcher events costs
+    time in proportion to the batch; they are merged into the sorted
+    arrays once they grow past a fraction of the index, or when the
+    arrays themselves are read (freeze(), eligible()).
+    """
+
+    def __init__(self, now=None):
+        self.now = time.time() if now is None else now
+        self.mtimes = array('d')
+        self.sizes = array('Q')
+        self.paths = []
+        # Extra item fields for a few paths (e.g. a Recycle Bin item's original path)
+        self.extras = {}
+        self.pinned = 0
+        self.pinned_size = 0
+        self._prefix = None
+        self._positions = None  # path -> position in the sorted arrays, built on the first discard
+        self._dead = set()      # positions discarded since the last merge
+        self._tail = {}         # path -> (mtime, size) added since the last merge
+
+    def __len__(self):
+        return len(self.paths) - len(self._dead) + len(self._tail)
+
+    def __contains__(self, path):
+        if path in self._tail:
+            return True
+        if self._prefix is None:
+            return path in self.paths
+        i = self._position_map().get(path)
+        return i is not None and i not in self._dead
+
+    def _position_map(self):
+        if self._positions is None:
+            self._positions = {path: i for i, path in enumerate(self.paths)}
+        return self._positions
+
+    def add(self, mtime, size, path, extra=None):
+        if self._prefix is None:
+            self.mtimes.append(mtime)
+            self.sizes.append(size)
+            self.paths.append(path)
+        else:
+            self._tail[path] = (mtime, size)
+            self._merge_if_large()
+        if extra:
+            self.extras[path] = extra
+
+    def extend(self, mtimes, sizes, paths):
+        if self._prefix is not None:
+            for mtime, size, path in zip(mtimes, sizes, paths):
+                self.add(mtime, size, path)
+            return
+        self.mtimes.extend(mtimes)
+        self.sizes.extend(sizes)
+        self.paths.extend(paths)
+
+    def pin(self, count, size):
+        self.pinned += count
+        self.pinned_size += size
+
+    def discard(self, paths, under=()):
+        """Drops the given paths (e.g. files deleted since the scan); returns how many were indexed.
+
+        `under` names folders (e.g. moved out of the tree) whose files all go too.
+        """
+        self._sort()
+        positions = self._position_map()
+        if under:
+            prefixes = tuple(folder.rstrip(os.sep) + os.sep for folder in under)
+            paths = set(paths)
+            paths.update(path for path in self.paths if path.startswith(prefixes))
+            paths.update(path for path in self._tail if path.startswith(prefixes))
+        dropped = 0
+        for path in paths:
+            if self._tail.pop(path, None) is not None:
+                dropped += 1
+            i = positions.get(path)
+            if i is not None and i not in self._dead:
+                self._dead.add(i)
+                dropped += 1
+            self.extras.pop(path, None)
+        if dropped:
+            self._merge_if_large()
+        return dropped
+
+    def _sort(self):
+        """Sorts the arrays by modification time and builds the running size totals, once."""
+        if self._prefix is not None:
+            return
+        order = sorted(range(len(self.paths)), key=self.mtimes.__getitem__)
+        if any(a > b for a, b in zip(order, order[1:])):
+            self._take(order)
+        self._prefix = array('Q', accumulate(self.sizes, initial=0))
+
+    def _take(self, order):
+        self.mtimes = array('d', (self.mtimes[i] for i in order))
+        self.sizes = array('Q', (self.sizes[i] for i in order))
+        self.paths = [self.paths[i] for i in order]
+        self._positions = None
+
+    def _merge_if_large(self):
+        if len(self._dead) + len(self._tail) > max(1024, len(self.paths) // 16):
+            self._merge()
+
+    def _merge(self):
+        """Folds the tail and tombstones into the sorted arrays."""
+        if not self._dead and not self._tail:
+            return
+        if self._dead:
+            self._take([i for i in range(len(self.paths)) if i not in self._dead])
+            self._dead = set()
+        if self._tail:
+            for path, (mtime, size) in self._tail.items():
+                self.mtimes.append(mtime)
+                self.sizes.append(size)
+                self.paths.append(path)
+            self._tail = {}
+            # Timsort: a sorted run plus a short unsorted one is close to linear
+            order = sorted(range(len(self.paths)), key=self.mtimes.__getitem__)
+            self._take(order)
+        self._positions = None
+        self._prefix = array('Q', accumulate(self.sizes, initial=0))
+
+    def freeze(self, presorted=False, track=False):
+        """Sorts by modification time, builds the running size totals and merges pending changes.
+
+        Queries do this on demand; call it ahead (e.g. on the scan's
+        worker thread) to keep the first query instant, and before
+        reading the arrays directly. `presorted` skips the sort for
+        entries known to be in order (e.g. read back from a saved scan);
+        `track` also maps paths to positions for the discards of a
+        watcher, which would otherwise build it on the first batch.
+        """
+        if self._prefix is None and presorted:
+            self._prefix = array('Q', accumulate(self.sizes, initial=0))
+        self._sort()
+        self._merge()
+        if track:
+            self._position_map()
+
+    def cutoff(self, min_age_days):
+        return self.now - min_age_days * 86400 if min_age_days and min_age_days > 0 else None
+
+    def _split(self, min_age_days):
+        cutoff = self.cutoff(min_age_days)
+        return len(self.paths) if cutoff is None else bisect_right(self.mtimes, cutoff)
+
+    def summary(self, min_age_days):
+        """(items, bytes, skipped recent items, skipped recent bytes) for an age threshold."""
+        self._sort()
+        split = self._split(min_age_days)
+        count, total = len(self.paths), self._prefix[-1]
+        items, size = split, self._prefix[split]
+        for i in self._dead:
+            count -= 1
+            total -= self.sizes[i]
+            if i < split:
+                items -= 1
+                size -= self.sizes[i]
+        cutoff = self.cutoff(min_age_days)
+        for mtime, tail_size in self._tail.values():
+            count += 1
+            total += tail_size
+            if cutoff is None or mtime <= cutoff:
+                items += 1
+                size += tail_size
+        return items, size, count - items + self.pinned, total - size + self.pinned_size
+
+    def eligible(self, min_age_days):
+        """(paths, sizes) of the files older than the threshold, oldest first."""
+        self.freeze()
+        split = self._split(min_age_days)
+        return self.paths[:split], self.sizes[:split]
+
+
+class ItemList(Sequence):
+    """A re-filtered category's items, made as they are read.
+
+    Stands in for the list of {'path', 'size'} dicts of a scan result
+    without building a dict per file up front (that alone would take
+    longer than loading a saved scan); it can be appended to like the
+    list it replaces.
+    """
+
+    def __init__(self, paths, sizes, extras=None):
+        self._paths = list(paths)
+        self._sizes = array('Q', sizes)
+        self._extras = {} if extras is None else extras
+
+    def __len__(self):
+        return len(self._paths)
+
+    def _item(self, path, size):
+        extra = self._extras.get(path)
+        return dict(extra, path=path, size=size) if extra else {'path': path, 'size': size}
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._item(p, s) for p, s in zip(self._paths[index], self._sizes[index])]
+        return self._item(self._paths[index], self._sizes[index])
+
+    def __iter__(self):
+        for path, size in zip(self._paths, self._sizes):
+            yield self._item(path, size)
+
+    def append(self, item):
+        self._paths.append(item['path'])
+        self._sizes.append(item['size'])
+        if len(item) > 2:
+            self._extras[item['path']] = {k: v for k, v in item.items() if k not in ('path', 'size')}
+
+
+def age_summary(data, min_age_days):
+    """Like results.scan_summary for one category, under a different age threshold.
+
+    None for a result without an AgeIndex, whose counts cannot change.
+    """
+    ages = data.get('ages')
+    if ages is None:
+        return None
+    items, size, skipped, skipped_size = ages.summary(min_age_days)
+    return {
+        'items': items,
+        'size': size,
+        'skipped_recent': skipped,
+        'skipped_recent_size': skipped_size,
+        'retained': data.get('retained', 0),
+        'retained_size': data.get('retained_size', 0),
+        'error': data.get('error'),
+    }
+
+
+def refilter(data, min_age_days):
+    """Rebuilds one category's files/items/size/skipped counts for a new age threshold, in place.
+
+    Returns False (and changes nothing) for a result without an AgeIndex.
+    """
+    ages = data.get('ages')
+    if ages is None:
+        return False
+    paths, sizes = ages.eligible(min_age_days)
+    _items, size, skipped, skipped_size = ages.summary(min_age_days)
+    data['files'] = paths
+    data['items'] = ItemList(paths, sizes, ages.extras)
+    data['size'] = size
+    data['skipped_recent'] = skipped
+    data['skipped_recent_size'] = skipped_size
+    return True
@@ -1,14 +1,30 @@
 import os
 import winreg
 import send2trash
-import hashlib
 import subprocess
+from core import instrument
+from core.diskindex import DiskIndex, default_index_path
+from core.duplicates import find_duplicate_groups, link_duplicates
+from core.imagehash import group_similar, hash_images, list_images
+
+
+def _size_or_zero(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
 
 class Analyzer:
-    def find_large_files(self, start_path, min_size_mb=100):
-        """Scans for files larger than min_size_mb (default 100MB)."""
+    def find_large_files(self, start_path, min_size_mb=100, index=None):
+        """Scans for files larger than min_size_mb (default 100MB).
+
+        With a DiskIndex covering start_path this is a lookup instead of a walk.
+        """
         large_files = []
         min_size_bytes = min_size_mb * 1024 * 1024
+        if index is not None and index.covers(start_path):
+            return index.files_over(min_size_bytes, under=start_path)
         
         try:
             for root, dirs, files in os.walk(start_path):
@@ -27,6 +43,33 @@ class Analyzer:
         large_files.sort(key=lambda x: x[1], reverse=True)
         return large_files
 
+    def refresh_disk_index(self, start_path, dirty=None):
+        """Returns an up-to-date catalog of start_path and saves it for next time.
+
+        The saved catalog is reused so only folders that changed (or are
+        listed in `dirty`) are re-read.
+        """
+        saved = self.load_disk_index(start_path)
+        if saved is not None:
+            with instrument.span('disk index: refresh', root=start_path):
+                index = saved.refresh(dirty=dirty)
+            saved.close()
+        else:
+            with instrument.span('disk index: build', root=start_path):
+                index = DiskIndex.build(start_path)
+        try:
+            index.save(default_index_path(start_path))
+        except OSError:
+            pass
+        return index
+
+    def load_disk_index(self, start_path):
+        """Loads the saved folder size index for start_path, if there is one."""
+        try:
+            return DiskIndex.load(default_index_path(start_path))
+        except (OSError, ValueError):
+            return None
+
     def get_startup_items(self):
         """Retrieves startup programs from HKCU and HKLM."""
         items = []
@@ -73,53 +116,43 @@ class Analyzer:
 
     def find_duplicates(self, search_path):
         """Finds duplicate files based on content hash."""
-        # 1. Group by size
-        size_groups = {}
         try:
-            for root, dirs, files in os.walk(search_path):
-                for name in files:
-                    try:
-                        filepath = os.path.join(root, name)
-                        size = os.path.getsize(filepath)
-                        if size < 1024: # Skip very small files
-                            continue
-                        if size not in size_groups:
-                            size_groups[size] = []
-                        size_groups[size].append(filepath)
-                    except Exception:
-                        pass
+            groups = find_duplicate_groups(search_path)
         except Exception:
             return {}
+        return {group['hash']: group['paths'] for group in groups}
 
-        # 2. Hash candidates
-        duplicates = {} # hash -> [file1, file2]
-        
-        for size, files in size_groups.items():
-            if len(files) < 2:
-                continue
-            
-            # Check full hash
-            for fpath in files:
-                try:
-                    file_hash = self._get_file_hash(fpath)
-                    if file_hash not in duplicates:
-                        duplicates[file_hash] = []
-                    duplicates[file_hash].append(fpath)
-                except Exception:
-                    pass
-
-        # Filter out unique hashes
-        final_dupes = {h: paths for h, paths in duplicates.items() if len(paths) > 1}
-        return final_dupes
-
-    def _get_file_hash(self, filepath, block_size=65536):
-        hasher = hashlib.md5()
-        with open(filepath, 'rb') as f:
-            buf = f.read(block_size)
-            while len(buf) > 0:
-                hasher.update(buf)
-                buf = f.read(block_size)
-        return hasher.hexdigest()
+    def analyze_duplicates(self, search_path):
+        """Duplicate groups with hard links collapsed and reclaimable bytes counted.
+
+        See core.duplicates.summarize for the group fields.
+        """
+        try:
+            return find_duplicate_groups(search_path)
+        except Exception:
+            return []
+
+    def link_duplicates(self, paths, keep=None):
+        """Replaces identical copies with hard links to one file, keeping every path."""
+        return link_duplicates(paths, keep)
+
+    def find_similar_images(self, search_path, max_distance=6, method='dhash', workers=None):
+        """Finds re-encoded or resized copies of images by perceptual hash.
+
+        Returns the same {key: [paths]} shape as find_duplicates, with each
+        group ordered largest file first. Raises ImportError without Pillow.
+        """
+        import PIL  # noqa: F401  (fail fast instead of skipping every image)
+        paths = list_images(search_path)
+        with instrument.span('similar images: hash', images=len(paths)):
+            paths, hashes = hash_images(paths, method=method, workers=workers)
+        instrument.count('images hashed', len(paths))
+        groups = {}
+        for members in group_similar(hashes, max_distance):
+            files = [paths[i] for i in members]
+            files.sort(key=_size_or_zero, reverse=True)
+            groups[f"{hashes[members[0]]:016x}"] = files
+        return groups
 
     def get_installed_programs(self):
         """Scans registry for installed programs."""
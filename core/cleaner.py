@@ -1,16 +1,26 @@
 import os
-import winshell
+import time
 import send2trash
+from core import instrument
+from core.quarantine import Quarantine, QuarantineUnavailable
+from core.recyclebin import purge
 from core.safety import SafetyManager
 
 class Cleaner:
-    def __init__(self):
-        self.safety = SafetyManager()
+    def __init__(self, safety=None, quarantine=None):
+        self.safety = safety or SafetyManager()
+        self.quarantine = quarantine or Quarantine()
 
-    def clean_files(self, files_list, use_recycle_bin=False):
+    def begin_quarantine(self):
+        """A session to pass to clean_category/clean_files; close() it when done."""
+        return self.quarantine.begin()
+
+    def clean_files(self, files_list, use_recycle_bin=False, quarantine=None, category="", throttle=None):
         cleaned_count = 0
         cleaned_size = 0
         errors = []
+        # Per-file latencies are only taken while instrument is recording
+        rec = instrument.active()
 
         for filepath in files_list:
             # Special handling for Recycle Bin
@@ -20,12 +30,23 @@ class Cleaner:
             try:
                 if os.path.isfile(filepath):
                     size = os.path.getsize(filepath)
-                    if use_recycle_bin:
+                    if throttle is not None:
+                        throttle.pace(1, size)
+                    start = time.perf_counter() if rec is not None else 0
+                    if quarantine is not None and self._stage(quarantine, filepath, category):
+                        action = 'quarantine'
+                        self.safety.log_action(f"Quarantined: {filepath} ({size} bytes)")
+                    elif use_recycle_bin or quarantine is not None:
+                        # Also where quarantine has no staging folder, so the file stays recoverable
                          send2trash.send2trash(filepath)
+                         action = 'recycle'
                          self.safety.log_action(f"Moved to Recycle Bin: {filepath}")
                     else:
                         os.remove(filepath)
+                        action = 'unlink'
                         self.safety.log_action(f"Deleted: {filepath} ({size} bytes)")
+                    if rec is not None:
+                        rec.observe(action, time.perf_counter() - start, category)
                     
                     cleaned_count += 1
                     cleaned_size += size
@@ -34,14 +55,24 @@ class Cleaner:
                     # but scanner currently returns files. 
                     pass
             except Exception as e:
+                if rec is not None:
+                    rec.error(e, 'delete', category)
                 err_msg = f"Failed to delete {filepath}: {e}"
                 errors.append(err_msg)
                 self.safety.log_error(err_msg)
 
         return cleaned_count, cleaned_size, errors
 
+    def _stage(self, session, filepath, category):
+        try:
+            session.stage(filepath, category)
+        except QuarantineUnavailable:
+            return False
+        return True
+
     def clean_recycle_bin(self):
         try:
+            import winshell
             # This empties the recycle bin for real
             winshell.recycle_bin().empty(confirm=False, show_progress=False, sound=False)
             self.safety.log_action("Emptied Recycle Bin")
@@ -50,24 +81,43 @@ class Cleaner:
             self.safety.log_error(f"Failed to empty Recycle Bin: {e}")
             return False, str(e)
 
-    def clean_category(self, category_name, scan_result_for_category, use_recycle_bin=False):
+    def clean_recycle_items(self, items):
+        count, size, errors, originals = purge(items)
+        for original in originals:
+            self.safety.log_action(f"Deleted from Recycle Bin: {original}")
+        for err in errors:
+            self.safety.log_error(err)
+        return count, size, errors
+
+    def clean_category(self, category_name, scan_result_for_category, use_recycle_bin=False, quarantine=None,
+                       throttle=None):
         self.safety.log_action(f"Starting clean for category: {category_name}")
         
         files = scan_result_for_category.get('files', [])
         total_size = scan_result_for_category.get('size', 0)
 
-        if category_name == 'Recycle Bin':
-            # Recycle bin cannot be sent to recycle bin. It must be emptied.
-            success, msg = self.clean_recycle_bin()
-            if success:
-                # Assuming all found items were deleted
-                return len(files), total_size, []
-            else:
-                return 0, 0, [msg]
-        
-        return self.clean_files(files, use_recycle_bin)
+        with instrument.span('clean', category_name, files=len(files)):
+            if category_name == 'Recycle Bin':
+                if not files:
+                    return 0, 0, []
+                if not files[0].startswith("[Recycle Bin]"):
+                    # Items read from $Recycle.Bin: remove exactly those, so the age filter holds
+                    return self.clean_recycle_items(scan_result_for_category.get('items', []))
+                # Recycle bin cannot be sent to recycle bin. It must be emptied.
+                success, msg = self.clean_recycle_bin()
+                if success:
+                    # Assuming all found items were deleted
+                    return len(files), total_size, []
+                else:
+                    return 0, 0, [msg]
+
+            return self.clean_files(files, use_recycle_bin, quarantine, category_name, throttle)
+
+    def prepare_safety(self):
+        """Starts the restore point in the background, e.g. while a scan runs."""
+        return self.safety.start_restore_point()
 
     def run_safety_checks(self):
-        # Create Restore Point (only tries if Admin)
-        success, msg = self.safety.create_restore_point()
+        # Create Restore Point (only tries if Admin); reuses one started by prepare_safety
+        success, msg = self.safety.wait_restore_point()
         return success, msg
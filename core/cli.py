@@ -0,0 +1,420 @@
+"""Headless command line interface for scripted scan/clean runs.
+
+Usage examples:
+    python -m core list
+    python -m core scan -c "System Temp" -c "Chrome Cache" --min-age-days 7
+    python -m core scan --all --save weekly.cwscan
+    python -m core clean --load weekly.cwscan --quarantine
+    python -m core clean -c "Chrome Cache" --trace clean.trace.json
+    python -m core clean --all --min-age-days 30 --dry-run --format ndjson
+    python -m core clean -c "Chrome Cache" --quarantine
+    python -m core quarantine restore 20260101-120000 -c "Chrome Cache"
+    python -m core schedule run
+
+This module must never import Qt; it only touches the Scanner/Cleaner core.
+"""
+import sys
+import json
+import argparse
+
+EXIT_OK = 0
+EXIT_ERRORS = 1
+EXIT_USAGE = 2
+
+
+class _Emitter:
+    """Streams records to stdout as NDJSON lines or as one incrementally written JSON document."""
+
+    def __init__(self, fmt, stream=None):
+        self.fmt = fmt
+        self.stream = stream or sys.stdout
+        self._first = True
+        if fmt == 'json':
+            self.stream.write('[')
+
+    def emit(self, record):
+        if self.fmt == 'ndjson':
+            self.stream.write(json.dumps(record) + '\n')
+        else:
+            self.stream.write(('\n' if self._first else ',\n') + json.dumps(record))
+            self._first = False
+        self.stream.flush()
+
+    def close(self):
+        if self.fmt == 'json':
+            self.stream.write('\n]\n')
+            self.stream.flush()
+
+
+def _resolve_categories(scanner, names, use_all):
+    if use_all or not names:
+        return list(scanner.categories.keys()), []
+    lookup = {name.lower(): name for name in scanner.categories}
+    resolved = []
+    unknown = []
+    for name in names:
+        match = lookup.get(name.strip().lower())
+        if match is None:
+            unknown.append(name)
+        elif match not in resolved:
+            resolved.append(match)
+    return resolved, unknown
+
+
+def _category_record(kind, cat, data, with_items):
+    record = {
+        'type': kind,
+        'category': cat,
+        'items': len(data.get('files', [])),
+        'size': data.get('size', 0),
+        'skipped_recent': data.get('skipped_recent', 0),
+        'skipped_recent_size': data.get('skipped_recent_size', 0),
+        'retained': data.get('retained', 0),
+        'retained_size': data.get('retained_size', 0),
+    }
+    if data.get('error'):
+        record['error'] = data['error']
+    if with_items:
+        record['files'] = list(data.get('items', []))
+    return record
+
+
+def _scan(scanner, categories, args, emitter):
+    """Runs the scan and streams one record per category as it completes."""
+    def _progress(_idx, _total, cat, data):
+        emitter.emit(_category_record('scan', cat, data, args.items))
+
+    return scanner.scan_selected(categories, progress_cb=_progress, min_age_days=args.min_age_days)
+
+
+def _load(scanner, categories, args, emitter):
+    """Reads a saved scan instead of scanning.
+
+    Only paths the current rules would match are kept, and of those only
+    the files a clean would touch are re-checked against the disk.
+    """
+    from .scanfile import confine, load, revalidate
+    results, header = load(args.load, args.min_age_days or None)
+    if args.category:
+        results = {cat: results[cat] for cat in categories if cat in results}
+    min_age_days = args.min_age_days or header['min_age_days']
+    dropped = confine(results, scanner.watch_plan(list(results)), scanner.recycle_bin_roots(), min_age_days)
+    for cat, data in results.items():
+        if cat in dropped:
+            count, size = dropped[cat]
+            emitter.emit({'type': 'warning', 'category': cat,
+                          'message': f"Ignored {count} saved entries ({size} bytes) that its rules do not match"})
+        count, size = revalidate(data, min_age_days)
+        if count:
+            emitter.emit({'type': 'warning', 'category': cat,
+                          'message': f"Skipped {count} files ({size} bytes) changed since the scan was saved"})
+        emitter.emit(_category_record('scan', cat, data, args.items))
+    return results
+
+
+def cmd_list(args):
+    from .scanner import Scanner
+    emitter = _Emitter(args.format)
+    for name in Scanner().categories:
+        emitter.emit({'type': 'category', 'name': name})
+    emitter.close()
+    return EXIT_OK
+
+
+def _start_trace(args):
+    if not args.trace:
+        return None
+    from . import instrument
+    return instrument.enable()
+
+
+def _finish_trace(recorder, args, emitter):
+    """Emits one 'timing' record per category (and one for the run) and writes the Chrome trace."""
+    if recorder is None:
+        return
+    from . import instrument
+    instrument.disable()
+    for cat in [''] + recorder.categories():
+        emitter.emit(dict({'type': 'timing', 'category': cat or None}, **recorder.metrics(cat)))
+    try:
+        recorder.export_chrome_trace(args.trace)
+    except OSError as e:
+        emitter.emit({'type': 'warning', 'message': f"Could not write {args.trace}: {e}"})
+
+
+def _make_throttle(args):
+    if not args.throttle:
+        return None
+    from .throttle import Throttle, lower_thread_priority
+    lower_thread_priority()
+    return Throttle()
+
+
+def _make_scanner(args, throttle=None):
+    from .scanner import Scanner
+    if args.jobs > 1:
+        return Scanner(backend='process', workers=args.jobs, throttle=throttle)
+    return Scanner(throttle=throttle)
+
+
+def cmd_scan(args):
+    scanner = _make_scanner(args, _make_throttle(args))
+    categories, unknown = _resolve_categories(scanner, args.category, args.all)
+    if unknown:
+        print(f"Unknown categories: {', '.join(unknown)}", file=sys.stderr)
+        return EXIT_USAGE
+
+    emitter = _Emitter(args.format)
+    recorder = _start_trace(args)
+    results = _scan(scanner, categories, args, emitter)
+    _finish_trace(recorder, args, emitter)
+    errors = sum(1 for data in results.values() if data.get('error'))
+    summary = {
+        'type': 'summary',
+        'categories': len(results),
+        'items': sum(len(d.get('files', [])) for d in results.values()),
+        'size': sum(d.get('size', 0) for d in results.values()),
+        'errors': errors,
+    }
+    if args.save:
+        from .scanfile import save
+        try:
+            save(args.save, results, args.min_age_days)
+            summary['saved'] = args.save
+        except OSError as e:
+            summary['save_error'] = str(e)
+            errors += 1
+    emitter.emit(summary)
+    emitter.close()
+    return EXIT_ERRORS if errors else EXIT_OK
+
+
+def cmd_clean(args):
+    throttle = _make_throttle(args)
+    scanner = _make_scanner(args, throttle)
+    categories, unknown = _resolve_categories(scanner, args.category, args.all)
+    if unknown:
+        print(f"Unknown categories: {', '.join(unknown)}", file=sys.stderr)
+        return EXIT_USAGE
+
+    cleaner = None
+    session = None
+    if not args.dry_run:
+        from .cleaner import Cleaner
+        cleaner = Cleaner()
+        if args.restore_point:
+            # Created while the scan runs; only system categories wait for it
+            cleaner.prepare_safety()
+        if args.quarantine:
+            session = cleaner.begin_quarantine()
+
+    emitter = _Emitter(args.format)
+    recorder = _start_trace(args)
+    if args.load:
+        try:
+            results = _load(scanner, categories, args, emitter)
+        except (OSError, ValueError) as e:
+            _finish_trace(recorder, args, emitter)
+            emitter.close()
+            print(f"Cannot read {args.load}: {e}", file=sys.stderr)
+            return EXIT_USAGE
+    else:
+        results = _scan(scanner, categories, args, emitter)
+    errors = [f"[{cat}] {d['error']}" for cat, d in results.items() if d.get('error')]
+
+    from .safety import split_by_risk
+    low, high = split_by_risk([cat for cat, d in results.items() if d.get('files')], scanner.low_risk_categories())
+    total_items = 0
+    total_size = 0
+    for cat in low + high:
+        data = results[cat]
+        if cleaner is not None and args.restore_point and high and cat == high[0]:
+            ok, msg = cleaner.run_safety_checks()
+            if not ok:
+                emitter.emit({'type': 'warning', 'message': f"Restore point warning: {msg}"})
+        if cleaner is None:
+            count, size, errs = len(data['files']), data.get('size', 0), []
+        else:
+            count, size, errs = cleaner.clean_category(cat, data, args.recycle, session, throttle)
+        total_items += count
+        total_size += size
+        errors.extend(errs)
+        emitter.emit({
+            'type': 'clean',
+            'category': cat,
+            'dry_run': args.dry_run,
+            'items': count,
+            'size': size,
+            'errors': errs,
+        })
+
+    summary = {
+        'type': 'summary',
+        'dry_run': args.dry_run,
+        'items': total_items,
+        'size': total_size,
+        'errors': len(errors),
+    }
+    if session is not None:
+        session.close()
+        summary['quarantine_session'] = session.id if session.items else None
+    _finish_trace(recorder, args, emitter)
+    emitter.emit(summary)
+    emitter.close()
+    return EXIT_ERRORS if errors else EXIT_OK
+
+
+def cmd_quarantine(args):
+    from .quarantine import Quarantine
+    quarantine = Quarantine()
+    emitter = _Emitter(args.format)
+    code = EXIT_OK
+    if args.action == 'list':
+        for session in quarantine.sessions():
+            emitter.emit({
+                'type': 'session',
+                'id': session['id'],
+                'created': session['created'],
+                'items': session['items'],
+                'size': session['size'],
+                'categories': {cat: {'items': n, 'size': size} for cat, (n, size) in session['categories'].items()},
+            })
+    elif args.action == 'restore':
+        if not args.session:
+            emitter.close()
+            print("restore needs a session id (see 'quarantine list')", file=sys.stderr)
+            return EXIT_USAGE
+        try:
+            count, size, errs = quarantine.restore(args.session, args.category)
+        except OSError as e:
+            count, size, errs = 0, 0, [f"Unknown session {args.session}: {e}"]
+        emitter.emit({'type': 'restore', 'session': args.session, 'category': args.category,
+                      'items': count, 'size': size, 'errors': errs})
+        code = EXIT_ERRORS if errs else EXIT_OK
+    else:
+        removed, freed = quarantine.purge(args.older_than_days)
+        emitter.emit({'type': 'purge', 'sessions': removed, 'size': freed})
+    emitter.close()
+    return code
+
+
+def cmd_schedule(args):
+    from .scheduler import Scheduler, SchedulerBusy, pid_alive, read_history, read_status
+    if args.action == 'status':
+        status = read_status() or {'state': 'not running'}
+        if status['state'] == 'running' and not pid_alive(status.get('pid')):
+            status['state'] = 'interrupted'
+        print(json.dumps(status))
+        return EXIT_OK
+    if args.action == 'history':
+        emitter = _Emitter(args.format)
+        for record in read_history(limit=args.limit):
+            emitter.emit(dict(record, type='run'))
+        emitter.close()
+        return EXIT_OK
+
+    try:
+        scheduler = Scheduler()
+    except (OSError, ValueError, TypeError, KeyError) as e:
+        print(f"Invalid schedule.json: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    if not scheduler.jobs:
+        print("No jobs configured (see schedule.json in the app data folder)", file=sys.stderr)
+        return EXIT_USAGE
+    try:
+        if args.action == 'run':
+            scheduler.run_forever(args.poll)
+            return EXIT_OK
+
+        # once: what is due now (idle jobs too, if --idle), or the named jobs with --job
+        if args.job:
+            jobs = [job for job in scheduler.jobs if job.name in args.job]
+            with scheduler.lock:
+                records = [scheduler.run_job(job, 'manual') for job in jobs]
+        else:
+            records = scheduler.run_pending(idle=args.idle)
+    except SchedulerBusy as e:
+        print(e, file=sys.stderr)
+        return EXIT_ERRORS
+    emitter = _Emitter(args.format)
+    for record in records:
+        emitter.emit(dict(record, type='run'))
+    emitter.close()
+    failed = any(record.get('failed') or record.get('error_count') for record in records)
+    return EXIT_ERRORS if failed else EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m core', description='Cleaner Wannabe headless runner')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    def _common(p):
+        p.add_argument('--format', choices=['ndjson', 'json'], default='ndjson',
+                       help='Output format (default: ndjson, one record per line)')
+
+    p_list = sub.add_parser('list', help='List scan categories')
+    _common(p_list)
+    p_list.set_defaults(func=cmd_list)
+
+    for name, func, help_text in (
+        ('scan', cmd_scan, 'Scan categories and report what can be cleaned'),
+        ('clean', cmd_clean, 'Scan categories and clean the results'),
+    ):
+        p = sub.add_parser(name, help=help_text)
+        _common(p)
+        p.add_argument('-c', '--category', action='append', default=[],
+                       help='Category name (repeatable, case-insensitive)')
+        p.add_argument('--all', action='store_true', help='Use every category (default when none given)')
+        p.add_argument('--min-age-days', type=int, default=0,
+                       help='Only include files older than this many days')
+        p.add_argument('-j', '--jobs', type=int, default=1,
+                       help='Walk large trees in this many worker processes (default: 1)')
+        p.add_argument('--throttle', action='store_true',
+                       help='Background mode: low priority, rate-limited, backs off while the disk is busy')
+        p.add_argument('--trace', metavar='PATH',
+                       help='Record timings and counters: adds timing records, writes a Chrome trace to PATH')
+        p.set_defaults(func=func)
+        if name == 'scan':
+            p.add_argument('--items', action='store_true', help='Include every file in the category records')
+            p.add_argument('--save', metavar='PATH', help='Also save the results to a scan file (.cwscan)')
+        else:
+            p.add_argument('--items', action='store_true', help=argparse.SUPPRESS)
+            p.add_argument('--load', metavar='PATH',
+                           help='Clean a saved scan file instead of scanning (changed files are skipped)')
+            p.add_argument('--dry-run', action='store_true', help='Report what would be cleaned without deleting')
+            p.add_argument('--recycle', action='store_true', help='Send files to the Recycle Bin instead of deleting')
+            p.add_argument('--restore-point', action='store_true',
+                           help='Create a System Restore point first (Admin only)')
+            p.add_argument('--quarantine', action='store_true',
+                           help='Move files into a restorable quarantine session instead of deleting')
+
+    p_quarantine = sub.add_parser('quarantine', help='List, restore or purge quarantined files')
+    _common(p_quarantine)
+    p_quarantine.add_argument('action', choices=['list', 'restore', 'purge'])
+    p_quarantine.add_argument('session', nargs='?', help='Session id to restore')
+    p_quarantine.add_argument('-c', '--category', help='Restore only this category of the session')
+    p_quarantine.add_argument('--older-than-days', type=int, default=None,
+                              help='Purge sessions older than this (default: the retention period)')
+    p_quarantine.set_defaults(func=cmd_quarantine)
+
+    p_schedule = sub.add_parser('schedule', help='Run scheduled cleaning jobs from schedule.json')
+    _common(p_schedule)
+    p_schedule.add_argument('action', choices=['run', 'once', 'status', 'history'],
+                            help='run: stay resident; once: run due jobs and exit (e.g. from Task Scheduler)')
+    p_schedule.add_argument('--poll', type=float, default=60, help='Seconds between checks for due jobs')
+    p_schedule.add_argument('--idle', action='store_true', help='With once: treat the machine as idle')
+    p_schedule.add_argument('--job', action='append', default=[], help='With once: run this job now (repeatable)')
+    p_schedule.add_argument('--limit', type=int, default=20, help='History records to show')
+    p_schedule.set_defaults(func=cmd_schedule)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        return 130
+    except BrokenPipeError:
+        return EXIT_OK
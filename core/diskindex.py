@@ -0,0 +1,446 @@
+"""Compact per-directory disk usage index and file catalog.
+
+Directories are numbered in depth-first pre-order, so every subtree is a
+contiguous id range and files (stored grouped by directory) under a
+folder are a contiguous slice as well. All columns are flat `array`s,
+which keeps a few million entries small and makes saving a straight
+memory copy. Saved indexes are memory-mapped on load: numeric columns
+become views over the file and names are only decoded when asked for.
+
+A second ordering of the files by size makes "everything over N MB" a
+binary search, so changing the size threshold never needs a rescan.
+`refresh()` re-lists only folders whose modification time changed; a
+file rewritten in place without touching its folder keeps its old size
+until that folder changes, is passed in `dirty` (as the change watcher
+does), or the index is rebuilt.
+"""
+import os
+import mmap
+import heapq
+import struct
+import hashlib
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+
+from .utils import get_app_data_dir
+
+MAGIC = b'CWDIDX02'
+HEADER = struct.Struct('<8sII')  # magic, dir count, file count
+
+# (attribute, typecode, length source) in file order
+_COLUMNS = (
+    ('dir_parent', 'i', 'dirs'),
+    ('dir_size', 'Q', 'dirs'),
+    ('dir_total', 'Q', 'dirs'),
+    ('dir_end', 'i', 'dirs'),
+    ('dir_mtime', 'd', 'dirs'),
+    ('file_dir', 'i', 'files'),
+    ('file_size', 'Q', 'files'),
+    ('file_mtime', 'd', 'files'),
+    ('size_order', 'i', 'files'),
+)
+
+
+class _Columns:
+    """Columns for one subtree while it is being walked. Parent -1 marks the subtree root."""
+
+    def __init__(self):
+        self.dir_names = []
+        self.dir_parent = array('i')
+        self.dir_size = array('Q')
+        self.dir_mtime = array('d')
+        self.file_dir = array('i')
+        self.file_size = array('Q')
+        self.file_mtime = array('d')
+        self.file_names = []
+
+    def add_dir(self, name, parent, mtime):
+        self.dir_names.append(name)
+        self.dir_parent.append(parent)
+        self.dir_size.append(0)
+        self.dir_mtime.append(mtime)
+        return len(self.dir_names) - 1
+
+    def add_file(self, dir_id, name, size, mtime):
+        self.file_dir.append(dir_id)
+        self.file_size.append(size)
+        self.file_mtime.append(mtime)
+        self.file_names.append(name)
+        self.dir_size[dir_id] += size
+
+
+def _visit(cols, dir_id, path, old, prev, dirty=None):
+    """Fills in the files of one folder and returns its subfolders to walk.
+
+    When `old` has the folder (`prev`) with the same mtime, its listing is
+    reused instead of reading the folder again, unless the folder's
+    normcased path is in `dirty`.
+    """
+    if (prev is not None and old.dir_mtime[prev] == cols.dir_mtime[dir_id]
+            and not (dirty and os.path.normcase(path) in dirty)):
+        lo, hi = old.own_file_range(prev)
+        for i in range(lo, hi):
+            cols.add_file(dir_id, old.file_names[i], old.file_size[i], old.file_mtime[i])
+        return [(os.path.join(path, old.dir_names[c]), old.dir_names[c], None, c) for c in old.children(prev)]
+
+    known = {}
+    if prev is not None:
+        known = {old.dir_names[c]: c for c in old.children(prev)}
+    children = []
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
+        return children
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                mtime = entry.stat(follow_symlinks=False).st_mtime
+                children.append((entry.path, entry.name, mtime, known.get(entry.name)))
+                continue
+            if entry.is_symlink():
+                continue
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+        cols.add_file(dir_id, entry.name, st.st_size, st.st_mtime)
+    return children
+
+
+def _walk_subtree(path, name, mtime, old=None, prev=None, dirty=None):
+    """Walks one subtree in pre-order into a fresh set of columns."""
+    cols = _Columns()
+    stack = [(path, name, mtime, prev, -1)]
+    while stack:
+        current, current_name, current_mtime, current_prev, parent = stack.pop()
+        if current_mtime is None:
+            try:
+                current_mtime = os.stat(current).st_mtime
+            except OSError:
+                continue
+        dir_id = cols.add_dir(current_name, parent, current_mtime)
+        children = _visit(cols, dir_id, current, old, current_prev, dirty)
+        # Reversed so children pop in listing order
+        for child_path, child_name, child_mtime, child_prev in reversed(children):
+            stack.append((child_path, child_name, child_mtime, child_prev, dir_id))
+    return cols
+
+
+class _Names:
+    """Read-only name list over a mapped blob; entries are decoded on access."""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += len(self)
+        start = self.offsets[idx]
+        end = self.offsets[idx + 1]
+        return bytes(self.blob[start:end]).decode('utf-8', 'surrogateescape')
+
+
+class _SizeKeys:
+    """File sizes in ascending order, as a sequence bisect can search."""
+
+    def __init__(self, index):
+        self.order = index.size_order
+        self.sizes = index.file_size
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, idx):
+        return self.sizes[self.order[idx]]
+
+
+class DiskIndex:
+    def __init__(self, root):
+        self.root = root
+        self.dir_names = []
+        self.dir_parent = array('i')
+        self.dir_size = array('Q')    # bytes of files directly inside
+        self.dir_total = array('Q')   # bytes of the whole subtree
+        self.dir_end = array('i')     # one past the last dir id of the subtree
+        self.dir_mtime = array('d')
+        self.file_dir = array('i')
+        self.file_size = array('Q')
+        self.file_mtime = array('d')
+        self.file_names = []
+        self.size_order = array('i')  # file ids by ascending size
+        self._mapping = None
+        self._views = []
+
+    @classmethod
+    def build(cls, root, workers=None, old=None, dirty=None):
+        """Indexes `root`, walking its top-level folders in parallel.
+
+        With `old`, folders whose mtime is unchanged reuse its listing,
+        except those in the `dirty` set of normcased paths.
+        """
+        index = cls(root)
+        try:
+            mtime = os.stat(root).st_mtime
+        except OSError:
+            mtime = 0.0
+        top = _Columns()
+        top.add_dir(root, -1, mtime)
+        children = _visit(top, 0, root, old, 0 if old is not None and len(old) else None, dirty)
+        index._append(top)
+
+        workers = workers or min(8, (os.cpu_count() or 2) * 2)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parts = [pool.submit(_walk_subtree, path, name, child_mtime, old, prev, dirty)
+                     for path, name, child_mtime, prev in children]
+            # Appending in submission order keeps ids deterministic
+            for part in parts:
+                index._append(part.result())
+        index._finish()
+        return index
+
+    def refresh(self, workers=None, dirty=None):
+        """Returns an up-to-date index, re-listing only folders that changed.
+
+        `dirty` names extra folders to re-list, e.g. from watcher events.
+        """
+        return DiskIndex.build(self.root, workers=workers, old=self, dirty=dirty)
+
+    def _append(self, cols):
+        offset = len(self.dir_names)
+        self.dir_names.extend(cols.dir_names)
+        self.dir_parent.extend(p + offset if p >= 0 else (0 if offset else -1) for p in cols.dir_parent)
+        self.dir_size.extend(cols.dir_size)
+        self.dir_mtime.extend(cols.dir_mtime)
+        self.file_dir.extend(d + offset for d in cols.file_dir)
+        self.file_size.extend(cols.file_size)
+        self.file_mtime.extend(cols.file_mtime)
+        self.file_names.extend(cols.file_names)
+
+    def _finish(self):
+        count = len(self.dir_names)
+        self.dir_total = array('Q', self.dir_size)
+        self.dir_end = array('i', range(1, count + 1))
+        total = self.dir_total
+        end = self.dir_end
+        parent = self.dir_parent
+        # Children always have larger ids than their parent
+        for i in range(count - 1, 0, -1):
+            p = parent[i]
+            total[p] += total[i]
+            if end[i] > end[p]:
+                end[p] = end[i]
+        self.size_order = array('i', sorted(range(len(self.file_size)), key=self.file_size.__getitem__))
+
+    # Queries
+
+    def __len__(self):
+        return len(self.dir_names)
+
+    @property
+    def total_size(self):
+        return self.dir_total[0] if len(self.dir_total) else 0
+
+    def covers(self, path):
+        return self.find_dir(path) is not None
+
+    def path_of(self, dir_id):
+        parts = []
+        while dir_id > 0:
+            parts.append(self.dir_names[dir_id])
+            dir_id = self.dir_parent[dir_id]
+        parts.append(self.root)
+        return os.path.join(*reversed(parts))
+
+    def children(self, dir_id):
+        """Ids of the direct subfolders of `dir_id`."""
+        child = dir_id + 1
+        end = self.dir_end[dir_id]
+        result = []
+        while child < end:
+            result.append(child)
+            child = self.dir_end[child]
+        return result
+
+    def find_dir(self, path):
+        """Returns the id of `path` inside the index, or None."""
+        root = os.path.normcase(os.path.abspath(self.root))
+        target = os.path.normcase(os.path.abspath(path))
+        if target == root:
+            return 0
+        if not target.startswith(root.rstrip(os.sep) + os.sep):
+            return None
+        dir_id = 0
+        for part in target[len(root):].strip(os.sep).split(os.sep):
+            for child in self.children(dir_id):
+                if os.path.normcase(self.dir_names[child]) == part:
+                    dir_id = child
+                    break
+            else:
+                return None
+        return dir_id
+
+    def size_under(self, path):
+        dir_id = self.find_dir(path)
+        return self.dir_total[dir_id] if dir_id is not None else 0
+
+    def top_folders(self, n=20, under=None, max_depth=1):
+        """Largest folders below `under` (default: the root) as (path, total bytes).
+
+        `max_depth=1` ranks direct subfolders; None ranks the whole subtree.
+        """
+        base = 0 if under is None else self.find_dir(under)
+        if base is None:
+            return []
+        if max_depth == 1:
+            candidates = self.children(base)
+        else:
+            depth = {base: 0}
+            candidates = []
+            for i in range(base + 1, self.dir_end[base]):
+                d = depth[self.dir_parent[i]] + 1
+                depth[i] = d
+                if max_depth is None or d <= max_depth:
+                    candidates.append(i)
+        top = heapq.nlargest(n, candidates, key=self.dir_total.__getitem__)
+        return [(self.path_of(i), self.dir_total[i]) for i in top]
+
+    def own_file_range(self, dir_id):
+        """File id range of the files directly inside `dir_id`."""
+        return bisect_left(self.file_dir, dir_id), bisect_left(self.file_dir, dir_id + 1)
+
+    def _file_range(self, dir_id):
+        return bisect_left(self.file_dir, dir_id), bisect_left(self.file_dir, self.dir_end[dir_id])
+
+    def largest_files(self, n=50, under=None):
+        """Largest files below `under` (default: the root) as (path, size)."""
+        base = 0 if under is None else self.find_dir(under)
+        if base is None:
+            return []
+        if base == 0:
+            order = self.size_order
+            return [self.file_path(order[i]) for i in range(len(order) - 1, max(-1, len(order) - 1 - n), -1)]
+        lo, hi = self._file_range(base)
+        top = heapq.nlargest(n, range(lo, hi), key=self.file_size.__getitem__)
+        return [self.file_path(i) for i in top]
+
+    def files_over(self, min_size, under=None, limit=None):
+        """Files strictly larger than `min_size` bytes, largest first, as (path, size)."""
+        order = self.size_order
+        start = bisect_right(_SizeKeys(self), min_size)
+        lo = hi = None
+        if under is not None:
+            base = self.find_dir(under)
+            if base is None:
+                return []
+            if base:
+                lo, hi = self._file_range(base)
+        results = []
+        for i in range(len(order) - 1, start - 1, -1):
+            file_id = order[i]
+            if lo is not None and not lo <= file_id < hi:
+                continue
+            results.append(self.file_path(file_id))
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def file_path(self, file_id):
+        return (
+            os.path.join(self.path_of(self.file_dir[file_id]), self.file_names[file_id]),
+            self.file_size[file_id],
+        )
+
+    def extension(self, file_id):
+        name = self.file_names[file_id]
+        _, dot, ext = name.rpartition('.')
+        return ('.' + ext.lower()) if dot else ''
+
+    # Persistence
+
+    def save(self, path):
+        tmp = path + '.tmp'
+        counts = {'dirs': len(self.dir_names), 'files': len(self.file_names)}
+        with open(tmp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, counts['dirs'], counts['files']))
+            root = self.root.encode('utf-8', 'surrogateescape')
+            f.write(struct.pack('<I', len(root)) + root)
+            _pad(f)
+            for name, _typecode, _count in _COLUMNS:
+                f.write(memoryview(getattr(self, name)).cast('B'))
+                _pad(f)
+            for names in (self.dir_names, self.file_names):
+                encoded = [n.encode('utf-8', 'surrogateescape') for n in names]
+                offsets = array('Q', [0])
+                for item in encoded:
+                    offsets.append(offsets[-1] + len(item))
+                f.write(offsets.tobytes())
+                f.write(b''.join(encoded))
+                _pad(f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """Maps a saved index; columns are views over the file until close()."""
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, dir_count, file_count = HEADER.unpack_from(mm, 0)
+            if magic != MAGIC:
+                raise ValueError(f"Not a disk index: {path}")
+            pos = HEADER.size
+            (root_len,) = struct.unpack_from('<I', mm, pos)
+            pos += 4
+            index = cls(bytes(mm[pos:pos + root_len]).decode('utf-8', 'surrogateescape'))
+            pos = _aligned(pos + root_len)
+            index._mapping = mm
+            counts = {'dirs': dir_count, 'files': file_count}
+            raw = memoryview(mm)
+            index._views.append(raw)
+            for name, typecode, count_key in _COLUMNS:
+                size = array(typecode).itemsize * counts[count_key]
+                view = raw[pos:pos + size].cast(typecode)
+                index._views.append(view)
+                setattr(index, name, view)
+                pos = _aligned(pos + size)
+            for name, count in (('dir_names', dir_count), ('file_names', file_count)):
+                offsets = raw[pos:pos + 8 * (count + 1)].cast('Q')
+                pos += 8 * (count + 1)
+                blob = raw[pos:pos + offsets[count]]
+                index._views.extend((offsets, blob))
+                setattr(index, name, _Names(blob, offsets))
+                pos = _aligned(pos + offsets[count])
+        except Exception:
+            mm.close()
+            raise
+        return index
+
+    def close(self):
+        """Releases the file mapping of a loaded index."""
+        if self._mapping is None:
+            return
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mapping.close()
+        self._mapping = None
+
+
+def _aligned(pos):
+    return (pos + 7) & ~7
+
+
+def _pad(f):
+    extra = f.tell() % 8
+    if extra:
+        f.write(b'\0' * (8 - extra))
+
+
+def default_index_path(root):
+    """Where the index for `root` is kept in the app data folder."""
+    digest = hashlib.sha1(os.path.normcase(os.path.abspath(root)).encode('utf-8', 'surrogateescape'))
+    return os.path.join(get_app_data_dir('indexes'), digest.hexdigest()[:16] + '.idx')
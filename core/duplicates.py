@@ -0,0 +1,210 @@
+"""Duplicate grouping that understands hard links and allocated space.
+
+Paths are grouped by file identity (st_dev, st_ino) first: hard links to
+one inode share their data, so they are never reported as copies of each
+other and each inode is hashed once. Space is counted as allocated bytes
+(st_blocks * 512 where the platform reports blocks) rather than the
+logical size, so sparse and compressed files are not overstated. A copy
+only frees space when every link to it is removed, so inodes with links
+outside the scanned paths are not counted as reclaimable.
+"""
+import os
+import stat
+import filecmp
+import hashlib
+
+from . import instrument
+
+
+def allocated_size(st):
+    """Bytes actually allocated for a file; the logical size where blocks are not reported."""
+    blocks = getattr(st, 'st_blocks', None)
+    if blocks is None:
+        return st.st_size
+    return blocks * 512
+
+
+def file_hash(filepath, block_size=65536):
+    hasher = hashlib.md5()
+    with open(filepath, 'rb') as f:
+        buf = f.read(block_size)
+        while len(buf) > 0:
+            hasher.update(buf)
+            buf = f.read(block_size)
+    return hasher.hexdigest()
+
+
+def _stat(path):
+    try:
+        st = os.stat(path, follow_symlinks=False)
+    except OSError:
+        return None
+    # Not following links, so a symlink shows up as one rather than a regular file
+    return st if stat.S_ISREG(st.st_mode) else None
+
+
+def summarize(paths, key=None):
+    """Describes one group of same-content paths.
+
+    Returns a dict with the existing paths (in input order), logical
+    `size`, `inodes` as lists of paths sharing one file (the one to keep
+    first), total `allocated` bytes, the `reclaimable` bytes from keeping
+    one file, and `linkable` bytes that replacing the others with hard
+    links to it would free.
+    """
+    files = {}  # (st_dev, st_ino) -> [paths, allocated, nlink]
+    present = []
+    size = 0
+    for path in paths:
+        st = _stat(path)
+        if st is None:
+            continue
+        present.append(path)
+        size = max(size, st.st_size)
+        entry = files.setdefault((st.st_dev, st.st_ino), [[], allocated_size(st), st.st_nlink])
+        entry[0].append(path)
+
+    # Keeping the most-linked file costs nothing extra
+    ordered = sorted(files.items(), key=lambda kv: (len(kv[1][0]), kv[1][1]), reverse=True)
+    keep_dev = ordered[0][0][0] if ordered else None
+    reclaimable = 0
+    linkable = 0
+    for ident, (inode_paths, alloc, nlink) in ordered[1:]:
+        if nlink > len(inode_paths):
+            # Linked from outside the group; removing these paths frees nothing
+            continue
+        reclaimable += alloc
+        if ident[0] == keep_dev:
+            linkable += alloc
+    return {
+        'hash': key,
+        'size': size,
+        'paths': present,
+        'inodes': [inode_paths for _ident, (inode_paths, _a, _n) in ordered],
+        'allocated': sum(alloc for _ident, (_p, alloc, _n) in ordered),
+        'reclaimable': reclaimable,
+        'linkable': linkable,
+    }
+
+
+def find_duplicate_groups(search_path, min_size=1024):
+    """Groups files with identical content, hashing each inode once.
+
+    Groups whose paths are all links to a single file are left out, since
+    there is nothing to reclaim. Largest reclaimable groups come first.
+    """
+    rec = instrument.active()
+    size_groups = {}  # size -> {(dev, ino): [paths]}
+    stats = 0
+    with instrument.span('duplicates: walk', root=search_path):
+        for root, _dirs, files in os.walk(search_path):
+            for name in files:
+                filepath = os.path.join(root, name)
+                st = _stat(filepath)
+                stats += 1
+                if st is None or st.st_size < min_size:
+                    continue
+                size_groups.setdefault(st.st_size, {}).setdefault((st.st_dev, st.st_ino), []).append(filepath)
+
+    by_hash = {}
+    hashed = hashed_bytes = 0
+    with instrument.span('duplicates: hash'):
+        for size, inodes in size_groups.items():
+            if len(inodes) < 2:
+                continue
+            for inode_paths in inodes.values():
+                try:
+                    digest = file_hash(inode_paths[0])
+                except OSError as e:
+                    if rec is not None:
+                        rec.error(e, 'hash')
+                    continue
+                hashed += 1
+                hashed_bytes += size
+                by_hash.setdefault(digest, []).append(inode_paths)
+    if rec is not None:
+        rec.count('stat calls', stats)
+        rec.count('files hashed', hashed)
+        rec.count('bytes hashed', hashed_bytes)
+
+    groups = []
+    for digest, inode_lists in by_hash.items():
+        if len(inode_lists) < 2:
+            continue
+        groups.append(summarize([p for paths in inode_lists for p in paths], key=digest))
+    groups.sort(key=lambda g: g['reclaimable'], reverse=True)
+    return groups
+
+
+def link_duplicates(paths, keep=None):
+    """Replaces copies of `keep` (default: the first path) with hard links to it.
+
+    Each copy is byte-compared with `keep` right before it is swapped, and
+    the swap is a link to a temporary name followed by an atomic rename,
+    so every path stays present throughout. Copies on another volume are
+    skipped. Returns (linked count, bytes freed, errors).
+    """
+    keep = keep or paths[0]
+    keep_st = _stat(keep)
+    if keep_st is None:
+        return 0, 0, [f"{keep}: not found"]
+    linked = 0
+    freed = 0
+    errors = []
+    for path in paths:
+        if path == keep:
+            continue
+        st = _stat(path)
+        if st is None:
+            continue
+        if (st.st_dev, st.st_ino) == (keep_st.st_dev, keep_st.st_ino):
+            continue
+        if st.st_dev != keep_st.st_dev:
+            errors.append(f"{path}: on a different volume")
+            continue
+        tmp = f"{path}.cwlink"
+        try:
+            if st.st_size != keep_st.st_size or not filecmp.cmp(keep, path, shallow=False):
+                errors.append(f"{path}: content changed")
+                continue
+            os.link(keep, tmp)
+        except OSError as e:
+            errors.append(f"{path}: {e}")
+            continue
+        try:
+            os.replace(tmp, path)
+        except OSError as e:
+            errors.append(f"{path}: {e}")
+            # Only our own temporary link is removed; the copy is untouched
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            continue
+        linked += 1
+        if st.st_nlink == 1:
+            freed += allocated_size(st)
+    return linked, freed, errors
+
+
+def annotate_files(files):
+    """Adds allocated bytes and hard-link info to (path, size) pairs.
+
+    Returns (path, size, allocated, first_path) tuples, where first_path
+    is the earlier path that is the same file, or None. Allocated bytes
+    of such repeats are 0, as they take no extra space.
+    """
+    seen = {}
+    annotated = []
+    for path, size in files:
+        st = _stat(path)
+        if st is None:
+            annotated.append((path, size, size, None))
+            continue
+        ident = (st.st_dev, st.st_ino)
+        first = seen.setdefault(ident, path)
+        if first != path:
+            annotated.append((path, size, 0, first))
+        else:
+            annotated.append((path, size, allocated_size(st), None))
+    return annotated
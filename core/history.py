@@ -0,0 +1,241 @@
+import os
+import math
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+
+from .utils import get_app_data_dir
+
+# ts, cpu, ram, disk, disk_used, sample count; an average no sample had is NaN
+RECORD = struct.Struct('<d3fQI')
+AVERAGED = ('cpu', 'ram', 'disk')
+
+# name -> (bucket width in seconds, records kept on disk)
+TIERS = {
+    '1m': (60, 14 * 24 * 60),
+    '1h': (3600, 400 * 24),
+    '1d': (86400, 10 * 366),
+}
+TIER_ORDER = ('1m', '1h', '1d')
+
+# Files are compacted once they grow this much past their retention
+COMPACT_SLACK = 1.25
+
+
+class _Bucket:
+    def __init__(self, start):
+        self.start = start
+        self.count = 0
+        # Per field, since a sample may lack one (psutil failed, no drive selected)
+        self.totals = dict.fromkeys(AVERAGED, 0.0)
+        self.counts = dict.fromkeys(AVERAGED, 0)
+        self.disk_used = 0
+        # Whether flush() already wrote this bucket as the file's last record
+        self.on_disk = False
+
+    def add(self, cpu, ram, disk, disk_used, count=1):
+        for name, value in zip(AVERAGED, (cpu, ram, disk)):
+            # None from a sample, NaN from a stored record: not part of the average
+            if value is not None and not math.isnan(value):
+                self.totals[name] += value * count
+                self.counts[name] += count
+        self.disk_used = disk_used or self.disk_used
+        self.count += count
+
+    def average(self, name):
+        n = self.counts[name]
+        return self.totals[name] / n if n else math.nan
+
+    def averages(self):
+        return [self.average(name) for name in AVERAGED]
+
+    def pack(self):
+        return RECORD.pack(self.start, *self.averages(), self.disk_used, self.count)
+
+
+class MetricsHistory:
+    """Append-only store of metric rollups at 1 minute, 1 hour and 1 day resolution.
+
+    Each tier is a flat file of fixed-size records in time order, so queries
+    can memory-map it and binary-search the time range. Minute buckets roll
+    into hours and hours into days as they close, and each file is trimmed
+    back to its retention once it grows past it. flush() writes the open
+    minute early (on exit); the next run picks that record up again and
+    keeps filling it.
+    """
+
+    def __init__(self, directory=None, tiers=None):
+        self.directory = directory or get_app_data_dir('history')
+        os.makedirs(self.directory, exist_ok=True)
+        self.tiers = dict(TIERS)
+        if tiers:
+            self.tiers.update(tiers)
+        self._buckets = {}
+        self._repair()
+        self._resume()
+        self._recover()
+
+    def _path(self, tier):
+        return os.path.join(self.directory, f"metrics_{tier}.bin")
+
+    def _record_count(self, tier):
+        try:
+            return os.path.getsize(self._path(tier)) // RECORD.size
+        except OSError:
+            return 0
+
+    def _repair(self):
+        # Drop records torn by a crash mid-write
+        for tier in TIER_ORDER:
+            path = self._path(tier)
+            if not os.path.exists(path):
+                continue
+            size = os.path.getsize(path)
+            if size % RECORD.size:
+                with open(path, 'r+b') as f:
+                    f.truncate(size - size % RECORD.size)
+
+    def _resume(self):
+        # The newest minute may have been written early by flush(); reopen it so
+        # it is rewritten, and rolled up, once it closes
+        tier = TIER_ORDER[0]
+        last = self._read_records(tier, limit=1)
+        if last:
+            start, cpu, ram, disk, disk_used, count = last[-1]
+            bucket = self._buckets[tier] = _Bucket(start)
+            bucket.add(cpu, ram, disk, disk_used, count)
+            bucket.on_disk = True
+
+    def _recover(self):
+        # Rebuild the open hour/day buckets from lower tiers written by a previous run
+        for lower, upper in zip(TIER_ORDER, TIER_ORDER[1:]):
+            width = self.tiers[upper][0]
+            last = self._read_records(upper, limit=1)
+            since = last[-1][0] + width if last else None
+            # An open lower bucket is rolled up when it closes, not now
+            end = self._buckets[lower].start if lower in self._buckets else None
+            for rec in self._read_records(lower, start=since, end=end):
+                self._add_to(upper, *rec, cascade=False)
+
+    def flush(self):
+        """Writes the open minute so an exit does not lose it.
+
+        Hours and days are not written; the next run rebuilds them from the
+        minutes on disk.
+        """
+        bucket = self._buckets.get(TIER_ORDER[0])
+        if bucket is not None and bucket.count:
+            self._write(TIER_ORDER[0], bucket)
+            bucket.on_disk = True
+
+    def add(self, sample):
+        """Feeds one raw sample from the sampler into the minute tier."""
+        if 'cpu' not in sample and 'disk' not in sample:
+            return
+        self._add_to(
+            TIER_ORDER[0],
+            sample['ts'],
+            sample.get('cpu'),
+            sample.get('ram'),
+            sample.get('disk'),
+            sample.get('disk_used', 0),
+        )
+
+    def _add_to(self, tier, ts, cpu, ram, disk, disk_used, count=1, cascade=True):
+        width = self.tiers[tier][0]
+        start = ts - (ts % width)
+        bucket = self._buckets.get(tier)
+        if bucket is not None and bucket.start != start:
+            self._flush(tier, bucket, cascade)
+            bucket = None
+        if bucket is None:
+            bucket = self._buckets[tier] = _Bucket(start)
+        bucket.add(cpu, ram, disk, disk_used, count)
+
+    def _write(self, tier, bucket):
+        if not bucket.on_disk:
+            with open(self._path(tier), 'ab') as f:
+                f.write(bucket.pack())
+            return
+        # Replace the record flush() wrote for this bucket
+        with open(self._path(tier), 'r+b') as f:
+            f.seek(-RECORD.size, os.SEEK_END)
+            f.write(bucket.pack())
+
+    def _flush(self, tier, bucket, cascade=True):
+        self._write(tier, bucket)
+        idx = TIER_ORDER.index(tier)
+        if cascade and idx + 1 < len(TIER_ORDER):
+            self._add_to(TIER_ORDER[idx + 1], bucket.start, *bucket.averages(), bucket.disk_used, bucket.count)
+        self._enforce_retention(tier)
+
+    def _enforce_retention(self, tier):
+        keep = self.tiers[tier][1]
+        count = self._record_count(tier)
+        if count <= keep * COMPACT_SLACK:
+            return
+        path = self._path(tier)
+        with open(path, 'rb') as f:
+            f.seek((count - keep) * RECORD.size)
+            data = f.read(keep * RECORD.size)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            # A reader still has the file mapped; try again on the next flush
+            os.remove(tmp)
+
+    def _read_records(self, tier, start=None, end=None, limit=None):
+        count = self._record_count(tier)
+        if not count:
+            return []
+        with open(self._path(tier), 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                keys = _TimestampView(mm, count)
+                lo = bisect_left(keys, start) if start is not None else 0
+                hi = bisect_left(keys, end) if end is not None else count
+                if limit is not None:
+                    lo = max(lo, hi - limit)
+                return list(RECORD.iter_unpack(mm[lo * RECORD.size:hi * RECORD.size]))
+
+    def query(self, tier='1h', start=None, end=None):
+        """Returns columns for records with start <= ts < end.
+
+        cpu, ram and disk are NaN for a record none of whose samples had them.
+        Columns are `array.array` instances; they expose the buffer protocol so
+        plotting code can wrap them with `numpy.frombuffer` without copying.
+        """
+        records = self._read_records(tier, start=start, end=end)
+        columns = {
+            'ts': array('d'),
+            'cpu': array('f'),
+            'ram': array('f'),
+            'disk': array('f'),
+            'disk_used': array('Q'),
+            'samples': array('I'),
+        }
+        if records:
+            for name, values in zip(columns, zip(*records)):
+                columns[name].extend(values)
+        return columns
+
+    def disk_footprint(self):
+        return sum(os.path.getsize(self._path(t)) for t in TIER_ORDER if os.path.exists(self._path(t)))
+
+
+class _TimestampView:
+    """Sequence of record timestamps over a mapped file, for bisect."""
+
+    def __init__(self, buf, count):
+        self.buf = buf
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, idx):
+        offset = idx * RECORD.size
+        return struct.unpack_from('<d', self.buf, offset)[0]
@@ -0,0 +1,183 @@
+"""Perceptual image hashes for finding re-encoded or resized copies.
+
+dHash compares neighbouring pixels of a 9x8 thumbnail; pHash keeps the
+signs of the low-frequency DCT terms of a 32x32 thumbnail and survives
+stronger edits. Both give 64-bit hashes, stored packed in an
+`array('Q')`, and two images are similar when their hashes differ in few
+bits. Near matches are found with multi-index hashing, so each lookup
+only compares against hashes sharing an exact bit chunk with it instead
+of against every other hash.
+
+Pillow is imported lazily so the rest of the core works without it.
+"""
+import os
+import math
+from itertools import combinations
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp', '.tif', '.tiff', '.heic'}
+
+_DCT_SIZE = 32
+_DCT_KEEP = 8
+# Rows of the 1-D DCT-II basis, only the low frequencies pHash keeps
+_DCT_ROWS = [
+    [math.cos(math.pi * (2 * x + 1) * u / (2 * _DCT_SIZE)) for x in range(_DCT_SIZE)]
+    for u in range(_DCT_KEEP)
+]
+
+
+def _thumbnail(path, size):
+    from PIL import Image
+    with Image.open(path) as img:
+        # JPEG decoders can scale down while decoding, which is most of the cost
+        img.draft('L', (size[0] * 4, size[1] * 4))
+        return img.convert('L').resize(size, Image.BILINEAR).tobytes()
+
+
+def dhash(path):
+    """64-bit difference hash: is each pixel brighter than its right neighbour."""
+    pixels = _thumbnail(path, (9, 8))
+    value = 0
+    for row in range(8):
+        base = row * 9
+        for col in range(8):
+            value = (value << 1) | (pixels[base + col] > pixels[base + col + 1])
+    return value
+
+
+def phash(path):
+    """64-bit DCT hash: low-frequency terms above their median."""
+    pixels = _thumbnail(path, (_DCT_SIZE, _DCT_SIZE))
+    rows = [pixels[i * _DCT_SIZE:(i + 1) * _DCT_SIZE] for i in range(_DCT_SIZE)]
+    # Separable 2-D DCT limited to the 8x8 corner: columns first, then rows
+    partial = [[sum(b * p for b, p in zip(basis, row)) for basis in _DCT_ROWS] for row in rows]
+    coeffs = []
+    for u in range(_DCT_KEEP):
+        basis = _DCT_ROWS[u]
+        for v in range(_DCT_KEEP):
+            coeffs.append(sum(basis[y] * partial[y][v] for y in range(_DCT_SIZE)))
+    # The DC term only tracks overall brightness
+    median = sorted(coeffs[1:])[len(coeffs[1:]) // 2]
+    value = 0
+    for c in coeffs:
+        value = (value << 1) | (c > median)
+    return value
+
+
+HASHERS = {'dhash': dhash, 'phash': phash}
+
+
+def _hash_one(job):
+    path, method = job
+    try:
+        return HASHERS[method](path)
+    except Exception:
+        # Unreadable, truncated or unsupported images are simply left out
+        return None
+
+
+def list_images(root):
+    paths = []
+    for current, _dirs, files in os.walk(root):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                paths.append(os.path.join(current, name))
+    return paths
+
+
+def hash_images(paths, method='dhash', workers=None, chunksize=64):
+    """Hashes images on a process pool; returns (hashed paths, array('Q') of hashes)."""
+    if method not in HASHERS:
+        raise ValueError(f"Unknown hash method: {method}")
+    jobs = [(path, method) for path in paths]
+    if workers == 1 or len(jobs) < chunksize:
+        values = map(_hash_one, jobs)
+        return _collect(paths, values)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return _collect(paths, pool.map(_hash_one, jobs, chunksize=chunksize))
+
+
+def _collect(paths, values):
+    kept = []
+    hashes = array('Q')
+    for path, value in zip(paths, values):
+        if value is not None:
+            kept.append(path)
+            hashes.append(value)
+    return kept, hashes
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+class MultiIndex:
+    """Exact-match tables over the four 16-bit chunks of 64-bit hashes.
+
+    Two hashes within max_distance bits must have at least one chunk
+    within max_distance // 4 bits of each other (pigeonhole), so a lookup
+    probes each table with its own chunk and the few chunk values that
+    close to it, and only compares against the items found there.
+    """
+    CHUNKS = 4
+    BITS = 16
+
+    def __init__(self, max_distance):
+        self.max_distance = max_distance
+        radius = max_distance // self.CHUNKS
+        self.flips = [0]
+        for count in range(1, radius + 1):
+            for bits in combinations(range(self.BITS), count):
+                self.flips.append(sum(1 << b for b in bits))
+        self.tables = [{} for _ in range(self.CHUNKS)]
+        self.values = {}  # item -> hash
+
+    def __len__(self):
+        return len(self.values)
+
+    def add(self, value, item):
+        for i, table in enumerate(self.tables):
+            table.setdefault((value >> (i * self.BITS)) & 0xFFFF, []).append(item)
+        self.values[item] = value
+
+    def search(self, value):
+        """Returns [(item, distance)] for every stored hash within max_distance."""
+        candidates = set()
+        for i, table in enumerate(self.tables):
+            chunk = (value >> (i * self.BITS)) & 0xFFFF
+            for flip in self.flips:
+                bucket = table.get(chunk ^ flip)
+                if bucket:
+                    candidates.update(bucket)
+        found = []
+        for item in candidates:
+            dist = hamming(value, self.values[item])
+            if dist <= self.max_distance:
+                found.append((item, dist))
+        return found
+
+
+def group_similar(hashes, max_distance=6):
+    """Groups item ids whose hashes chain within max_distance; groups of one are dropped."""
+    parent = list(range(len(hashes)))
+
+    def _find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    index = MultiIndex(max_distance)
+    for item, value in enumerate(hashes):
+        # Only earlier items are indexed, so every pair is looked at once
+        for other, _dist in index.search(value):
+            a, b = _find(item), _find(other)
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+        index.add(value, item)
+
+    groups = {}
+    for item in range(len(hashes)):
+        groups.setdefault(_find(item), []).append(item)
+    return [members for members in groups.values() if len(members) > 1]
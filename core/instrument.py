@@ -0,0 +1,283 @@
+"""Optional timings and counters for scans, cleans and analysis.
+
+Nothing is recorded until enable() installs a Recorder; until then
+span() hands back one shared no-op context manager and the other calls
+return after a single `is None` check, so instrumented code pays next
+to nothing. Hot loops look the recorder up once with active() and keep
+their counts in locals, adding them when they finish.
+
+Metrics are keyed by name and an optional category ('' for the whole
+run), so a report can be given per category:
+
+    rec = instrument.enable()
+    with instrument.span('clean', category='Chrome Cache'):
+        ...
+    instrument.disable()
+    print('\\n'.join(rec.report('Chrome Cache')))
+    rec.export_chrome_trace('clean.trace.json')  # chrome://tracing, Perfetto
+
+Spans also become Chrome trace-event "complete" events. Timestamps are
+time.perf_counter() in microseconds, which is one clock for every
+process on the machine, so events from process-pool workers (sent back
+with state() and merge()) line up with the parent's.
+"""
+import os
+import json
+import time
+import errno
+import threading
+
+# Trace events kept per recorder; later spans still count in the timers
+MAX_EVENTS = 200_000
+
+_active = None
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Histogram:
+    """Power-of-two microsecond buckets: bucket i holds durations below 2**i us."""
+
+    def __init__(self):
+        self.buckets = [0] * 40
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.buckets[min(int(seconds * 1e6).bit_length(), 39)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, buckets, count, total, peak):
+        for i, n in enumerate(buckets):
+            self.buckets[i] += n
+        self.count += count
+        self.total += total
+        self.max = max(self.max, peak)
+
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the pct-th percentile, in seconds."""
+        if not self.count:
+            return 0.0
+        target = self.count * pct / 100
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return min((1 << i) / 1e6, self.max)
+        return self.max
+
+
+class _Span:
+    __slots__ = ('recorder', 'name', 'category', 'args', 'start')
+
+    def __init__(self, recorder, name, category, args):
+        self.recorder = recorder
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder._finish(self, time.perf_counter())
+        return False
+
+
+class Recorder:
+    def __init__(self, max_events=MAX_EVENTS):
+        self.max_events = max_events
+        self.counters = {}    # (category, name) -> int
+        self.timers = {}      # (category, name) -> [calls, seconds, max seconds]
+        self.histograms = {}  # (category, name) -> Histogram
+        self.errors = {}      # (category, operation, errno name) -> count
+        self.events = []
+        self.dropped_events = 0
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def span(self, name, category='', **args):
+        return _Span(self, name, category, args)
+
+    def _finish(self, span, end):
+        elapsed = end - span.start
+        key = (span.category, span.name)
+        with self._lock:
+            timer = self.timers.get(key)
+            if timer is None:
+                self.timers[key] = [1, elapsed, elapsed]
+            else:
+                timer[0] += 1
+                timer[1] += elapsed
+                timer[2] = max(timer[2], elapsed)
+            if len(self.events) < self.max_events:
+                args = dict(span.args, category=span.category) if span.category else span.args
+                self.events.append({
+                    'name': span.name, 'cat': span.category or 'app', 'ph': 'X',
+                    'ts': span.start * 1e6, 'dur': elapsed * 1e6,
+                    'pid': self.pid, 'tid': threading.get_ident(), 'args': args,
+                })
+            else:
+                self.dropped_events += 1
+
+    def count(self, name, n=1, category=''):
+        key = (category, name)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    def observe(self, name, seconds, category=''):
+        key = (category, name)
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = Histogram()
+            hist.add(seconds)
+
+    def error(self, exc, operation, category=''):
+        code = getattr(exc, 'errno', None)
+        label = errno.errorcode.get(code, str(code)) if code is not None else type(exc).__name__
+        key = (category, operation, label)
+        with self._lock:
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def categories(self):
+        """Categories with any metric, in the order first seen; '' (the whole run) excluded."""
+        seen = {}
+        for keys in (self.timers, self.counters, self.histograms, self.errors):
+            for key in keys:
+                if key[0]:
+                    seen.setdefault(key[0], None)
+        return list(seen)
+
+    def metrics(self, category=''):
+        """One category's metrics as plain data (seconds, counts), e.g. for a JSON record."""
+        return {
+            'timers': {name: round(total, 6)
+                       for (cat, name), (_calls, total, _max) in self.timers.items() if cat == category},
+            'counters': {name: value for (cat, name), value in self.counters.items() if cat == category},
+            'latency': {name: {'count': h.count, 'p50': h.percentile(50), 'p99': h.percentile(99), 'max': h.max}
+                        for (cat, name), h in self.histograms.items() if cat == category},
+            'errors': {f"{op} {label}": n for (cat, op, label), n in self.errors.items() if cat == category},
+        }
+
+    def report(self, category=''):
+        """Readable lines for one category ('' for the metrics not tied to one)."""
+        lines = []
+        for (cat, name), (calls, total, peak) in self.timers.items():
+            if cat == category:
+                line = f"{name}: {total * 1000:.1f} ms"
+                if calls > 1:
+                    line += f" over {calls} calls (max {peak * 1000:.1f} ms)"
+                lines.append(line)
+        counts = [f"{name} {value}" for (cat, name), value in self.counters.items() if cat == category]
+        if counts:
+            lines.append(", ".join(counts))
+        for (cat, name), hist in self.histograms.items():
+            if cat == category and hist.count:
+                lines.append(
+                    f"{name}: {hist.count} x, p50 <= {hist.percentile(50) * 1e6:.0f} us, "
+                    f"p99 <= {hist.percentile(99) * 1e6:.0f} us, max {hist.max * 1e6:.0f} us"
+                )
+        errs = [f"{op} {label} x{n}" for (cat, op, label), n in self.errors.items() if cat == category]
+        if errs:
+            lines.append("errors: " + ", ".join(errs))
+        return lines
+
+    def state(self):
+        """Everything recorded, as plain data that pickles (e.g. back from a worker process)."""
+        with self._lock:
+            return {
+                'counters': list(self.counters.items()),
+                'timers': list(self.timers.items()),
+                'histograms': [(key, (h.buckets, h.count, h.total, h.max)) for key, h in self.histograms.items()],
+                'errors': list(self.errors.items()),
+                'events': self.events,
+            }
+
+    def merge(self, state):
+        with self._lock:
+            for key, value in state['counters']:
+                self.counters[key] = self.counters.get(key, 0) + value
+            for key, (calls, total, peak) in state['timers']:
+                timer = self.timers.setdefault(key, [0, 0.0, 0.0])
+                timer[0] += calls
+                timer[1] += total
+                timer[2] = max(timer[2], peak)
+            for key, parts in state['histograms']:
+                self.histograms.setdefault(key, Histogram()).merge(*parts)
+            for key, value in state['errors']:
+                self.errors[key] = self.errors.get(key, 0) + value
+            room = self.max_events - len(self.events)
+            self.events.extend(state['events'][:max(room, 0)])
+            self.dropped_events += max(len(state['events']) - max(room, 0), 0)
+
+    def export_chrome_trace(self, path):
+        """Writes the spans as Chrome trace-event JSON, with the counters as a final counter event."""
+        with self._lock:
+            events = list(self.events)
+            end = max((e['ts'] + e['dur'] for e in events), default=time.perf_counter() * 1e6)
+            totals = {}
+            for (cat, name), value in self.counters.items():
+                totals[f"{cat}: {name}" if cat else name] = value
+        if totals:
+            events.append({'name': 'counters', 'ph': 'C', 'ts': end, 'pid': self.pid, 'tid': 0, 'args': totals})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms',
+                       'otherData': {'dropped_events': self.dropped_events}}, f)
+
+
+def enable(recorder=None):
+    """Starts recording into `recorder` (a new one by default) and returns it."""
+    global _active
+    _active = recorder if recorder is not None else Recorder()
+    return _active
+
+
+def disable():
+    """Stops recording; returns the recorder that was active, if any."""
+    global _active
+    recorder, _active = _active, None
+    return recorder
+
+
+def active():
+    return _active
+
+
+def span(name, category='', **args):
+    recorder = _active
+    if recorder is None:
+        return _NULL_SPAN
+    return recorder.span(name, category, **args)
+
+
+def count(name, n=1, category=''):
+    recorder = _active
+    if recorder is not None:
+        recorder.count(name, n, category)
+
+
+def observe(name, seconds, category=''):
+    recorder = _active
+    if recorder is not None:
+        recorder.observe(name, seconds, category)
+
+
+def error(exc, operation, category=''):
+    recorder = _active
+    if recorder is not None:
+        recorder.error(exc, operation, category)
@@ -0,0 +1,100 @@
+import os
+import time
+from array import array
+
+METRIC_FIELDS = ('cpu', 'ram', 'disk')
+
+
+def list_fixed_drives():
+    """Returns the fixed/removable drives worth monitoring."""
+    import psutil
+    drives = []
+    try:
+        for partition in psutil.disk_partitions():
+            if "fixed" in partition.opts or "removable" in partition.opts:
+                drives.append(partition.device)
+    except Exception:
+        drives.append("C:\\")
+    if not drives:
+        drives.append("C:\\")
+    return sorted(set(drives))
+
+
+def read_system_metrics(drive=None):
+    """Takes one CPU/RAM/disk sample. Missing values are left out of the dict."""
+    import psutil
+    sample = {'ts': time.time()}
+    try:
+        sample['cpu'] = psutil.cpu_percent()
+    except Exception:
+        pass
+    try:
+        sample['ram'] = psutil.virtual_memory().percent
+    except Exception:
+        pass
+    sample.update(read_disk_usage(drive))
+    return sample
+
+
+def read_disk_usage(drive):
+    """{'disk': percent used, 'disk_used': bytes} for one drive; empty when it can't be read."""
+    if not drive:
+        return {}
+    import psutil
+    try:
+        usage = psutil.disk_usage(drive)
+    except Exception:
+        return {}
+    return {'disk': usage.percent, 'disk_used': usage.used}
+
+
+def history_drive(drives):
+    """The drive the long-term history follows: the system drive when it is listed."""
+    system = os.environ.get('SystemDrive', '').rstrip('\\') + '\\'
+    for drive in drives:
+        if drive.upper() == system.upper():
+            return drive
+    return drives[0] if drives else None
+
+
+class MetricsRing:
+    """Fixed-size ring buffer of metric samples stored in flat arrays."""
+
+    def __init__(self, capacity=300):
+        self.capacity = capacity
+        self.ts = array('d', [0.0]) * capacity
+        self.columns = {name: array('d', [0.0]) * capacity for name in METRIC_FIELDS}
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, sample):
+        idx = self._next
+        self.ts[idx] = sample.get('ts', time.time())
+        for name, column in self.columns.items():
+            # Carry the previous value forward when a metric could not be read
+            if name in sample:
+                column[idx] = sample[name]
+            elif self._count:
+                column[idx] = column[(idx - 1) % self.capacity]
+        self._next = (idx + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def latest(self):
+        if not self._count:
+            return {}
+        idx = (self._next - 1) % self.capacity
+        sample = {name: column[idx] for name, column in self.columns.items()}
+        sample['ts'] = self.ts[idx]
+        return sample
+
+    def history(self, name, limit=None):
+        """Returns up to `limit` most recent values of a metric, oldest first."""
+        column = self.ts if name == 'ts' else self.columns[name]
+        count = self._count if limit is None else min(limit, self._count)
+        start = (self._next - count) % self.capacity
+        if start + count <= self.capacity:
+            return column[start:start + count]
+        return column[start:] + column[:self._next]
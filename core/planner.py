@@ -0,0 +1,245 @@
+"""Plans a scan as the smallest set of non-overlapping directory walks.
+
+Category roots often nest inside each other (a user rule for a whole
+browser profile next to the built-in cache rule inside it) or resolve to
+the same folder (TEMP pointing at %SystemRoot%\\Temp when elevated). The
+planner folds every root into the outermost root that contains it, so
+each directory is listed once per scan and each entry is handed to all
+rules whose root is at or above it.
+"""
+import os
+from collections import deque
+
+from . import instrument
+
+# A folder with more files than this is split by file name between shards
+SHARD_FILES = 2048
+
+
+def _norm(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _is_within(path, parent):
+    return path == parent or path.startswith(parent.rstrip(os.sep) + os.sep)
+
+
+def _components(key):
+    # Plain string order puts "a-x" and "a.x" between "a" and "a\\b"
+    return key.rstrip(os.sep).split(os.sep)
+
+
+class Walk:
+    """One directory walk: a top-level root plus the rules attached at or below it."""
+
+    def __init__(self, root, names=None):
+        self.root = root
+        self.targets = {}  # normalised dir -> [rules]
+        self.categories = set()
+        # (first, end) for a shard that only takes the root's files with
+        # first <= name < end (end None: no upper bound) and no subfolders
+        self.names = names
+
+    def add(self, key, rule):
+        rules = self.targets.setdefault(key, [])
+        if rule not in rules:
+            rules.append(rule)
+            self.categories.add(rule.category)
+
+    def __repr__(self):
+        return f"Walk({self.root!r}, targets={len(self.targets)})"
+
+
+def plan_walks(rules, session=None):
+    """Groups the session's resolved rule roots into non-overlapping walks."""
+    if session is None:
+        from .session import ScanSession
+        session = ScanSession()
+    roots = {}  # real root key -> (real path, [rules])
+    for rule in rules:
+        for path in session.resolve_roots(rule):
+            key = session.root_key(path)
+            entry = roots.setdefault(key, (os.path.realpath(path), []))
+            if rule not in entry[1]:
+                entry[1].append(rule)
+
+    walks = []
+    current = None
+    # Sorting by components puts every root directly after any root that contains it
+    for key in sorted(roots, key=_components):
+        path, root_rules = roots[key]
+        if current is None or not _is_within(key, _norm(current.root)):
+            current = Walk(path)
+            walks.append(current)
+        for rule in root_rules:
+            current.add(key, rule)
+    return walks
+
+
+def execute_walk(walk, on_file, visited=None, descend=True):
+    """Walks `walk.root` once, calling on_file(entry, active_rules) for each file.
+
+    `visited` holds (st_dev, st_ino) of directories already listed in this
+    scan, so junctions, bind mounts and directory links never cause a
+    second visit. With descend=False only the root is listed and its
+    subfolders are returned as (path, active_rules) pairs instead.
+    """
+    if visited is None:
+        visited = set()
+    pending = []
+    root_key = _norm(walk.root)
+    try:
+        st = os.stat(walk.root)
+    except OSError:
+        return pending
+    if not os.path.isdir(walk.root):
+        return pending
+    ident = (st.st_dev, st.st_ino)
+    if ident in visited:
+        return pending
+    visited.add(ident)
+
+    rec = instrument.active()
+    stack = [(walk.root, list(walk.targets.get(root_key, ())))]
+    with instrument.span('walk', root=walk.root):
+        _drain(walk, stack, pending, on_file, visited, descend, rec)
+    return pending
+
+
+def _drain(walk, stack, pending, on_file, visited, descend, rec):
+    """execute_walk's loop; with a recorder, counts what it lists and why listing failed."""
+    listed = seen = 0
+    while stack:
+        current, active = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = list(it)
+        except OSError as e:
+            if rec is not None:
+                rec.error(e, 'scandir')
+            continue
+        listed += 1
+        seen += len(entries)
+        if walk.names is not None:
+            first, end = walk.names
+            entries = [e for e in entries if first <= e.name and (end is None or e.name < end)]
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                if walk.names is not None:
+                    continue
+                if getattr(entry, 'is_junction', None) and entry.is_junction():
+                    continue
+                try:
+                    # DirEntry.stat() leaves st_ino/st_dev at 0 on Windows
+                    dst = os.stat(entry.path, follow_symlinks=False)
+                except OSError as e:
+                    if rec is not None:
+                        rec.error(e, 'stat')
+                    continue
+                ident = (dst.st_dev, dst.st_ino)
+                if ident in visited:
+                    continue
+                visited.add(ident)
+                extra = walk.targets.get(_norm(entry.path)) if len(walk.targets) > 1 else None
+                if extra:
+                    child_active = active + [r for r in extra if r not in active]
+                else:
+                    child_active = active
+                if descend:
+                    stack.append((entry.path, child_active))
+                else:
+                    pending.append((entry.path, child_active))
+            elif active:
+                try:
+                    # Links to directories are neither walked nor cleaned
+                    if entry.is_symlink() and entry.is_dir():
+                        continue
+                except OSError:
+                    continue
+                on_file(entry, active)
+    if rec is not None:
+        rec.count('dirs listed', listed)
+        rec.count('entries seen', seen)
+
+
+def shard_walk(walk, on_file, visited=None, min_shards=1, chunk=SHARD_FILES, slices=None):
+    """Handles the files near walk.root and returns Walks for the rest.
+
+    Each returned walk starts with the rules active at its root, so the
+    subtrees can be walked independently, e.g. in other processes. The
+    root is always listed here; subfolders are then listed level by level
+    until there are `min_shards` walks or nothing left to split. Files of
+    a listed folder are matched here, unless there are more than `chunk`
+    of them: those are handed out as at most `slices` ranges of names
+    instead (every slice lists the whole folder again, so no more than
+    there are workers).
+    """
+    shards = []
+    pending = deque([walk])
+    while pending and (pending[0] is walk or len(shards) + len(pending) < min_shards):
+        current = pending.popleft()
+        files = []
+        # Below the root the folder itself is already in `visited`
+        subdirs = execute_walk(current, lambda entry, active: files.append((entry, active)),
+                               visited if current is walk else None, descend=False)
+        shards.extend(_split_files(current, files, on_file, chunk, slices))
+        pending.extend(_subtree(current, path, active) for path, active in subdirs)
+    return shards + list(pending)
+
+
+def _subtree(walk, path, active):
+    shard = Walk(path)
+    key = _norm(path)
+    for rule in active:
+        shard.add(key, rule)
+    for target, rules in walk.targets.items():
+        if target != key and _is_within(target, key):
+            for rule in rules:
+                shard.add(target, rule)
+    return shard
+
+
+def _split_files(walk, files, on_file, chunk, slices):
+    if len(files) <= chunk:
+        for entry, active in files:
+            on_file(entry, active)
+        return []
+    if slices:
+        chunk = max(chunk, -(-len(files) // slices))
+    # Every file in one folder has the same rules
+    active = files[0][1]
+    key = _norm(walk.root)
+    names = sorted(entry.name for entry, _ in files)
+    # Open-ended first and last ranges also take files created since the listing
+    bounds = [''] + names[chunk::chunk] + [None]
+    shards = []
+    for first, end in zip(bounds, bounds[1:]):
+        shard = Walk(walk.root, names=(first, end))
+        for rule in active:
+            shard.add(key, rule)
+        shards.append(shard)
+    return shards
+
+
+def rules_for_path(walks, path):
+    """The rules a walk would hand the file at `path` to; [] when no walk covers it."""
+    key = _norm(path)
+    for walk in walks:
+        root = _norm(walk.root)
+        if key == root or not _is_within(key, root):
+            continue
+        active = []
+        parent = os.path.dirname(key)
+        while True:
+            for rule in walk.targets.get(parent, ()):
+                if rule not in active:
+                    active.append(rule)
+            if len(parent) <= len(root):
+                break
+            parent = os.path.dirname(parent)
+        return active
+    return []
@@ -0,0 +1,249 @@
+"""Undoable removal by renaming files into a staging folder on their own volume.
+
+send2trash goes through the shell for every file, and the Recycle Bin
+cannot give back "everything Chrome Cache lost on Tuesday". Quarantine
+renames each file instead, which on the same volume only rewrites
+directory entries, into a per-session folder:
+
+    <app data>/quarantine/<session>/manifest.jsonl   what was staged
+    <app data>/quarantine/<session>/files/           staged files on the app data volume
+    <volume root>/.CleanerQuarantine/<session>/      staged files on any other volume
+
+The manifest starts with a header line and then holds one
+`[category, size, staged path, original path]` JSON array per file, so a
+whole session or one category of it can be moved back in one go.
+Sessions older than the retention period are deleted by purge(), usually
+on a low-priority thread started with start_purge().
+"""
+import os
+import json
+import time
+import errno
+import shutil
+import threading
+
+from .throttle import lower_thread_priority
+from .utils import get_app_data_dir
+
+MANIFEST = "manifest.jsonl"
+VOLUME_DIR = ".CleanerQuarantine"
+RETENTION_DAYS = 7
+
+
+class QuarantineUnavailable(OSError):
+    """A file's volume has no usable staging folder."""
+
+
+def _mount_point(path):
+    path = os.path.abspath(path)
+    while not os.path.ismount(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+
+class QuarantineSession:
+    """Stages files for one clean; use as a context manager or call close()."""
+
+    def __init__(self, quarantine, session_id, now):
+        self.quarantine = quarantine
+        self.id = session_id
+        self.path = os.path.join(quarantine.directory, session_id)
+        os.makedirs(os.path.join(self.path, "files"))
+        self._home_dev = os.stat(self.path).st_dev
+        self._stages = {}
+        self._count = 0
+        self.items = 0
+        self.size = 0
+        self._manifest = open(os.path.join(self.path, MANIFEST), "w", encoding="utf-8")
+        self._manifest.write(json.dumps({"session": session_id, "created": now}) + "\n")
+        # On disk before the first file moves, so a crash never leaves files without a session
+        self._manifest.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    def _stage_dir(self, dev, path):
+        stage = self._stages.get(dev)
+        if stage is None:
+            if dev == self._home_dev:
+                stage = os.path.join(self.path, "files")
+            else:
+                stage = os.path.join(_mount_point(path), VOLUME_DIR, self.id)
+                try:
+                    os.makedirs(stage, exist_ok=True)
+                except OSError:
+                    stage = ""
+            self._stages[dev] = stage
+        if not stage:
+            raise QuarantineUnavailable(f"No staging folder on the volume of {path}")
+        return stage
+
+    def stage(self, path, category=""):
+        """Moves `path` into the session and returns its size."""
+        st = os.stat(path)
+        staged = os.path.join(self._stage_dir(st.st_dev, path), format(self._count, "x"))
+        self._count += 1
+        # The entry goes to disk before the rename, so a crash can't strand the file
+        # without its original path; it is taken back out if the rename fails
+        end = self._manifest.tell()
+        self._manifest.write(json.dumps([category, st.st_size, staged, path]) + "\n")
+        self._manifest.flush()
+        try:
+            os.rename(path, staged)
+        except OSError as e:
+            self._manifest.seek(end)
+            self._manifest.truncate()
+            if e.errno == errno.EXDEV:
+                # Same st_dev but another mount (bind mounts, some btrfs and overlay setups)
+                raise QuarantineUnavailable(f"{path} is on another mount than its staging folder") from e
+            raise
+        self.items += 1
+        self.size += st.st_size
+        return st.st_size
+
+    def close(self):
+        if self._manifest.closed:
+            return
+        self._manifest.close()
+        if not self.items:
+            self.quarantine._remove(self.id, [])
+
+
+class Quarantine:
+    def __init__(self, directory=None, retention_days=RETENTION_DAYS):
+        self.directory = directory or get_app_data_dir("quarantine")
+        os.makedirs(self.directory, exist_ok=True)
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+
+    def begin(self, now=None):
+        """Starts a new session; ids sort by creation time."""
+        now = time.time() if now is None else now
+        base = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+        with self._lock:
+            suffix = 0
+            session_id = base
+            while os.path.exists(os.path.join(self.directory, session_id)):
+                suffix += 1
+                session_id = f"{base}-{suffix}"
+            return QuarantineSession(self, session_id, now)
+
+    def _read(self, session_id):
+        """Returns (header, entries) of a session's manifest."""
+        with open(os.path.join(self.directory, session_id, MANIFEST), "r", encoding="utf-8") as f:
+            header = json.loads(f.readline() or "{}")
+            entries = []
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # A line cut short by a crash mid-write
+                    continue
+        return header, entries
+
+    def _write(self, session_id, header, entries):
+        path = os.path.join(self.directory, session_id, MANIFEST)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(json.dumps(header) + "\n")
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+        os.replace(path + ".tmp", path)
+
+    def sessions(self):
+        """Sessions oldest first, each {'id', 'created', 'items', 'size', 'categories': {cat: (items, size)}}.
+
+        'created' is None for a session whose header cannot be read.
+        """
+        found = []
+        for name in sorted(os.listdir(self.directory)):
+            try:
+                header, entries = self._read(name)
+            except (OSError, ValueError):
+                continue
+            categories = {}
+            for category, size, _staged, _original in entries:
+                items, total = categories.get(category, (0, 0))
+                categories[category] = (items + 1, total + size)
+            found.append({
+                "id": name,
+                "created": header.get("created"),
+                "items": len(entries),
+                "size": sum(size for _items, size in categories.values()),
+                "categories": categories,
+            })
+        return found
+
+    def restore(self, session_id, category=None):
+        """Moves a session's files (or one category's) back; returns (count, size, errors).
+
+        A file whose original path has been taken again stays quarantined.
+        """
+        with self._lock:
+            header, entries = self._read(session_id)
+            count = 0
+            size = 0
+            errors = []
+            remaining = []
+            for entry in entries:
+                cat, item_size, staged, original = entry
+                if category is not None and cat != category:
+                    remaining.append(entry)
+                    continue
+                try:
+                    if os.path.lexists(original):
+                        raise FileExistsError(f"{original} exists")
+                    os.makedirs(os.path.dirname(original), exist_ok=True)
+                    os.rename(staged, original)
+                    count += 1
+                    size += item_size
+                except OSError as e:
+                    errors.append(f"Failed to restore {original}: {e}")
+                    remaining.append(entry)
+            if remaining:
+                self._write(session_id, header, remaining)
+            else:
+                self._remove(session_id, entries)
+        return count, size, errors
+
+    def _remove(self, session_id, entries):
+        stages = {os.path.dirname(staged) for _cat, _size, staged, _original in entries}
+        for stage in stages:
+            shutil.rmtree(stage, ignore_errors=True)
+        shutil.rmtree(os.path.join(self.directory, session_id), ignore_errors=True)
+
+    def purge(self, older_than_days=None, now=None):
+        """Deletes sessions older than the retention period; returns (sessions, bytes freed)."""
+        days = self.retention_days if older_than_days is None else older_than_days
+        cutoff = (time.time() if now is None else now) - days * 86400
+        removed = 0
+        freed = 0
+        for session in self.sessions():
+            # Without a creation time there is no telling its age, so it is kept
+            if session["created"] is None or session["created"] > cutoff:
+                continue
+            with self._lock:
+                try:
+                    _header, entries = self._read(session["id"])
+                except (OSError, ValueError):
+                    continue
+                self._remove(session["id"], entries)
+            removed += 1
+            freed += session["size"]
+        return removed, freed
+
+    def start_purge(self, older_than_days=None):
+        """Runs purge() on a daemon thread at idle priority."""
+        def _run():
+            lower_thread_priority()
+            self.purge(older_than_days)
+
+        thread = threading.Thread(target=_run, name="QuarantinePurge", daemon=True)
+        thread.start()
+        return thread
+
@@ -0,0 +1,201 @@
+"""Recycle Bin listing straight from the $Recycle.Bin metadata files.
+
+Every deleted item is a pair in a per-user (SID) folder of a drive's
+$Recycle.Bin, and the scan roots are the current user's folders:
+`$R<id><ext>` holds the data (a file or a whole folder) and
+`$I<id><ext>` a small header with the original size, deletion time and
+original path. Reading the headers in bulk avoids a shell round-trip
+per item, and the deletion time lets the age filter apply to the bin.
+
+    version 1 (Vista to 8.1): int64 version, int64 size, FILETIME, 260 UTF-16 chars
+    version 2 (Windows 10+):  int64 version, int64 size, FILETIME, uint32 length, UTF-16 chars
+"""
+import os
+import sys
+import struct
+import string
+import time
+from functools import lru_cache
+
+from .ages import AgeIndex
+
+_HEADER = struct.Struct('<qqQ')
+_LENGTH = struct.Struct('<I')
+_V1_PATH_BYTES = 520
+# Seconds between 1601-01-01 (FILETIME epoch) and 1970-01-01
+_FILETIME_EPOCH = 11644473600
+
+
+class RecycledItem:
+    __slots__ = ('data_path', 'info_path', 'original', 'size', 'deleted')
+
+    def __init__(self, data_path, info_path, original, size, deleted):
+        self.data_path = data_path
+        self.info_path = info_path
+        self.original = original
+        self.size = size
+        self.deleted = deleted
+
+
+def parse_info(data):
+    """Parses a $I header; returns (size, deletion time as a Unix timestamp, original path)."""
+    if len(data) < _HEADER.size:
+        raise ValueError("Truncated $I header")
+    version, size, filetime = _HEADER.unpack_from(data)
+    offset = _HEADER.size
+    if version == 1:
+        raw = data[offset:offset + _V1_PATH_BYTES]
+    elif version == 2:
+        if len(data) < offset + _LENGTH.size:
+            raise ValueError("Truncated $I header")
+        (length,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        raw = data[offset:offset + length * 2]
+    else:
+        raise ValueError(f"Unknown $I version: {version}")
+    if len(raw) % 2:
+        raise ValueError("Truncated $I path")
+    original = raw.decode('utf-16-le').split('\0', 1)[0]
+    deleted = filetime / 10_000_000 - _FILETIME_EPOCH if filetime else 0.0
+    return size, deleted, original
+
+
+def build_info(size, deleted, original, version=2):
+    """The $I header bytes for an item; the inverse of parse_info."""
+    filetime = int((deleted + _FILETIME_EPOCH) * 10_000_000)
+    path = (original + '\0').encode('utf-16-le')
+    header = _HEADER.pack(version, size, filetime)
+    if version == 1:
+        return header + path[:_V1_PATH_BYTES].ljust(_V1_PATH_BYTES, b'\0')
+    return header + _LENGTH.pack(len(path) // 2) + path
+
+
+def info_path_for(data_path):
+    folder, name = os.path.split(data_path)
+    return os.path.join(folder, '$I' + name[2:])
+
+
+@lru_cache(maxsize=None)
+def current_user_sid():
+    """SID of the user running the app (names its $Recycle.Bin folders), or None if unknown."""
+    if sys.platform != 'win32':
+        return None
+    import csv
+    import subprocess
+    try:
+        result = subprocess.run(["whoami", "/user", "/fo", "csv", "/nh"], capture_output=True, text=True,
+                                timeout=10, creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0))
+        row = next(csv.reader(result.stdout.splitlines()))
+    except (OSError, subprocess.SubprocessError, StopIteration):
+        return None
+    sid = row[-1].strip() if row else ''
+    return sid if sid.startswith('S-') else None
+
+
+def default_roots(drives=None, sid=None):
+    """The current user's folders in the local drives' $Recycle.Bin; none outside Windows.
+
+    An elevated process could list every user's SID folder, but only the
+    current user's items are theirs to empty.
+    """
+    if drives is None:
+        if sys.platform != 'win32':
+            return []
+        if hasattr(os, 'listdrives'):
+            drives = os.listdrives()
+        else:
+            drives = [f"{letter}:\\" for letter in string.ascii_uppercase]
+    sid = sid or current_user_sid()
+    if not sid:
+        return []
+    roots = []
+    for drive in drives:
+        path = os.path.join(drive, '$Recycle.Bin', sid)
+        if os.path.isdir(path):
+            roots.append(path)
+    return roots
+
+
+def _info_files(root):
+    """$I files directly in a per-user bin folder."""
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                try:
+                    if entry.name.startswith('$I') and entry.is_file(follow_symlinks=False):
+                        yield entry.path
+                except OSError:
+                    continue
+    except OSError:
+        return
+
+
+def list_items(roots):
+    """Yields a RecycledItem per $I/$R pair; orphaned or unreadable headers are skipped."""
+    for root in roots:
+        for info_path in _info_files(root):
+            folder, name = os.path.split(info_path)
+            data_path = os.path.join(folder, '$R' + name[2:])
+            if not os.path.lexists(data_path):
+                continue
+            try:
+                with open(info_path, 'rb') as f:
+                    size, deleted, original = parse_info(f.read(_HEADER.size + _LENGTH.size + 64 * 1024))
+            except (OSError, ValueError, UnicodeDecodeError):
+                continue
+            yield RecycledItem(data_path, info_path, original, size, deleted)
+
+
+def scan(roots, min_age_days=None, now=None):
+    """Scan result for the bin. Items are the $R paths, with the original path alongside."""
+    now = time.time() if now is None else now
+    cutoff = now - min_age_days * 86400 if min_age_days else None
+    ages = AgeIndex(now)
+    result = {'files': [], 'items': [], 'size': 0, 'skipped_recent': 0, 'skipped_recent_size': 0,
+              'retained': 0, 'retained_size': 0, 'ages': ages}
+    for item in list_items(roots):
+        ages.add(item.deleted, item.size, item.data_path, {'original': item.original, 'deleted': item.deleted})
+        if cutoff is not None and item.deleted > cutoff:
+            result['skipped_recent'] += 1
+            result['skipped_recent_size'] += item.size
+            continue
+        result['files'].append(item.data_path)
+        result['items'].append({'path': item.data_path, 'size': item.size,
+                                'original': item.original, 'deleted': item.deleted})
+        result['size'] += item.size
+    return result
+
+
+def purge(items):
+    """Permanently removes scanned bin items ($R data and its $I header).
+
+    Returns (removed count, bytes, errors, removed originals).
+    """
+    import shutil
+    removed = 0
+    freed = 0
+    errors = []
+    originals = []
+    for item in items:
+        data_path = item['path']
+        try:
+            if os.path.isdir(data_path) and not os.path.islink(data_path):
+                shutil.rmtree(data_path)
+            elif os.path.lexists(data_path):
+                os.remove(data_path)
+            else:
+                continue
+        except OSError as e:
+            errors.append(f"Failed to delete {data_path}: {e}")
+            continue
+        try:
+            os.remove(info_path_for(data_path))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # The bin shows a broken entry until the header is gone too
+            errors.append(f"Failed to delete {info_path_for(data_path)}: {e}")
+        removed += 1
+        freed += item.get('size', 0)
+        originals.append(item.get('original', data_path))
+    return removed, freed, errors, originals
@@ -0,0 +1,85 @@
+"""Finished results handed from worker threads to views by handle.
+
+Qt signals declared with `dict` or `list` convert the whole structure to
+QVariant and back for the receiving thread, which for a scan with a
+million paths stalls the UI for seconds right as the scan ends. Workers
+put their result here instead and emit only the integer handle and a
+small summary; views read what they display, a page at a time, from the
+stored objects themselves. A stored result is not modified by the
+worker once it has been put.
+"""
+import threading
+import itertools
+
+from .ages import age_summary
+
+
+class ResultStore:
+    """Thread-safe handle -> result registry."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results = {}
+        self._handles = itertools.count(1)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._results)
+
+    def put(self, result):
+        with self._lock:
+            handle = next(self._handles)
+            self._results[handle] = result
+            return handle
+
+    def get(self, handle, default=None):
+        with self._lock:
+            return self._results.get(handle, default)
+
+    def page(self, handle, keys=(), start=0, count=200):
+        """Returns (slice, total length) of the sequence at result[keys[0]][keys[1]]...
+
+        A missing handle or key reads as an empty sequence.
+        """
+        value = self.get(handle)
+        try:
+            for key in keys:
+                value = value[key]
+        except (KeyError, IndexError, TypeError):
+            return [], 0
+        if value is None:
+            return [], 0
+        return value[start:start + count], len(value)
+
+    def release(self, handle):
+        """Drops a result the view no longer shows; unknown handles are ignored."""
+        with self._lock:
+            self._results.pop(handle, None)
+
+
+# Shared by the GUI workers and views
+STORE = ResultStore()
+
+
+def scan_summary(results, min_age_days=None):
+    """Per-category counts and sizes of scan results, small enough to send with a signal.
+
+    With `min_age_days`, categories that carry an age index (see ages.py)
+    are counted under that threshold instead of the one they were scanned with.
+    """
+    summary = {}
+    for cat, data in results.items():
+        counts = age_summary(data, min_age_days) if min_age_days is not None else None
+        if counts is not None:
+            summary[cat] = counts
+            continue
+        summary[cat] = {
+            'items': len(data.get('files', [])),
+            'size': data.get('size', 0),
+            'skipped_recent': data.get('skipped_recent', 0),
+            'skipped_recent_size': data.get('skipped_recent_size', 0),
+            'retained': data.get('retained', 0),
+            'retained_size': data.get('retained_size', 0),
+            'error': data.get('error'),
+        }
+    return summary
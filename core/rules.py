@@ -0,0 +1,714 @@
+"""Declarative cleaning rules.
+
+A rule is a plain dict, so extra caches can be added from JSON without code:
+
+    {
+        "category": "Firefox Cache",
+        "roots": ["%LOCALAPPDATA%\\Mozilla\\Firefox\\Profiles"],
+        "globs": ["*.tmp"],             # fnmatch patterns on the file name
+        "extensions": [".log"],         # case-insensitive suffixes
+        "prefixes": ["thumbcache_"],    # case-insensitive name prefixes
+        "min_age_days": 2,              # per-rule floor on top of the scan's age filter
+        "min_size": 0, "max_size": null,
+        "admin": false,                 # skip the whole rule when not elevated
+        "keep_newest_bytes": 209715200  # retention: see below
+    }
+
+Roots are templates with %VAR% environment placeholders and either path
+separator. A root may also be {"path": ..., "admin": true} when only that
+root needs elevation. A file matches when it matches any of the listed
+extensions, prefixes or globs; a rule listing none of them matches
+every file under its roots. Rules sharing a category are merged into it.
+
+A rule may set one retention policy for its category, so a cache stays
+warm instead of being emptied: "keep_newest_bytes" keeps the newest
+files until at least that many bytes are kept, "keep_newest_files" keeps
+the newest N files, and "quota_bytes" deletes oldest-first until what is
+left fits the quota. Retained files are reported as `retained` /
+`retained_size`; the age filter still applies to the files past the
+policy.
+
+Scan results also carry an ages.AgeIndex of the files past the policy,
+recent ones included, so a different age threshold can be applied later
+without walking again.
+"""
+import os
+import re
+import json
+import time
+import heapq
+import fnmatch
+from array import array
+
+from . import instrument
+from .ages import AgeIndex
+from .planner import execute_walk, plan_walks, rules_for_path, shard_walk
+
+RULE_KEYS = {
+    'category', 'roots', 'globs', 'extensions', 'prefixes',
+    'min_age_days', 'min_size', 'max_size', 'admin', 'source',
+    'keep_newest_bytes', 'keep_newest_files', 'quota_bytes',
+}
+
+RETENTION_KEYS = ('keep_newest_bytes', 'keep_newest_files', 'quota_bytes')
+
+_WARM_CACHE = 200 * 1024 * 1024
+
+DEFAULT_RULES = [
+    {'category': 'System Temp', 'roots': ['%TEMP%', {'path': '%SystemRoot%\\Temp', 'admin': True}]},
+    {'category': 'Recycle Bin', 'source': 'recycle_bin'},
+    {'category': 'Prefetch', 'roots': ['%SystemRoot%\\Prefetch'], 'extensions': ['.pf'], 'admin': True},
+    {'category': 'Chrome Cache',
+     'roots': ['%LOCALAPPDATA%\\Google\\Chrome\\User Data\\Default\\Cache\\Cache_Data'],
+     'keep_newest_bytes': _WARM_CACHE},
+    {'category': 'Edge Cache',
+     'roots': ['%LOCALAPPDATA%\\Microsoft\\Edge\\User Data\\Default\\Cache\\Cache_Data'],
+     'keep_newest_bytes': _WARM_CACHE},
+    {'category': 'Windows Logs', 'roots': ['%SystemRoot%\\Logs'], 'extensions': ['.log'], 'admin': True},
+    {'category': 'Crash Dumps',
+     'roots': [{'path': '%SystemRoot%\\Minidump', 'admin': True}, '%LOCALAPPDATA%\\CrashDumps']},
+    {'category': 'Windows Update Cache',
+     'roots': ['%SystemRoot%\\SoftwareDistribution\\Download'], 'admin': True},
+    {'category': 'Thumbnail Cache', 'roots': ['%LOCALAPPDATA%\\Microsoft\\Windows\\Explorer'],
+     'prefixes': ['thumbcache_', 'iconcache_']},
+    {'category': 'DirectX Shader Cache', 'roots': ['%LOCALAPPDATA%\\D3DSCache', '%LOCALAPPDATA%\\D3DCache'],
+     'keep_newest_bytes': _WARM_CACHE},
+    {'category': 'Windows Error Reports',
+     'roots': ['%ProgramData%\\Microsoft\\Windows\\WER', '%LOCALAPPDATA%\\Microsoft\\Windows\\WER']},
+]
+
+_VAR_RE = re.compile(r'%([^%]+)%')
+
+
+def empty_result():
+    return {'files': [], 'items': [], 'size': 0, 'skipped_recent': 0, 'skipped_recent_size': 0,
+            'retained': 0, 'retained_size': 0}
+
+
+def expand_template(template, env=None):
+    """Expands %VAR% placeholders; returns None when a variable is not set."""
+    env = os.environ if env is None else env
+    missing = []
+
+    def _sub(match):
+        value = env.get(match.group(1)) or env.get(match.group(1).upper())
+        if not value:
+            missing.append(match.group(1))
+            return ''
+        return value
+
+    expanded = _VAR_RE.sub(_sub, template)
+    if missing:
+        return None
+    return os.path.normpath(expanded.replace('\\', os.sep).replace('/', os.sep))
+
+
+class NameMatcher:
+    """File name predicate compiled once per rule and shared by every scan backend.
+
+    `match` is a closure specialised to the predicates the rule has, since
+    the per-file call is what a scan spends its matching time on:
+    extension-only rules compare the lowercased tail of the name against
+    a set (a fixed-length slice when all extensions are the same length,
+    else the text after the last dot); prefix-only and glob-only rules
+    are one case-insensitive regex; rules mixing kinds fold everything
+    into a single regex.
+    """
+
+    def __init__(self, extensions=(), prefixes=(), globs=()):
+        self.extensions = tuple(ext.lower() for ext in extensions or ())
+        self.prefixes = tuple(prefixes or ())
+        self.globs = tuple(globs or ())
+
+    def __getattr__(self, name):
+        # The matcher is built on first use, so listing categories compiles no regexes
+        if name != 'match':
+            raise AttributeError(name)
+        self.match = self._build()
+        return self.match
+
+    def _regex(self, extensions, prefixes, globs):
+        alternatives = ['.*' + re.escape(ext) + r'\Z' for ext in extensions]
+        alternatives += [re.escape(prefix) + '.*' for prefix in prefixes]
+        alternatives += [fnmatch.translate(pattern) for pattern in globs]
+        pattern = re.compile('(?:' + '|'.join(alternatives) + ')', re.IGNORECASE | re.DOTALL)
+        match = pattern.match
+        return lambda name: match(name) is not None
+
+    def _build(self):
+        kinds = sum(1 for group in (self.extensions, self.prefixes, self.globs) if group)
+        if kinds == 0:
+            return lambda name: True
+        if kinds > 1 or not self.extensions:
+            return self._regex(self.extensions, self.prefixes, self.globs)
+
+        lengths = {len(ext) for ext in self.extensions}
+        exts = frozenset(self.extensions)
+        if len(lengths) == 1:
+            size = -lengths.pop()
+            return lambda name: name[size:].lower() in exts
+
+        simple = frozenset(ext[1:] for ext in exts if ext.startswith('.') and ext.count('.') == 1)
+        suffixes = tuple(ext for ext in exts if not (ext.startswith('.') and ext.count('.') == 1))
+
+        def match(name):
+            _head, dot, ext = name.rpartition('.')
+            if dot and ext.lower() in simple:
+                return True
+            return bool(suffixes) and name.lower().endswith(suffixes)
+        return match
+
+    def __getstate__(self):
+        # Closures don't pickle; process-pool workers rebuild them
+        state = dict(self.__dict__)
+        state.pop('match', None)
+        return state
+
+
+class CompiledRule:
+    """A rule with its name predicates compiled into a NameMatcher."""
+
+    def __init__(self, rule):
+        unknown = set(rule) - RULE_KEYS
+        if unknown:
+            raise ValueError(f"Unknown rule keys: {', '.join(sorted(unknown))}")
+        if not rule.get('category'):
+            raise ValueError("Rule is missing a category")
+        self.category = rule['category']
+        self.source = rule.get('source', 'filesystem')
+        self.admin = bool(rule.get('admin'))
+        self.min_age_days = rule.get('min_age_days') or 0
+        self.min_size = rule.get('min_size') or 0
+        self.max_size = rule.get('max_size')
+        policies = [(key, rule[key]) for key in RETENTION_KEYS if rule.get(key) is not None]
+        if len(policies) > 1:
+            raise ValueError(f"Rule sets more than one retention policy: {', '.join(k for k, _v in policies)}")
+        for key, value in policies:
+            if not isinstance(value, int) or value < 0:
+                raise ValueError(f"{key} must be a non-negative integer")
+        self.retention = policies[0] if policies else None
+        self.roots = []
+        for root in rule.get('roots') or ():
+            if isinstance(root, dict):
+                self.roots.append((root['path'], bool(root.get('admin'))))
+            else:
+                self.roots.append((root, False))
+        self.matcher = NameMatcher(rule.get('extensions'), rule.get('prefixes'), rule.get('globs'))
+
+    def __getattr__(self, name):
+        if name != 'matches':
+            raise AttributeError(name)
+        self.matches = self.matcher.match
+        return self.matches
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop('matches', None)
+        return state
+
+    def accepts_size(self, size):
+        if size < self.min_size:
+            return False
+        return self.max_size is None or size <= self.max_size
+
+
+def compile_rules(rules):
+    return [CompiledRule(rule) for rule in rules]
+
+
+def user_rules_path():
+    from .utils import get_app_data_dir
+    return os.path.join(get_app_data_dir(), 'rules.json')
+
+
+def load_rules(path=None):
+    """Returns the default rules followed by any user rules from rules.json."""
+    rules = list(DEFAULT_RULES)
+    path = path or user_rules_path()
+    if not os.path.exists(path):
+        return rules
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            extra = json.load(f)
+        compile_rules(extra)
+    except (OSError, ValueError, TypeError, KeyError) as e:
+        import logging
+        logging.getLogger('SafetyLogger').error(f"Ignoring invalid rules file {path}: {e}")
+        return rules
+    return rules + list(extra)
+
+
+class Retention:
+    """Streaming newest-first selection for one category's retention policy.
+
+    Files can arrive in any order. The kept candidates sit in a min-heap
+    on mtime, and once a file has been pushed out anything older is known
+    to be outside the policy too, so it is handed back straight away.
+    Memory is bounded by the kept set, not by the files scanned.
+
+    A finished scan keeps its Retention with the category's result, so
+    apply_events() can go on offering new files to the same selection.
+    """
+
+    def __init__(self, policy):
+        self.key, self.limit = policy
+        self.heap = []  # (mtime, seq, size, path, tag)
+        self.paths = set()
+        self.total = 0
+        self.floor = None  # newest (mtime, seq) pushed out so far
+        # Kept files counted but not tracked (a result that came without its Retention)
+        self.base_count = 0
+        self.base_size = 0
+        self._seq = 0
+
+    def __contains__(self, path):
+        return path in self.paths
+
+    def _over(self):
+        if not self.heap:
+            return False
+        if self.key == 'keep_newest_files':
+            return len(self.heap) > self.limit
+        if self.key == 'quota_bytes':
+            return self.total > self.limit
+        # keep_newest_bytes: the oldest kept file is not needed to reach the limit
+        return self.total - self.heap[0][2] >= self.limit
+
+    def offer(self, mtime, size, path, tag):
+        """Adds a file; returns the (path, size, tag) files that fall outside the policy."""
+        seq = self._seq
+        self._seq += 1
+        if self.floor is not None and (mtime, seq) < self.floor:
+            return [(path, size, tag)]
+        heapq.heappush(self.heap, (mtime, seq, size, path, tag))
+        self.paths.add(path)
+        self.total += size
+        evicted = []
+        while self._over():
+            old_mtime, old_seq, old_size, old_path, old_tag = heapq.heappop(self.heap)
+            self.paths.discard(old_path)
+            self.total -= old_size
+            self.floor = (old_mtime, old_seq)
+            evicted.append((old_path, old_size, old_tag))
+        return evicted
+
+    def discard(self, paths):
+        """Drops kept files (e.g. deleted since the scan); returns how many were kept.
+
+        Their room is taken by newer files as they arrive; files already
+        pushed out stay out.
+        """
+        hit = self.paths & paths if len(self.paths) < len(paths) else {p for p in paths if p in self.paths}
+        if hit:
+            self.heap = [entry for entry in self.heap if entry[3] not in hit]
+            heapq.heapify(self.heap)
+            self.paths -= hit
+            self.total = sum(entry[2] for entry in self.heap)
+        return len(hit)
+
+    def kept(self):
+        return [(mtime, size, path, tag) for mtime, _seq, size, path, tag in self.heap]
+
+
+def _retentions(rules):
+    """category -> Retention; the first rule of a category with a policy sets it."""
+    retention = {}
+    for rule in rules:
+        if rule.retention and rule.category not in retention:
+            retention[rule.category] = Retention(rule.retention)
+    return retention
+
+
+# Where a file stands against the age limits, from _age_state
+_ELIGIBLE, _RECENT, _PINNED = 0, 1, 2
+
+
+def _new_result(now):
+    return dict(empty_result(), ages=AgeIndex(now))
+
+
+def _age_state(mtime, limits):
+    cutoff, floor = limits
+    if floor is not None and mtime > floor:
+        return _PINNED
+    if cutoff is not None and mtime > cutoff:
+        return _RECENT
+    return _ELIGIBLE
+
+
+def _place(res, path, size, tag):
+    """Files a matched file under its category; `tag` is (mtime, _age_state)."""
+    mtime, state = tag
+    ages = res.get('ages')
+    if ages is not None:
+        if state == _PINNED:
+            ages.pin(1, size)
+        else:
+            ages.add(mtime, size, path)
+    if state:
+        res['skipped_recent'] += 1
+        res['skipped_recent_size'] += size
+    else:
+        res['files'].append(path)
+        res['items'].append({'path': path, 'size': size})
+        res['size'] += size
+
+
+def _finish_retention(res, keeper):
+    """Sets the category's retained counts from its kept files and keeps the Retention with it."""
+    res['retained'] = keeper.base_count + len(keeper.heap)
+    res['retained_size'] = keeper.base_size + keeper.total
+    res['retention'] = keeper
+
+
+SCAN_BACKENDS = ('serial', 'thread', 'process')
+# The pooled backends split the tree until each worker has this many shards to pick from
+SHARDS_PER_WORKER = 4
+
+
+def scan_rules(rules, session=None, min_age_days=None, on_category_done=None,
+               backend='serial', workers=None, throttle=None):
+    """Scans every filesystem rule in one pass over the planned walks.
+
+    Nested and duplicate roots are folded together by the planner, so no
+    directory is listed twice and each file is matched against every rule
+    whose root covers it. Returns category -> result dict, in rule order.
+
+    backend='process' walks the subfolders of each root in worker
+    processes, so rule matching is not serialised by the GIL; 'thread'
+    does the same on threads. Both pay off only for large trees. The
+    tree is split level by level, and a flat folder by file name, so
+    one big subtree does not end up on a single worker, and each
+    category is reported as soon as its last shard is merged.
+
+    A throttle.Throttle is paced once per file; it keeps the walk on this
+    thread whatever the backend, since a pool would sidestep its limits.
+    """
+    if backend not in SCAN_BACKENDS:
+        raise ValueError(f"Unknown scan backend: {backend}")
+    if backend != 'serial' and throttle is None:
+        return _scan_rules_pooled(rules, session, min_age_days, on_category_done, backend, workers)
+    now = time.time()
+    results = {}
+    for rule in rules:
+        results.setdefault(rule.category, _new_result(now))
+    walks = plan_walks(rules, session)
+
+    pending = {cat: 0 for cat in results}
+    for walk in walks:
+        for cat in walk.categories:
+            pending[cat] += 1
+    if on_category_done:
+        for cat, count in pending.items():
+            if not count:
+                on_category_done(cat, results[cat])
+
+    cutoffs = _cutoffs(rules, min_age_days, now)
+    retention = _retentions(rules)
+    stats = _new_stats()
+
+    def _on_file(entry, active):
+        _dispatch_file(entry, active, cutoffs, results, retention, stats)
+        if throttle is not None:
+            throttle.pace()
+
+    visited = set()
+    for walk in walks:
+        execute_walk(walk, _on_file, visited)
+        for cat in walk.categories:
+            pending[cat] -= 1
+            if pending[cat]:
+                continue
+            if cat in retention:
+                _finish_retention(results[cat], retention[cat])
+            if on_category_done:
+                on_category_done(cat, results[cat])
+    _count_stats(stats)
+    return results
+
+
+def _new_stats():
+    return {} if instrument.active() is not None else None
+
+
+def _count_stats(stats):
+    for cat, calls in (stats or {}).items():
+        instrument.count('stat calls', calls, cat)
+
+
+def _scan_rules_pooled(rules, session, min_age_days, on_category_done, backend, workers):
+    # Kept out of module import: the CLI starts faster without multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+    now = time.time()
+    results = {}
+    for rule in rules:
+        results.setdefault(rule.category, _new_result(now))
+    cutoffs = _cutoffs(rules, min_age_days, now)
+    retention = _retentions(rules)
+    stats = _new_stats()
+
+    def _on_file(entry, active):
+        _dispatch_file(entry, active, cutoffs, results, retention, stats)
+
+    # Folders near each root are listed here while the subtrees, and slices
+    # of very large folders, fan out
+    visited = set()
+    shards = []
+    slices = workers or os.cpu_count() or 1
+    for walk in plan_walks(rules, session):
+        shards.extend(shard_walk(walk, _on_file, visited, slices * SHARDS_PER_WORKER, slices=slices))
+
+    pending = {cat: 0 for cat in results}
+    for shard in shards:
+        for cat in shard.categories:
+            pending[cat] += 1
+
+    def _done(cat):
+        if cat in retention:
+            _finish_retention(results[cat], retention[cat])
+        if on_category_done:
+            on_category_done(cat, results[cat])
+
+    for cat, count in pending.items():
+        if not count:
+            _done(cat)
+
+    pool_cls = ProcessPoolExecutor if backend == 'process' else ThreadPoolExecutor
+    # Threads share this process's recorder; worker processes record their own and send it back
+    rec = instrument.active()
+    record = backend == 'process' and rec is not None
+    if shards:
+        with pool_cls(max_workers=workers) as pool:
+            futures = {pool.submit(_scan_shard, (shard, min_age_days, now, record)): shard for shard in shards}
+            # Merged as they finish, so each category is reported once its last shard is in
+            for future in as_completed(futures):
+                packed, recorded = future.result()
+                _merge_packed(results, packed, retention)
+                if recorded is not None:
+                    rec.merge(recorded)
+                for cat in futures[future].categories:
+                    pending[cat] -= 1
+                    if not pending[cat]:
+                        _done(cat)
+    _count_stats(stats)
+    return results
+
+
+def _scan_shard(job):
+    """Walks one shard and returns its results packed for a cheap trip between processes.
+
+    Per category: (NUL-joined paths of the indexed files, array('d') of
+    their mtimes, array('Q') of sizes, array('B') flagging the recent
+    ones, pinned count, pinned bytes, retention candidates). A shard
+    applies retention to its own files first: whatever falls outside the
+    policy within the shard is outside it overall, so only the shard's
+    kept files travel back as (mtime, size, path, tag) candidates for the
+    final selection. Returns (packed, Recorder.state() or None).
+    """
+    walk, min_age_days, now, record = job
+    if record:
+        instrument.enable()
+    rules = []
+    for target_rules in walk.targets.values():
+        rules.extend(r for r in target_rules if r not in rules)
+    results = {rule.category: _new_result(now) for rule in rules}
+    cutoffs = _cutoffs(rules, min_age_days, now)
+    retention = _retentions(rules)
+    stats = _new_stats()
+
+    def _on_file(entry, active):
+        _dispatch_file(entry, active, cutoffs, results, retention, stats)
+
+    execute_walk(walk, _on_file)
+    _count_stats(stats)
+    packed = {}
+    for cat, res in results.items():
+        kept = retention[cat].kept() if cat in retention else []
+        ages = res['ages']
+        if ages.paths or ages.pinned or kept:
+            eligible = set(res['files'])
+            recent = array('B', (path not in eligible for path in ages.paths))
+            packed[cat] = ('\0'.join(ages.paths), ages.mtimes, ages.sizes, recent,
+                           ages.pinned, ages.pinned_size, kept)
+    return packed, (instrument.disable().state() if record else None)
+
+
+def _merge_packed(results, packed, retention):
+    for cat, (joined, mtimes, sizes, recent, pinned, pinned_size, kept) in packed.items():
+        res = results[cat]
+        ages = res['ages']
+        if joined:
+            paths = joined.split('\0')
+            ages.extend(mtimes, sizes, paths)
+            for path, size, is_recent in zip(paths, sizes, recent):
+                if is_recent:
+                    res['skipped_recent'] += 1
+                    res['skipped_recent_size'] += size
+                else:
+                    res['files'].append(path)
+                    res['items'].append({'path': path, 'size': size})
+                    res['size'] += size
+        ages.pin(pinned, pinned_size)
+        res['skipped_recent'] += pinned
+        res['skipped_recent_size'] += pinned_size
+        for mtime, size, path, tag in kept:
+            for evicted in retention[cat].offer(mtime, size, path, tag):
+                _place(res, *evicted)
+
+
+def _cutoffs(rules, min_age_days, now):
+    """rule -> (scan cutoff, the rule's own floor); either may be None."""
+    cutoffs = {}
+    for rule in rules:
+        days = max(min_age_days or 0, rule.min_age_days)
+        floor = now - rule.min_age_days * 86400 if rule.min_age_days > 0 else None
+        cutoffs[rule] = (now - days * 86400 if days > 0 else None, floor)
+    return cutoffs
+
+
+def _dispatch_file(entry, rules, cutoffs, results, retention=None, stats=None):
+    """Matches one file against its active rules; `stats` (category -> stat calls) is kept while recording."""
+    st = None
+    claimed = None
+    for rule in rules:
+        if not rule.matches(entry.name):
+            continue
+        if st is None:
+            try:
+                st = entry.stat()
+            except OSError as e:
+                instrument.error(e, 'stat', rule.category)
+                return
+            if stats is not None:
+                stats[rule.category] = stats.get(rule.category, 0) + 1
+        size = st.st_size
+        if not rule.accepts_size(size):
+            continue
+        # Several rules of one category may match the same file; count it once
+        if claimed is None:
+            claimed = set()
+        elif rule.category in claimed:
+            continue
+        claimed.add(rule.category)
+        res = results[rule.category]
+        tag = (st.st_mtime, _age_state(st.st_mtime, cutoffs[rule]))
+        if retention and rule.category in retention:
+            for evicted in retention[rule.category].offer(st.st_mtime, size, entry.path, tag):
+                _place(res, *evicted)
+        else:
+            _place(res, entry.path, size, tag)
+
+
+class _PathEntry:
+    """The slice of os.DirEntry that _dispatch_file needs, for a bare path."""
+
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+
+    def stat(self):
+        return os.stat(self.path, follow_symlinks=False)
+
+
+def apply_events(results, events, walks, min_age_days=None):
+    """Updates scan results in place from watcher (kind, path) events.
+
+    Deleted files leave their category, and so does every file under a
+    deleted (or moved away) folder; created files are matched against
+    the rules of the walks that produced the results, and modified files
+    are re-matched with their new size and age. A category with an
+    AgeIndex only has the index and its counts updated, in time
+    proportional to the batch; its file lists are rebuilt by
+    ages.refilter() when next read, as after an age change. New files go
+    through the Retention the scan left with the category, so kept files
+    they push out of the policy become cleanable. Returns the set of
+    categories that changed.
+    """
+    rules = []
+    for walk in walks:
+        for target_rules in walk.targets.values():
+            rules.extend(r for r in target_rules if r not in rules)
+    cutoffs = _cutoffs(rules, min_age_days, time.time())
+    retention = {}
+    for cat, keeper in _retentions(rules).items():
+        res = results.get(cat)
+        if res is None:
+            continue
+        if res.get('retention') is not None:
+            retention[cat] = res['retention']
+        else:
+            # E.g. a loaded scan: its kept files were only counted, so they stay counted
+            keeper.base_count, keeper.base_size = res.get('retained', 0), res.get('retained_size', 0)
+            retention[cat] = keeper
+
+    gone = set()
+    folders = []
+    added = []
+    for kind, path in events:
+        if kind == 'deleted':
+            gone.add(path)
+        elif kind == 'deleted_dir':
+            folders.append(path)
+        elif kind in ('created', 'modified'):
+            added.append((kind, path))
+
+    indexed = {cat: res['ages'] for cat, res in results.items() if res.get('ages') is not None}
+    known = {cat: set(res['files']) for cat, res in results.items() if cat not in indexed}
+    listed = set().union(*known.values()) if known else set()
+    if folders:
+        # Indexes find their own files under the folders; lists and kept files are matched here
+        prefixes = tuple(folder.rstrip(os.sep) + os.sep for folder in folders)
+        gone.update(path for path in listed if path.startswith(prefixes))
+        for keeper in retention.values():
+            gone.update(path for path in keeper.paths if path.startswith(prefixes))
+
+    changed = set()
+    fresh = {}
+    for kind, path in added:
+        if kind == 'modified' and path not in listed and not any(path in ages for ages in indexed.values()) \
+                and not any(path in keeper for keeper in retention.values()):
+            # Either never matched or only counted as too new for its rule
+            continue
+        gone.add(path)
+        active = [r for r in rules_for_path(walks, path) if r.category in results]
+        if active:
+            fresh[path] = active
+
+    for keeper in retention.values():
+        if gone:
+            keeper.discard(gone)
+
+    for cat, res in results.items():
+        if cat in indexed:
+            if (gone or folders) and indexed[cat].discard(gone, under=folders):
+                changed.add(cat)
+            continue
+        stale = known[cat] & gone
+        if not stale:
+            continue
+        kept = [item for item in res['items'] if item['path'] not in stale]
+        res['size'] -= sum(item['size'] for item in res['items'] if item['path'] in stale)
+        res['items'] = kept
+        res['files'] = [item['path'] for item in kept]
+        changed.add(cat)
+
+    for path, active in fresh.items():
+        before = {r.category: (len(results[r.category]['files']), results[r.category]['skipped_recent'])
+                  for r in active}
+        if not os.path.isfile(path):
+            continue
+        _dispatch_file(_PathEntry(path), active, cutoffs, results, retention)
+        for cat, counts in before.items():
+            res = results[cat]
+            if counts != (len(res['files']), res['skipped_recent']):
+                changed.add(cat)
+    for cat, keeper in retention.items():
+        res = results[cat]
+        before = (res.get('retained', 0), res.get('retained_size', 0))
+        _finish_retention(res, keeper)
+        if (res['retained'], res['retained_size']) != before:
+            changed.add(cat)
+    for cat in changed & indexed.keys():
+        res = results[cat]
+        _items, res['size'], res['skipped_recent'], res['skipped_recent_size'] = indexed[cat].summary(min_age_days)
+    return changed
@@ -1,10 +1,60 @@
 import os
+import json
+import time
 import datetime
 import logging
-from core.utils import is_admin
+import threading
+import subprocess
+from concurrent.futures import Future
+from core.utils import get_app_data_dir, is_admin
+
+# Windows itself skips a new restore point within 24 h of the last one
+RESTORE_POINT_WINDOW = 24 * 3600
+# ...and says so only in a warning; Checkpoint-Computer still exits with 0
+RESTORE_POINT_SKIPPED = "already been created within the past"
+# Printed after Checkpoint-Computer: when the newest restore point was really made
+CREATED_AT = "created-at:"
+
+def _created_at(output):
+    """Unix time from the CREATED_AT line of the PowerShell output, or None."""
+    for line in (output or '').splitlines():
+        if line.startswith(CREATED_AT):
+            try:
+                return float(line[len(CREATED_AT):])
+            except ValueError:
+                return None
+    return None
+
+def split_by_risk(categories, low_risk):
+    """Orders categories for cleaning: (low-risk ones, the rest), each in the given order.
+
+    Low-risk categories can be cleaned while the restore point is still
+    being created; the rest wait for it.
+    """
+    low = [cat for cat in categories if cat in low_risk]
+    high = [cat for cat in categories if cat not in low_risk]
+    return low, high
+
 
 class SafetyManager:
-    def __init__(self):
+    """Logging and restore points for cleanups.
+
+    `runner` launches PowerShell and defaults to subprocess.run, so tests
+    can stand in a stub. The creation time of the newest restore point
+    (which is older than now when Windows skipped making one) is
+    remembered in `state_path` and the point reused for `restore_point_window` seconds instead of
+    creating another. start_restore_point() begins the work on a
+    background thread (for example when a scan starts) and
+    wait_restore_point() collects it, or runs it there and then.
+    """
+
+    def __init__(self, runner=None, state_path=None, restore_point_window=RESTORE_POINT_WINDOW, admin=None):
+        self.runner = runner or subprocess.run
+        self.state_path = state_path
+        self.restore_point_window = restore_point_window
+        self.admin = admin
+        self._pending = None
+        self._lock = threading.Lock()
         self.setup_logging()
 
     def setup_logging(self):
@@ -30,19 +80,75 @@ class SafetyManager:
     def log_error(self, message):
         self.logger.error(message)
 
-    def create_restore_point(self, description="Cleaner Wannabe Restore Point"):
-        if not is_admin():
+    def _state_file(self):
+        return self.state_path or os.path.join(get_app_data_dir(), "safety.json")
+
+    def last_restore_point(self):
+        """Unix time of the last restore point this app created, or None."""
+        try:
+            with open(self._state_file(), "r", encoding="utf-8") as f:
+                return float(json.load(f)["restore_point_at"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _remember_restore_point(self, when):
+        try:
+            with open(self._state_file(), "w", encoding="utf-8") as f:
+                json.dump({"restore_point_at": when}, f)
+        except OSError as e:
+            self.log_error(f"Could not record restore point time: {e}")
+
+    def restore_point_is_fresh(self, now=None):
+        last = self.last_restore_point()
+        now = time.time() if now is None else now
+        return last is not None and 0 <= now - last < self.restore_point_window
+
+    def start_restore_point(self):
+        """Starts create_restore_point() in the background; returns a Future of (ok, message)."""
+        with self._lock:
+            if self._pending is not None and not self._pending.done():
+                return self._pending
+            future = self._pending = Future()
+        threading.Thread(target=self._run_pending, args=(future,), name="RestorePoint", daemon=True).start()
+        return future
+
+    def _run_pending(self, future):
+        try:
+            future.set_result(self.create_restore_point())
+        except Exception as e:
+            future.set_result((False, str(e)))
+
+    def wait_restore_point(self, timeout=None):
+        """The (ok, message) of the restore point started earlier, or of one created now."""
+        with self._lock:
+            future, self._pending = self._pending, None
+        if future is None:
+            return self.create_restore_point()
+        return future.result(timeout)
+
+    def create_restore_point(self, description="Cleaner Wannabe Restore Point", force=False):
+        if not force and self.restore_point_is_fresh():
+            when = datetime.datetime.fromtimestamp(self.last_restore_point())
+            self.log_action(f"Reusing restore point from {when:%Y-%m-%d %H:%M}")
+            return True, "Recent Restore Point Reused"
+
+        admin = is_admin() if self.admin is None else self.admin
+        if not admin:
             self.log_error("Cannot create restore point: Not Admin")
             return False, "Not Admin"
 
         try:
             # Uses standard Windows API via ctypes or powershell
             # PowerShell is easier and more reliable for this specific task in Python without complex wmi wrappers
-            cmd = f'Checkpoint-Computer -Description "{description}" -RestorePointType "MODIFY_SETTINGS"'
+            # Warnings go to stdout (3>&1) so a skipped creation can be told apart
+            cmd = (f'Checkpoint-Computer -Description "{description}" -RestorePointType "MODIFY_SETTINGS" '
+                   f'-ErrorAction Stop 3>&1; '
+                   f'$p = Get-ComputerRestorePoint | Select-Object -Last 1; '
+                   f'if ($p) {{ "{CREATED_AT}" + ([DateTimeOffset][Management.ManagementDateTimeConverter]'
+                   f'::ToDateTime($p.CreationTime)).ToUnixTimeSeconds() }}')
             # We run this via powershell
             # Note: This requires the feature to be enabled on Windows.
-            import subprocess
-            result = subprocess.run(
+            result = self.runner(
                 ["powershell", "-NoProfile", "-NonInteractive", "-Command", cmd],
                 capture_output=True,
                 text=True,
@@ -50,6 +156,17 @@ class SafetyManager:
             )
             
             if result.returncode == 0:
+                skipped = RESTORE_POINT_SKIPPED in (result.stdout or '')
+                when = _created_at(result.stdout)
+                if when is None and not skipped:
+                    when = time.time()
+                # A skipped creation without a readable time records nothing, so the
+                # window is not moved past the existing point
+                if when is not None:
+                    self._remember_restore_point(when)
+                if skipped:
+                    self.log_action("Windows skipped the restore point: one exists from the last 24 hours")
+                    return True, "Recent Restore Point Reused"
                 self.log_action(f"Restore Point created: {description}")
                 return True, "Restore Point Created"
             else:
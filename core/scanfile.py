@@ -0,0 +1,285 @@
+"""Scan results saved to a file and read back, to clean later or in another process.
+
+Layout: the magic b'CWSCAN' and a uint16 version, a uint32 header length
+and the header as UTF-8 JSON, then the column sections back to back.
+
+The header has the scan's settings, per-category counts and where each
+section starts. Paths are a string table: every distinct folder once,
+and per file an index into the folders plus the file name. Sizes,
+modification times and folder indexes are raw array('Q'/'d'/'I') bytes
+(byte order recorded in the header), so loading copies them out of an
+mmap instead of parsing anything. Sections may be zlib-compressed at
+level 1, which roughly halves the file and costs little to read back.
+
+A loaded category gets its AgeIndex (see ages.py) back, so the age
+filter can still change. The file itself is not trusted: confine()
+drops every path its category's current rules would not have matched,
+and files may have changed since the save, so revalidate() re-checks
+the ones a clean would touch, and only those.
+"""
+import os
+import sys
+import json
+import mmap
+import time
+import zlib
+import operator
+import struct
+from array import array
+
+from .ages import AgeIndex, refilter
+from .planner import rules_for_path
+
+MAGIC = b'CWSCAN'
+VERSION = 1
+EXTENSION = '.cwscan'
+_PREAMBLE = struct.Struct('<6sHI')
+_COUNTS = ('skipped_recent', 'skipped_recent_size', 'retained', 'retained_size')
+
+
+class ScanFileError(ValueError):
+    """Not a scan file, or one written by a newer version."""
+
+
+def _encode(strings):
+    # surrogatepass keeps undecodable Windows names intact
+    return '\0'.join(strings).encode('utf-8', 'surrogatepass')
+
+
+def _decode(data, count):
+    return data.decode('utf-8', 'surrogatepass').split('\0') if count else []
+
+
+def _columns(results):
+    """Flattens the results into the file's columns; returns (columns, category headers, folder count)."""
+    folders = {}
+    index = array('I')
+    names = []
+    mtimes = array('d')
+    sizes = array('Q')
+    categories = []
+    for cat, data in results.items():
+        ages = data.get('ages')
+        header = {'name': cat, 'start': len(names), 'indexed': ages is not None, 'error': data.get('error')}
+        if ages is not None:
+            ages.freeze()
+            paths, cat_sizes, cat_mtimes = ages.paths, ages.sizes, ages.mtimes
+            header.update(pinned=ages.pinned, pinned_size=ages.pinned_size, extras=ages.extras)
+        else:
+            items = data.get('items') or [{'path': p, 'size': 0} for p in data.get('files', [])]
+            paths = [item['path'] for item in items]
+            cat_sizes = array('Q', (item.get('size') or 0 for item in items))
+            cat_mtimes = array('d', bytes(8 * len(paths)))
+            header['extras'] = {item['path']: {k: v for k, v in item.items() if k not in ('path', 'size')}
+                                for item in items if len(item) > 2}
+        for path in paths:
+            cut = path.rfind(os.sep) + 1
+            index.append(folders.setdefault(path[:cut], len(folders)))
+            names.append(path[cut:])
+        mtimes.extend(cat_mtimes)
+        sizes.extend(cat_sizes)
+        header['count'] = len(paths)
+        header.update((key, data.get(key, 0)) for key in _COUNTS)
+        categories.append(header)
+    columns = {
+        'folders': _encode(folders),
+        'names': _encode(names),
+        'folder_index': index.tobytes(),
+        'mtimes': mtimes.tobytes(),
+        'sizes': sizes.tobytes(),
+    }
+    return columns, categories, len(folders)
+
+
+def save(path, results, min_age_days=0, compress=True, now=None):
+    """Writes scan results (category -> result dict) to `path`, replacing it atomically."""
+    columns, categories, folder_count = _columns(results)
+    sections = {}
+    blobs = []
+    offset = 0
+    for name, data in columns.items():
+        stored = zlib.compress(data, 1) if compress else data
+        sections[name] = [offset, len(stored), compress]
+        blobs.append(stored)
+        offset += len(stored)
+    header = json.dumps({
+        'created': time.time() if now is None else now,
+        'min_age_days': min_age_days or 0,
+        'byteorder': sys.byteorder,
+        'folders': folder_count,
+        'entries': sum(cat['count'] for cat in categories),
+        'sections': sections,
+        'categories': categories,
+    }).encode('utf-8')
+    with open(path + '.tmp', 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(path + '.tmp', path)
+
+
+def read_header(path):
+    """The header of a scan file, without loading its columns."""
+    with open(path, 'rb') as f:
+        return _read_header(f.read(_PREAMBLE.size), f.read)[0]
+
+
+def _read_header(preamble, read):
+    """(header, offset of the first section) from the preamble and a read(n) for what follows."""
+    if len(preamble) < _PREAMBLE.size:
+        raise ScanFileError("Not a scan file")
+    magic, version, length = _PREAMBLE.unpack(preamble)
+    if magic != MAGIC:
+        raise ScanFileError("Not a scan file")
+    if version > VERSION:
+        raise ScanFileError(f"Scan file version {version} is newer than this app supports")
+    return json.loads(read(length).decode('utf-8')), _PREAMBLE.size + length
+
+
+def load(path, min_age_days=None, now=None):
+    """Reads a scan file; returns (results, header).
+
+    Each category's file lists are rebuilt for `min_age_days` (default:
+    the threshold the scan was saved with), counting ages from `now`.
+    """
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ScanFileError("Not a scan file") from None
+    with mm:
+        header, base = _read_header(mm[:_PREAMBLE.size], lambda n: mm[_PREAMBLE.size:_PREAMBLE.size + n])
+
+        def _section(name):
+            offset, length, compressed = header['sections'][name]
+            start = base + offset
+            return zlib.decompress(mm[start:start + length]) if compressed else mm[start:start + length]
+
+        try:
+            folders = _decode(_section('folders'), header['folders'])
+            names = _decode(_section('names'), header['entries'])
+            index = array('I', _section('folder_index'))
+            mtimes = array('d', _section('mtimes'))
+            sizes = array('Q', _section('sizes'))
+        except (KeyError, ValueError, zlib.error) as e:
+            raise ScanFileError(f"Damaged scan file: {e}") from None
+    if not len(names) == len(index) == len(mtimes) == len(sizes) == header['entries']:
+        raise ScanFileError("Damaged scan file: columns differ in length")
+    if index and max(index) >= len(folders):
+        raise ScanFileError("Damaged scan file: folder index out of range")
+    if header['byteorder'] != sys.byteorder:
+        for column in (index, mtimes, sizes):
+            column.byteswap()
+    paths = list(map(operator.add, map(folders.__getitem__, index), names))
+
+    days = header['min_age_days'] if min_age_days is None else min_age_days
+    now = time.time() if now is None else now
+    results = {}
+    for cat in header['categories']:
+        start, end = cat['start'], cat['start'] + cat['count']
+        data = {key: cat.get(key, 0) for key in _COUNTS}
+        if cat.get('error'):
+            data['error'] = cat['error']
+        if cat['indexed']:
+            ages = AgeIndex(now)
+            ages.extend(mtimes[start:end], sizes[start:end], paths[start:end])
+            ages.extras = cat.get('extras') or {}
+            ages.pin(cat.get('pinned', 0), cat.get('pinned_size', 0))
+            # Saved frozen, so already in time order
+            ages.freeze(presorted=True)
+            data['ages'] = ages
+            refilter(data, days)
+        else:
+            data['files'] = paths[start:end]
+            data['items'] = [dict(cat['extras'].get(p, ()), path=p, size=s)
+                             for p, s in zip(data['files'], sizes[start:end])]
+            data['size'] = sum(sizes[start:end])
+        results[cat['name']] = data
+    return results, header
+
+
+def revalidate(data, min_age_days):
+    """Drops the files a clean of this category would touch that are gone or changed since the scan.
+
+    Returns (count, bytes) dropped. Recent files are not checked; a later
+    age change that takes them in does not re-check them either, so call
+    this right before cleaning.
+    """
+    ages = data.get('ages')
+    if ages is None:
+        return 0, 0
+    paths, sizes = ages.eligible(min_age_days)
+    # eligible() is the oldest slice of the sorted index
+    mtimes = ages.mtimes[:len(paths)]
+    stale = set()
+    stale_size = 0
+    for path, size, mtime in zip(paths, sizes, mtimes):
+        try:
+            st = os.stat(path, follow_symlinks=False)
+        except OSError:
+            stale.add(path)
+            stale_size += size
+            continue
+        # Recycle Bin items carry the deletion time, and a folder's size is its contents
+        if path not in ages.extras and (st.st_size != size or st.st_mtime != mtime):
+            stale.add(path)
+            stale_size += size
+    if stale:
+        ages.discard(stale)
+    refilter(data, min_age_days)
+    return len(stale), stale_size
+
+
+def _matched(paths, category, walks):
+    """The paths a scan of `category` over `walks` could have listed."""
+    by_folder = {}
+    ok = set()
+    for path in paths:
+        folder, name = os.path.split(path)
+        rules = by_folder.get(folder)
+        if rules is None:
+            # Every file of a folder gets the same rules, so look them up once
+            rules = by_folder[folder] = [r for r in rules_for_path(walks, path) if r.category == category]
+        if any(rule.matches(name) for rule in rules):
+            ok.add(path)
+    return ok
+
+
+def _in_bin(paths, bin_roots):
+    """The paths that are $R items directly in one of the current user's bin folders."""
+    roots = {os.path.normcase(os.path.abspath(root)) for root in bin_roots}
+    return {path for path in paths
+            if os.path.basename(path).startswith('$R')
+            and os.path.normcase(os.path.dirname(os.path.abspath(path))) in roots}
+
+
+def confine(results, walks, bin_roots, min_age_days):
+    """Drops, in place, every loaded path a fresh scan could not have produced.
+
+    A rule category keeps the paths its current rules match under `walks`
+    (Scanner.watch_plan); the Recycle Bin keeps `$R` items in `bin_roots`;
+    anything else is dropped. Returns {category: (count, bytes)} dropped.
+    """
+    dropped = {}
+    for cat, data in results.items():
+        ages = data.get('ages')
+        if ages is not None:
+            ages.freeze()
+            paths, sizes = ages.paths, ages.sizes
+        else:
+            items = list(data.get('items') or [])
+            paths, sizes = [item['path'] for item in items], [item.get('size') or 0 for item in items]
+        ok = _in_bin(paths, bin_roots) if cat == 'Recycle Bin' else _matched(paths, cat, walks)
+        if len(ok) == len(paths):
+            continue
+        bad = {path: size for path, size in zip(paths, sizes) if path not in ok}
+        if ages is not None:
+            ages.discard(bad)
+            refilter(data, min_age_days)
+        else:
+            data['items'] = [item for item in items if item['path'] in ok]
+            data['files'] = [item['path'] for item in data['items']]
+            data['size'] = sum(item.get('size') or 0 for item in data['items'])
+        dropped[cat] = (len(bad), sum(bad.values()))
+    return dropped
@@ -1,11 +1,21 @@
-import os
-import time
-import winshell
-from .utils import is_admin
+from . import instrument, recyclebin
+from .planner import plan_walks
+from .rules import compile_rules, empty_result, load_rules, scan_rules
+from .session import ScanSession
 
 class Scanner:
-    def __init__(self):
+    def __init__(self, rules=None, session=None, backend='serial', workers=None, recycle_roots=None, throttle=None):
         self.scan_results = {}  # category -> {files: [], size: 0}
+        # A fixed session (e.g. from tests) is reused; otherwise each scan resolves its own
+        self.session = session
+        # 'process' fans large trees out over worker processes (see rules.scan_rules)
+        self.backend = backend
+        self.workers = workers
+        # $Recycle.Bin folders to read; None finds them on the local drives
+        self.recycle_roots = recycle_roots
+        # A throttle.Throttle for background mode; None walks at full speed
+        self.throttle = throttle
+        self.rules = compile_rules(load_rules() if rules is None else rules)
         self.categories = {
             'System Temp': self.scan_temp,
             'Recycle Bin': self.scan_recycle_bin,
@@ -19,130 +29,58 @@ class Scanner:
             'DirectX Shader Cache': self.scan_shader_cache,
             'Windows Error Reports': self.scan_error_reports,
         }
-
-    def _is_old_enough(self, filepath, min_age_days):
-        if not min_age_days or min_age_days <= 0:
-            return True
-        try:
-            mtime = os.path.getmtime(filepath)
-        except Exception:
-            return False
-        age_seconds = time.time() - mtime
-        return age_seconds >= (min_age_days * 86400)
-
-    def _merge_results(self, results):
-        files = []
-        items = []
-        total_size = 0
-        skipped_recent = 0
-        skipped_recent_size = 0
-        for res in results:
-            files.extend(res.get('files', []))
-            items.extend(res.get('items', []))
-            total_size += res.get('size', 0)
-            skipped_recent += res.get('skipped_recent', 0)
-            skipped_recent_size += res.get('skipped_recent_size', 0)
-        return {
-            'files': files,
-            'items': items,
-            'size': total_size,
-            'skipped_recent': skipped_recent,
-            'skipped_recent_size': skipped_recent_size,
-        }
+        # Categories added purely through rules get a generic scanner
+        for rule in self.rules:
+            if rule.category not in self.categories:
+                self.categories[rule.category] = self._make_rule_scanner(rule.category)
+        self._rule_categories = {rule.category for rule in self.rules if rule.source == 'filesystem'}
+        self._default_scanners = dict(self.categories)
+
+    def _make_rule_scanner(self, category):
+        def _scan(min_age_days=None):
+            return self.scan_category(category, min_age_days=min_age_days)
+        return _scan
+
+    def _new_session(self):
+        return self.session if self.session is not None else ScanSession()
+
+    def _scan_rule_categories(self, categories, min_age_days=None, on_category_done=None):
+        wanted = set(categories)
+        rules = [r for r in self.rules if r.category in wanted and r.source == 'filesystem']
+        return scan_rules(
+            rules, self._new_session(), min_age_days=min_age_days, on_category_done=on_category_done,
+            backend=self.backend, workers=self.workers, throttle=self.throttle,
+        )
+
+    def watch_plan(self, categories):
+        """The walks behind the rule-backed categories, for a FileWatcher and rules.apply_events."""
+        wanted = set(categories)
+        rules = [r for r in self.rules if r.category in wanted and r.source == 'filesystem']
+        return plan_walks(rules, self._new_session())
+
+    def low_risk_categories(self):
+        """Categories whose rules stay out of admin-only (system) locations.
+
+        A restore point only protects system state, so these can be cleaned
+        before it is ready.
+        """
+        risky = {r.category for r in self.rules if r.admin or any(admin for _root, admin in r.roots)}
+        return {r.category for r in self.rules} - risky
+
+    def scan_category(self, category, min_age_days=None):
+        return self._scan_rule_categories([category], min_age_days).get(category, empty_result())
 
     def scan_logs(self, min_age_days=None):
-        # C:\Windows\Logs
-        if not is_admin():
-             return {'files': [], 'items': [], 'size': 0, 'skipped_recent': 0, 'skipped_recent_size': 0}
-
-        system_root = os.environ.get('SystemRoot')
-        if not system_root:
-            return {'files': [], 'items': [], 'size': 0, 'skipped_recent': 0, 'skipped_recent_size': 0}
-
-        log_path = os.path.join(system_root, 'Logs')
-        return self._generic_scan(log_path, ['.log'], min_age_days=min_age_days)
+        return self.scan_category('Windows Logs', min_age_days=min_age_days)
 
     def scan_crash_dumps(self, min_age_days=None):
-        # C:\Windows\Minidump and %LOCALAPPDATA%\CrashDumps
-        results = []
-        
-        # System Dumps
-        if is_admin():
-            sys_dump = os.path.join(os.environ.get('SystemRoot'), 'Minidump')
-            results.append(self._generic_scan(sys_dump, min_age_days=min_age_days))
-            
-        # User Dumps
-        local_app_data = os.environ.get('LOCALAPPDATA')
-        if local_app_data:
-            user_dump = os.path.join(local_app_data, 'CrashDumps')
-            results.append(self._generic_scan(user_dump, min_age_days=min_age_days))
-            
-        return self._merge_results(results) if results else {'files': [], 'items': [], 'size': 0, 'skipped_recent': 0, 'skipped_recent_size': 0}
-
-    def _generic_scan(self, path, extensions=None, name_predicate=None, min_age_days=None):
-        if not path or not os.path.exists(path):
-             return {'files': [], 'items': [], 'size': 0, 'skipped_recent': 0, 'skipped_recent_size': 0}
-        
-        files_found = []
-        items = []
-        total_size = 0
-        skipped_recent = 0
-        skipped_recent_size = 0
-        for root, dirs, files in os.walk(path):
-            for name in files:
-                if extensions and not any(name.lower().endswith(ext) for ext in extensions):
-                    continue
-                if name_predicate and not name_predicate(name):
-                    continue
-                try:
-                    filepath = os.path.join(root, name)
-                    if not self._is_old_enough(filepath, min_age_days):
-                        skipped_recent += 1
-                        try:
-                            skipped_recent_size += os.path.getsize(filepath)
-                        except Exception:
-                            pass
-                        continue
-                    size = os.path.getsize(filepath)
-                    files_found.append(filepath)
-                    items.append({'path': filepath, 'size': size})
-                    total_size += size
-                except Exception:
-                    pass
-        return {
-            'files': files_found,
-            'items': items,
-            'size': total_size,
-            'skipped_recent': skipped_recent,
-            'skipped_recent_size': skipped_recent_size,
-        }
+        return self.scan_category('Crash Dumps', min_age_days=min_age_days)
 
     def scan_temp(self, min_age_days=None):
-        temp_paths = [os.environ.get('TEMP')]
-        if is_admin():
-            temp_paths.append(os.path.join(os.environ.get('SystemRoot'), 'Temp'))
-
-        results = []
-
-        for path in temp_paths:
-             results.append(self._generic_scan(path, min_age_days=min_age_days))
-        
-        return self._merge_results(results) if results else {'files': [], 'items': [], 'size': 0, 'skipped_recent': 0, 'skipped_recent_size': 0}
+        return self.scan_category('System Temp', min_age_days=min_age_days)
 
     def scan_browser(self, browser_name, min_age_days=None):
-         local_app_data = os.environ.get('LOCALAPPDATA')
-         if not local_app_data:
-            return {'files': [], 'items': [], 'size': 0, 'skipped_recent': 0, 'skipped_recent_size': 0}
-            
-         paths = {
-            'Chrome': os.path.join(local_app_data, r'Google\Chrome\User Data\Default\Cache\Cache_Data'),
-            'Edge': os.path.join(local_app_data, r'Microsoft\Edge\User Data\Default\Cache\Cache_Data'),
-         }
-         
-         target_path = paths.get(browser_name)
-         if target_path:
-             return self._generic_scan(target_path, min_age_days=min_age_days)
-         return {'files': [], 'items': [], 'size': 0, 'skipped_recent': 0, 'skipped_recent_size': 0}
+        return self.scan_category(f"{browser_name} Cache", min_age_days=min_age_days)
 
     def scan_chrome_cache(self, min_age_days=None):
         return self.scan_browser('Chrome', min_age_days=min_age_days)
@@ -150,18 +88,23 @@ class Scanner:
     def scan_edge_cache(self, min_age_days=None):
         return self.scan_browser('Edge', min_age_days=min_age_days)
 
+    def recycle_bin_roots(self):
+        """The per-user $Recycle.Bin folders the Recycle Bin category reads and purges."""
+        return self.recycle_roots if self.recycle_roots is not None else recyclebin.default_roots()
+
     def scan_recycle_bin(self, min_age_days=None):
-        # Using winshell to get recycle bin content is tricky to list individually without emptying
-        # For v1 we will rely on a generic size estimate or skipping individual file listing if complex.
-        # Actually, let's try to iterate nicely if possible, or just use a known trick.
-        # Simple approach: Return a placeholder that says "Recycle Bin" and we use a different method to clean.
-        # BUT, standard python 'winshell' allows iterating.
-        
+        roots = self.recycle_bin_roots()
+        if roots:
+            # Bulk read of the $I headers; no shell call per item
+            return recyclebin.scan(roots, min_age_days=min_age_days)
+
         files_found = []
         items = []
         total_size = 0
         
         try:
+            # Imported here so headless runs don't pay for pywin32/COM start-up
+            import winshell
             # winshell.recycle_bin() returns an iterator of deleted items
             for item in winshell.recycle_bin():
                  # item.original_filename(), item.size()
@@ -180,87 +123,72 @@ class Scanner:
             'size': total_size,
             'skipped_recent': 0,
             'skipped_recent_size': 0,
+            'retained': 0,
+            'retained_size': 0,
         }
         
     def scan_prefetch(self, min_age_days=None):
-        if not is_admin():
-            return {'files': [], 'items': [], 'size': 0, 'skipped_recent': 0, 'skipped_recent_size': 0}
-            
-        system_root = os.environ.get('SystemRoot')
-        if not system_root:
-            return {'files': [], 'items': [], 'size': 0, 'skipped_recent': 0, 'skipped_recent_size': 0}
-
-        prefetch_path = os.path.join(system_root, 'Prefetch')
-        return self._generic_scan(prefetch_path, extensions=['.pf'], min_age_days=min_age_days)
+        return self.scan_category('Prefetch', min_age_days=min_age_days)
 
     def scan_windows_update_cache(self, min_age_days=None):
-        if not is_admin():
-            return {'files': [], 'items': [], 'size': 0, 'skipped_recent': 0, 'skipped_recent_size': 0}
-
-        system_root = os.environ.get('SystemRoot')
-        if not system_root:
-            return {'files': [], 'items': [], 'size': 0, 'skipped_recent': 0, 'skipped_recent_size': 0}
-
-        update_path = os.path.join(system_root, 'SoftwareDistribution', 'Download')
-        return self._generic_scan(update_path, min_age_days=min_age_days)
+        return self.scan_category('Windows Update Cache', min_age_days=min_age_days)
 
     def scan_thumbnail_cache(self, min_age_days=None):
-        local_app_data = os.environ.get('LOCALAPPDATA')
-        if not local_app_data:
-            return {'files': [], 'items': [], 'size': 0, 'skipped_recent': 0, 'skipped_recent_size': 0}
-
-        cache_path = os.path.join(local_app_data, 'Microsoft', 'Windows', 'Explorer')
-
-        def _thumb_predicate(name):
-            lowered = name.lower()
-            return lowered.startswith('thumbcache_') or lowered.startswith('iconcache_')
-
-        return self._generic_scan(cache_path, name_predicate=_thumb_predicate, min_age_days=min_age_days)
+        return self.scan_category('Thumbnail Cache', min_age_days=min_age_days)
 
     def scan_shader_cache(self, min_age_days=None):
-        local_app_data = os.environ.get('LOCALAPPDATA')
-        if not local_app_data:
-            return {'files': [], 'items': [], 'size': 0, 'skipped_recent': 0, 'skipped_recent_size': 0}
-
-        results = []
-        for folder in ['D3DSCache', 'D3DCache']:
-            cache_path = os.path.join(local_app_data, folder)
-            results.append(self._generic_scan(cache_path, min_age_days=min_age_days))
-
-        return self._merge_results(results) if results else {'files': [], 'items': [], 'size': 0, 'skipped_recent': 0, 'skipped_recent_size': 0}
+        return self.scan_category('DirectX Shader Cache', min_age_days=min_age_days)
 
     def scan_error_reports(self, min_age_days=None):
-        results = []
-
-        program_data = os.environ.get('ProgramData')
-        if program_data:
-            sys_wer = os.path.join(program_data, 'Microsoft', 'Windows', 'WER')
-            results.append(self._generic_scan(sys_wer, min_age_days=min_age_days))
-
-        local_app_data = os.environ.get('LOCALAPPDATA')
-        if local_app_data:
-            user_wer = os.path.join(local_app_data, 'Microsoft', 'Windows', 'WER')
-            results.append(self._generic_scan(user_wer, min_age_days=min_age_days))
-
-        return self._merge_results(results) if results else {'files': [], 'items': [], 'size': 0, 'skipped_recent': 0, 'skipped_recent_size': 0}
+        return self.scan_category('Windows Error Reports', min_age_days=min_age_days)
 
     def scan_selected(self, selected_categories, progress_cb=None, min_age_days=None):
+        selected = [cat for cat in selected_categories if cat in self.categories]
+        total = len(selected)
         results = {}
-        total = len(selected_categories)
-        for idx, cat in enumerate(selected_categories, start=1):
-            if cat not in self.categories:
+        done = [0]
+
+        def _report(cat, data):
+            results[cat] = data
+            done[0] += 1
+            if progress_cb:
+                try:
+                    progress_cb(done[0], total, cat, data)
+                except Exception as exc:
+                    # The caller's own failure (e.g. a closed output pipe) ends the
+                    # scan; it is not an error of the category being reported
+                    callback_error.append(exc)
+                    raise
+
+        callback_error = []
+        # Rule-backed categories are scanned together so shared roots are walked once
+        batched = [
+            cat for cat in selected
+            if cat in self._rule_categories and self.categories[cat] is self._default_scanners.get(cat)
+        ]
+        if batched:
+            try:
+                with instrument.span('scan rules', backend=self.backend, categories=len(batched)):
+                    self._scan_rule_categories(batched, min_age_days, on_category_done=_report)
+            except Exception as exc:
+                if callback_error:
+                    raise callback_error[0]
+                for cat in batched:
+                    if cat not in results:
+                        _report(cat, dict(empty_result(), error=str(exc)))
+
+        for cat in selected:
+            if cat in results:
                 continue
             try:
-                results[cat] = self.categories[cat](min_age_days=min_age_days)
+                with instrument.span('scan', category=cat):
+                    data = self.categories[cat](min_age_days=min_age_days)
             except Exception as exc:
-                results[cat] = {'files': [], 'items': [], 'size': 0, 'error': str(exc), 'skipped_recent': 0, 'skipped_recent_size': 0}
-            if progress_cb:
-                try:
-                    progress_cb(idx, total, cat, results[cat])
-                except Exception:
-                    # Progress callbacks should never break scans
-                    pass
+                data = dict(empty_result(), error=str(exc))
+            _report(cat, data)
 
+        # Keep the caller's category order
+        results = {cat: results[cat] for cat in selected if cat in results}
         self.scan_results = results
         return results
 
@@ -0,0 +1,360 @@
+"""Scheduled and idle-time cleaning without the GUI.
+
+Jobs come from schedule.json in the app data folder, for example:
+
+    [{"name": "Browser caches", "categories": ["Chrome Cache", "Edge Cache"],
+      "min_age_days": 7, "every_hours": 24, "when_idle": true}]
+
+A job is due once `every_hours` have passed since its last run and, with
+`when_idle`, only while CPU and disk have stayed quiet for a few checks.
+Runs are throttled and quarantined by default (see throttle.py and
+quarantine.py). Every run is appended to schedule_history.jsonl, and
+schedule_status.json says what the scheduler is doing, so the GUI can
+show both without scanning anything itself. Only one scheduler process
+runs jobs at a time: it holds schedule_status.json.lock while it works,
+and a second one (say a Task Scheduler `schedule once` next to a resident
+`schedule run`) gives up with SchedulerBusy instead of cleaning the same
+files.
+
+The Scanner and Cleaner are imported and built per run and dropped
+afterwards, so between runs the resident process is little more than a
+sleeping loop.
+"""
+import os
+import gc
+import json
+import time
+import threading
+
+from .throttle import Throttle, disk_busy_time, lower_thread_priority
+from .utils import get_app_data_dir
+
+JOB_KEYS = {'name', 'categories', 'min_age_days', 'every_hours', 'when_idle', 'quarantine', 'throttle', 'enabled'}
+POLL_SECONDS = 60
+# The history file is cut back to its newest records once it grows past this
+HISTORY_MAX_BYTES = 1024 * 1024
+HISTORY_KEEP = 500
+MAX_ERRORS_RECORDED = 20
+
+
+def schedule_path():
+    return os.path.join(get_app_data_dir(), 'schedule.json')
+
+
+def history_path():
+    return os.path.join(get_app_data_dir(), 'schedule_history.jsonl')
+
+
+def status_path():
+    return os.path.join(get_app_data_dir(), 'schedule_status.json')
+
+
+class ScheduledJob:
+    def __init__(self, spec):
+        unknown = set(spec) - JOB_KEYS
+        if unknown:
+            raise ValueError(f"Unknown job keys: {', '.join(sorted(unknown))}")
+        self.name = spec['name']
+        self.categories = list(spec.get('categories') or [])
+        self.min_age_days = int(spec.get('min_age_days', 0))
+        self.every_hours = float(spec.get('every_hours', 24))
+        self.when_idle = bool(spec.get('when_idle', False))
+        self.quarantine = bool(spec.get('quarantine', True))
+        self.throttle = bool(spec.get('throttle', True))
+        self.enabled = bool(spec.get('enabled', True))
+        if not self.categories:
+            raise ValueError(f"Job {self.name!r} has no categories")
+
+    def next_due(self, last_run):
+        return (last_run or 0) + self.every_hours * 3600
+
+    def is_due(self, last_run, now, idle):
+        if not self.enabled or now < self.next_due(last_run):
+            return False
+        return idle or not self.when_idle
+
+
+def load_jobs(path=None):
+    """Jobs from schedule.json; none when it is missing."""
+    path = path or schedule_path()
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [ScheduledJob(spec) for spec in json.load(f)]
+
+
+class IdleDetector:
+    """Idle once CPU use and disk busy time stayed under their limits for `samples` checks in a row."""
+
+    def __init__(self, cpu_percent=15.0, disk_busy=0.10, samples=3,
+                 cpu_source=None, busy_source=disk_busy_time, clock=time.monotonic):
+        self.cpu_limit = cpu_percent
+        self.busy_limit = disk_busy
+        self.samples = samples
+        self.cpu_source = cpu_source or _cpu_percent
+        self.busy_source = busy_source
+        self.clock = clock
+        self.quiet = 0
+        self._last = (clock(), busy_source())
+        # The first cpu_percent() call only sets its baseline
+        self.cpu_source()
+
+    def check(self):
+        now = self.clock()
+        busy_ms = self.busy_source()
+        last_at, last_busy = self._last
+        self._last = (now, busy_ms)
+        busy = 0.0
+        if busy_ms is not None and last_busy is not None and now > last_at:
+            busy = (busy_ms - last_busy) / ((now - last_at) * 1000)
+        cpu = self.cpu_source()
+        if cpu is not None and cpu < self.cpu_limit and busy < self.busy_limit:
+            self.quiet += 1
+        else:
+            self.quiet = 0
+        return self.quiet >= self.samples
+
+
+def _cpu_percent():
+    try:
+        import psutil
+        return psutil.cpu_percent(interval=None)
+    except Exception:
+        return None
+
+
+class SchedulerBusy(RuntimeError):
+    """Another scheduler process holds the lock."""
+
+
+def _lock_file(f):
+    f.seek(0)
+    if os.name == 'nt':
+        import msvcrt
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+class InstanceLock:
+    """An exclusive lock on a file, held until release() or the process dies.
+
+    Re-entrant within one Scheduler, so run_forever can hold it around the
+    run_pending and run_job calls that take it too.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.depth = 0
+
+    def acquire(self):
+        if self.depth == 0:
+            f = open(self.path, 'a+b')
+            try:
+                _lock_file(f)
+            except OSError:
+                f.close()
+                raise SchedulerBusy(f"Another scheduler is running (lock: {self.path})")
+            self.file = f
+        self.depth += 1
+
+    def release(self):
+        self.depth -= 1
+        if self.depth == 0:
+            # Closing the handle drops the lock on every platform
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def pid_alive(pid):
+    """Whether process `pid` still exists; assumed so when that cannot be told."""
+    if not pid:
+        return False
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        return True
+
+
+def _write_json(path, data):
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(path + '.tmp', path)
+
+
+def read_status(path=None):
+    try:
+        with open(path or status_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_history(path=None, limit=50):
+    """The newest `limit` run records, oldest first."""
+    try:
+        with open(path or history_path(), 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+    except OSError:
+        return []
+    records = []
+    for line in lines[-limit:] if limit else lines:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            # A record cut short by a crash mid-write
+            continue
+    return records
+
+
+class Scheduler:
+    def __init__(self, jobs=None, history_file=None, status_file=None, idle=None,
+                 scanner_factory=None, cleaner_factory=None, clock=time.time):
+        self.jobs = load_jobs() if jobs is None else jobs
+        self.history_file = history_file or history_path()
+        self.status_file = status_file or status_path()
+        self.idle = idle
+        self.scanner_factory = scanner_factory or _default_scanner
+        self.cleaner_factory = cleaner_factory or _default_cleaner
+        self.clock = clock
+        self.lock = InstanceLock(self.status_file + '.lock')
+        self._last_runs = None
+
+    def last_runs(self):
+        if self._last_runs is None:
+            self._last_runs = {}
+            for record in read_history(self.history_file, limit=0):
+                self._last_runs[record.get('job')] = record.get('started', 0)
+        return self._last_runs
+
+    def due_jobs(self, now=None, idle=False):
+        now = self.clock() if now is None else now
+        last = self.last_runs()
+        return [job for job in self.jobs if job.is_due(last.get(job.name), now, idle)]
+
+    def run_job(self, job, trigger='schedule'):
+        """Scans and cleans one job's categories; returns its history record.
+
+        Raises SchedulerBusy when another scheduler process is running.
+        """
+        with self.lock:
+            return self._run_job(job, trigger)
+
+    def _run_job(self, job, trigger):
+        started = self.clock()
+        self._write_status('running', job=job.name, since=started)
+        throttle = None
+        if job.throttle:
+            lower_thread_priority()
+            throttle = Throttle()
+        scanner = self.scanner_factory(throttle)
+        cleaner = self.cleaner_factory()
+        record = {'job': job.name, 'trigger': trigger, 'started': started}
+        results = session = None
+        try:
+            t0 = time.perf_counter()
+            results = scanner.scan_selected(job.categories, min_age_days=job.min_age_days)
+            record['scan_seconds'] = round(time.perf_counter() - t0, 3)
+
+            t0 = time.perf_counter()
+            session = cleaner.begin_quarantine() if job.quarantine else None
+            categories = {}
+            errors = []
+            for cat, data in results.items():
+                if data.get('error'):
+                    errors.append(f"[{cat}] {data['error']}")
+                if not data.get('files'):
+                    continue
+                count, size, errs = cleaner.clean_category(cat, data, False, session, throttle)
+                categories[cat] = {'items': count, 'size': size}
+                errors.extend(errs)
+            record['clean_seconds'] = round(time.perf_counter() - t0, 3)
+            record['categories'] = categories
+            record['items'] = sum(c['items'] for c in categories.values())
+            record['size'] = sum(c['size'] for c in categories.values())
+            record['error_count'] = len(errors)
+            record['errors'] = errors[:MAX_ERRORS_RECORDED]
+        except Exception as e:
+            record['failed'] = str(e)
+        finally:
+            if session is not None:
+                session.close()
+                record['quarantine_session'] = session.id if session.items else None
+            if throttle is not None:
+                record['throttled_seconds'] = round(throttle.slept, 3)
+        record['finished'] = self.clock()
+        self._append_history(record)
+        self.last_runs()[job.name] = started
+        # Nothing from the run is needed until the next one
+        del scanner, cleaner, results
+        gc.collect()
+        return record
+
+    def run_pending(self, now=None, idle=None):
+        """Runs every due job once; returns their records. Raises SchedulerBusy like run_job."""
+        if idle is None:
+            idle = self.idle.check() if self.idle is not None else False
+        with self.lock:
+            records = []
+            for job in self.due_jobs(now, idle):
+                records.append(self._run_job(job, 'idle' if job.when_idle else 'schedule'))
+            self._write_status('waiting', idle=idle)
+        return records
+
+    def run_forever(self, poll_seconds=POLL_SECONDS, stop=None):
+        """Checks for due jobs every `poll_seconds` until `stop` (a threading.Event) is set."""
+        stop = stop or threading.Event()
+        if self.idle is None:
+            self.idle = IdleDetector()
+        with self.lock:
+            try:
+                while not stop.is_set():
+                    self.run_pending()
+                    stop.wait(poll_seconds)
+            finally:
+                self._write_status('stopped')
+
+    def next_due(self):
+        last = self.last_runs()
+        return {job.name: job.next_due(last.get(job.name)) for job in self.jobs if job.enabled}
+
+    def _write_status(self, state, **extra):
+        status = {'state': state, 'pid': os.getpid(), 'updated': self.clock(), 'next_due': self.next_due()}
+        status.update(extra)
+        try:
+            _write_json(self.status_file, status)
+        except OSError:
+            pass
+
+    def _append_history(self, record):
+        try:
+            with open(self.history_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+            if os.path.getsize(self.history_file) > HISTORY_MAX_BYTES:
+                keep = read_history(self.history_file, limit=HISTORY_KEEP)
+                with open(self.history_file + '.tmp', 'w', encoding='utf-8') as f:
+                    for rec in keep:
+                        f.write(json.dumps(rec) + '\n')
+                os.replace(self.history_file + '.tmp', self.history_file)
+        except OSError:
+            pass
+
+
+def _default_scanner(throttle):
+    from .scanner import Scanner
+    return Scanner(throttle=throttle)
+
+
+def _default_cleaner():
+    from .cleaner import Cleaner
+    return Cleaner()
@@ -0,0 +1,52 @@
+import os
+
+from .utils import is_admin
+
+# Environment roots the built-in rules are written against
+KNOWN_ROOTS = ('SystemRoot', 'SystemDrive', 'LOCALAPPDATA', 'APPDATA', 'ProgramData', 'TEMP', 'USERPROFILE')
+
+
+class ScanSession:
+    """Privileges and root locations resolved once for the length of a scan.
+
+    Pass `env` and `admin` to simulate another machine layout (tests point
+    the Windows variables at temp folders on Linux). Roots that resolve to
+    the same real folder share one key, so they are only walked once.
+    """
+
+    def __init__(self, env=None, admin=None):
+        self.env = dict(os.environ if env is None else env)
+        self.admin = is_admin() if admin is None else bool(admin)
+        # Windows variable names ignore case, and a copy of os.environ has them upper-cased
+        upper = {name.upper(): value for name, value in self.env.items() if value}
+        self.roots = {name: upper[name.upper()] for name in KNOWN_ROOTS if name.upper() in upper}
+        # What %VAR% resolves to: the roots above, then any other variable a user rule names
+        self._variables = dict(upper, **self.roots)
+        self._expanded = {}
+        self._keys = {}
+
+    def expand(self, template):
+        if template not in self._expanded:
+            from .rules import expand_template
+            self._expanded[template] = expand_template(template, self._variables)
+        return self._expanded[template]
+
+    def resolve_roots(self, rule):
+        """Returns the rule's roots that exist for this session's privileges."""
+        if rule.admin and not self.admin:
+            return []
+        resolved = []
+        for template, needs_admin in rule.roots:
+            if needs_admin and not self.admin:
+                continue
+            path = self.expand(template)
+            if path:
+                resolved.append(path)
+        return resolved
+
+    def root_key(self, path):
+        """Normalised real path used to detect duplicate and nested roots."""
+        key = self._keys.get(path)
+        if key is None:
+            key = self._keys[path] = os.path.normcase(os.path.realpath(path))
+        return key
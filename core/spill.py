@@ -0,0 +1,66 @@
+"""Append-only message log on disk that can be read back a page at a time.
+
+The activity log widget keeps only its most recent lines; everything is
+also written here, so a clean that fails on 20k locked files costs the
+UI one summary line while the full list stays available. Message start
+offsets are kept in an `array('Q')` (8 bytes a message), and separately
+for errors, so reading any page seeks straight to its messages.
+"""
+import os
+import threading
+from array import array
+from bisect import bisect_right
+
+
+class SpillLog:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._offsets = array('Q')
+        self._errors = array('Q')
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._file = open(path, 'w+b')
+        self._end = 0
+
+    def __len__(self):
+        return len(self._offsets)
+
+    @property
+    def error_count(self):
+        return len(self._errors)
+
+    def append(self, text, error=False):
+        data = text.encode('utf-8', 'replace') + b'\n'
+        with self._lock:
+            self._file.seek(self._end)
+            self._file.write(data)
+            self._offsets.append(self._end)
+            if error:
+                self._errors.append(self._end)
+            self._end += len(data)
+
+    def _read(self, offset):
+        # Messages may hold newlines; one runs up to the start of the next
+        index = bisect_right(self._offsets, offset)
+        end = self._offsets[index] if index < len(self._offsets) else self._end
+        self._file.seek(offset)
+        return self._file.read(end - offset)[:-1].decode('utf-8', 'replace')
+
+    def page(self, start=0, count=500, errors_only=False):
+        """Returns up to `count` messages from message number `start`."""
+        with self._lock:
+            self._file.flush()
+            offsets = self._errors if errors_only else self._offsets
+            return [self._read(offset) for offset in offsets[start:start + count]]
+
+    def reset(self):
+        with self._lock:
+            self._file.seek(0)
+            self._file.truncate()
+            self._offsets = array('Q')
+            self._errors = array('Q')
+            self._end = 0
+
+    def close(self):
+        with self._lock:
+            self._file.close()
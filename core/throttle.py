@@ -0,0 +1,152 @@
+"""Background mode: rate limits and low priority for scans and cleans.
+
+A Throttle is paced once per file the worker touches. Two token buckets
+cap files and bytes per second, and both slow down further while the
+system disk is busy (psutil's busy_time, where the OS reports one),
+recovering gradually once it is quiet again. lower_thread_priority() drops the
+calling worker thread to idle CPU and I/O priority so foreground apps
+win any contention that is left.
+"""
+import os
+import sys
+import time
+import ctypes
+import threading
+from functools import lru_cache
+
+FILES_PER_SEC = 2000
+BYTES_PER_SEC = 64 * 1024 * 1024
+# Fraction of wall time the disk may be busy before the rates back off
+BUSY_THRESHOLD = 0.6
+MIN_FACTOR = 1 / 16
+
+
+class TokenBucket:
+    """Allows `rate` units a second with bursts up to `burst`.
+
+    take() may overdraw the bucket (one large file can exceed the burst);
+    the debt is slept off right away, so the average rate still holds.
+    """
+
+    def __init__(self, rate, burst=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = self.burst
+        self._last = clock()
+
+    def take(self, amount=1):
+        """Takes `amount` tokens, sleeping as needed; returns the seconds slept."""
+        if not self.rate:
+            return 0.0
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+        self.tokens -= amount
+        if self.tokens >= 0:
+            return 0.0
+        delay = -self.tokens / self.rate
+        self.sleep(delay)
+        return delay
+
+
+@lru_cache(maxsize=None)
+def _system_disk():
+    """psutil's per-disk name for the device holding the system drive, or None."""
+    import psutil
+    root = os.environ.get('SystemDrive', 'C:') + '\\' if sys.platform == 'win32' else '/'
+    for part in psutil.disk_partitions(all=False):
+        if part.mountpoint == root:
+            return os.path.basename(part.device)
+    return None
+
+
+def disk_busy_time():
+    """Milliseconds the system disk has spent busy so far, or None where that is not reported.
+
+    Only psutil's busy_time (Linux, BSD) measures this. Windows reports
+    read and write times instead, which add up every request in flight,
+    so a queue deeper than one would look like a disk busy all the time;
+    there, and without psutil, the rates do not back off and only the
+    fixed limits apply. Where the system disk cannot be told apart (e.g.
+    an overlay root), all disks are counted; Throttle caps the result at
+    the wall time.
+    """
+    try:
+        import psutil
+        counters = psutil.disk_io_counters(perdisk=True).get(_system_disk() or '')
+        if counters is None:
+            counters = psutil.disk_io_counters()
+    except Exception:
+        return None
+    return getattr(counters, 'busy_time', None)
+
+
+class Throttle:
+    def __init__(self, files_per_sec=FILES_PER_SEC, bytes_per_sec=BYTES_PER_SEC,
+                 busy_threshold=BUSY_THRESHOLD, sample_interval=0.5,
+                 busy_source=disk_busy_time, clock=time.monotonic, sleep=time.sleep):
+        self.files = TokenBucket(files_per_sec, clock=clock, sleep=sleep)
+        self.bytes = TokenBucket(bytes_per_sec, clock=clock, sleep=sleep)
+        self.base_rates = (files_per_sec, bytes_per_sec)
+        self.busy_threshold = busy_threshold
+        self.sample_interval = sample_interval
+        self.busy_source = busy_source
+        self.clock = clock
+        self.factor = 1.0
+        self.busy = 0.0
+        self.slept = 0.0
+        self._sample = (clock(), busy_source())
+
+    def _adapt(self, now):
+        last_at, last_busy = self._sample
+        if now - last_at < self.sample_interval:
+            return
+        busy_ms = self.busy_source()
+        self._sample = (now, busy_ms)
+        if busy_ms is None or last_busy is None:
+            return
+        self.busy = min(1.0, max(0.0, (busy_ms - last_busy) / ((now - last_at) * 1000)))
+        if self.busy > self.busy_threshold:
+            self.factor = max(MIN_FACTOR, self.factor / 2)
+        else:
+            self.factor = min(1.0, self.factor * 1.25)
+        self.files.rate = self.base_rates[0] * self.factor
+        self.bytes.rate = self.base_rates[1] * self.factor
+
+    def pace(self, files=1, nbytes=0):
+        """Waits until `files` more files and `nbytes` more bytes fit the limits."""
+        self._adapt(self.clock())
+        slept = self.files.take(files)
+        if nbytes:
+            slept += self.bytes.take(nbytes)
+        self.slept += slept
+        return slept
+
+
+def lower_thread_priority():
+    """Drops the calling thread to idle CPU and I/O priority where the OS allows it.
+
+    Only the current thread is affected, so a throttled worker does not
+    slow the GUI thread down with it.
+    """
+    try:
+        if sys.platform == 'win32':
+            kernel32 = ctypes.windll.kernel32
+            thread = kernel32.GetCurrentThread()
+            # THREAD_PRIORITY_IDLE, then THREAD_MODE_BACKGROUND_BEGIN for I/O and memory priority
+            kernel32.SetThreadPriority(thread, -15)
+            kernel32.SetThreadPriority(thread, 0x00010000)
+        elif sys.platform.startswith('linux'):
+            # Linux schedules threads as tasks, so a thread id works wherever a pid does
+            tid = threading.get_native_id()
+            try:
+                import psutil
+                task = psutil.Process(tid)
+                task.nice(19)
+                task.ionice(psutil.IOPRIO_CLASS_IDLE)
+            except ImportError:
+                os.setpriority(os.PRIO_PROCESS, tid, 19)
+    except Exception:
+        pass
@@ -1,6 +1,7 @@
 import math
 import ctypes
 import os
+from functools import lru_cache
 
 def format_size(size_bytes):
     if size_bytes == 0:
@@ -11,11 +12,23 @@ def format_size(size_bytes):
     s = round(size_bytes / p, 2)
     return f"{s} {size_name[i]}"
 
+@lru_cache(maxsize=None)
 def is_admin():
+    # Elevation cannot change for a running process, so ask Windows once
+    windll = getattr(ctypes, 'windll', None)
+    if windll is None:
+        return False
     try:
-        return ctypes.windll.shell32.IsUserAnAdmin()
+        return bool(windll.shell32.IsUserAnAdmin())
     except Exception:
         return False
 
 def get_system_drive():
     return os.environ['SystemDrive']
+
+def get_app_data_dir(*parts):
+    """Returns (and creates) the per-user data directory, optionally a subfolder of it."""
+    base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    path = os.path.join(base, 'CleanerWannabe', *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
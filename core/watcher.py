@@ -0,0 +1,314 @@
+"""Optional filesystem change watching for scan results and indexes.
+
+Linux uses inotify through ctypes (no extra dependency); everywhere else
+a polling backend diffs periodic snapshots. Raw events are coalesced per
+path and delivered in debounced batches of (kind, path) tuples, where
+kind is 'created', 'deleted', 'modified', 'deleted_dir' (a folder was
+removed or moved out, with whatever was still in it) or 'overflow'
+(events were lost and the watched root should be rescanned).
+"""
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import threading
+
+CREATED = 'created'
+DELETED = 'deleted'
+DELETED_DIR = 'deleted_dir'
+MODIFIED = 'modified'
+OVERFLOW = 'overflow'
+
+
+class PollingBackend:
+    """Detects changes by re-walking the roots and diffing (size, mtime) snapshots."""
+
+    def __init__(self, roots, interval=5.0):
+        self.roots = list(roots)
+        self.interval = interval
+        self._snapshot = self._take_snapshot()
+        self._stop = threading.Event()
+
+    def _take_snapshot(self):
+        snapshot = {}
+        for root in self.roots:
+            stack = [root]
+            while stack:
+                current = stack.pop()
+                try:
+                    with os.scandir(current) as it:
+                        for entry in it:
+                            try:
+                                if entry.is_dir(follow_symlinks=False):
+                                    stack.append(entry.path)
+                                elif not entry.is_symlink():
+                                    st = entry.stat(follow_symlinks=False)
+                                    snapshot[entry.path] = (st.st_size, st.st_mtime)
+                            except OSError:
+                                continue
+                except OSError:
+                    continue
+        return snapshot
+
+    def read(self, timeout):
+        if self._stop.wait(min(timeout, self.interval)):
+            return []
+        current = self._take_snapshot()
+        previous = self._snapshot
+        self._snapshot = current
+        events = []
+        for path, meta in current.items():
+            old = previous.get(path)
+            if old is None:
+                events.append((CREATED, path))
+            elif old != meta:
+                events.append((MODIFIED, path))
+        for path in previous.keys() - current.keys():
+            events.append((DELETED, path))
+        return events
+
+    def close(self):
+        self._stop.set()
+
+
+class InotifyBackend:
+    """Recursive inotify watches on Linux via libc."""
+
+    IN_MODIFY = 0x2
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_FROM = 0x40
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_DELETE_SELF = 0x400
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    MASK = IN_CLOSE_WRITE | IN_MODIFY | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+    EVENT = struct.Struct('iIII')
+
+    def __init__(self, roots):
+        import ctypes
+        import ctypes.util
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._get_errno = ctypes.get_errno
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.roots = list(roots)
+        self._paths = {}  # watch descriptor -> directory
+        self._pending = []
+        for root in self.roots:
+            self._watch_tree(root, report=False)
+
+    def _watch_tree(self, root, report):
+        stack = [root]
+        lost = False
+        while stack:
+            current = stack.pop()
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(current), self.MASK)
+            if wd < 0:
+                # Out of watches (fs.inotify.max_user_watches): this subtree's changes would go unseen
+                if not lost and self._get_errno() in (errno.ENOSPC, errno.ENOMEM):
+                    lost = True
+                    self._pending.append((OVERFLOW, self._root_of(current)))
+                continue
+            self._paths[wd] = current
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif report:
+                                # Files that landed before the new folder was watched
+                                self._pending.append((CREATED, entry.path))
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+    def _unwatch_tree(self, path):
+        # A folder moved elsewhere keeps its watches, and would report under its old path
+        prefix = path.rstrip(os.sep) + os.sep
+        for wd, directory in list(self._paths.items()):
+            if directory == path or directory.startswith(prefix):
+                del self._paths[wd]
+                self._libc.inotify_rm_watch(self._fd, wd)
+
+    def _root_of(self, path):
+        for root in self.roots:
+            if path == root or path.startswith(root.rstrip(os.sep) + os.sep):
+                return root
+        return path
+
+    def read(self, timeout):
+        events, self._pending = self._pending, []
+        if events:
+            timeout = 0
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return events
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return events
+        offset = 0
+        while offset + self.EVENT.size <= len(data):
+            wd, mask, _cookie, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                events.extend((OVERFLOW, root) for root in self.roots)
+                continue
+            if mask & self.IN_IGNORED:
+                self._paths.pop(wd, None)
+                continue
+            directory = self._paths.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self._watch_tree(path, report=True)
+                elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                    self._unwatch_tree(path)
+                    events.append((DELETED_DIR, path))
+                continue
+            if mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                events.append((DELETED, path))
+            elif mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                events.append((CREATED, path))
+            else:
+                events.append((MODIFIED, path))
+        events.extend(self._pending)
+        self._pending = []
+        return events
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def has_native_backend():
+    return sys.platform.startswith('linux')
+
+
+def make_backend(roots, polling_interval=5.0, polling=True):
+    """The native backend when available, else polling (or None when polling is not allowed).
+
+    Building one walks the roots (to add watches or take the first
+    snapshot), so FileWatcher does it on its own thread.
+    """
+    if has_native_backend():
+        try:
+            return InotifyBackend(roots)
+        except (OSError, AttributeError):
+            pass
+    if not polling:
+        return None
+    return PollingBackend(roots, interval=polling_interval)
+
+
+def coalesce(pending, kind, path):
+    """Folds one event into the pending path -> kind map."""
+    previous = pending.get(path)
+    if previous == CREATED and kind == DELETED:
+        # Created and gone again within one batch: nothing happened
+        del pending[path]
+    elif previous == CREATED and kind == MODIFIED:
+        pass
+    elif previous == DELETED and kind == CREATED:
+        pending[path] = MODIFIED
+    else:
+        pending[path] = kind
+
+
+class FileWatcher:
+    """Watches roots on a background thread and calls on_batch(events) with debounced batches.
+
+    A batch is delivered once no new event arrived for `debounce` seconds,
+    or `max_delay` seconds after its first event during constant churn.
+    With polling=False the watcher stays inactive where no native backend
+    exists, for trees too large to re-walk every few seconds. The backend
+    is built on the watcher's thread, since that walks the roots.
+    """
+
+    def __init__(self, roots, on_batch, debounce=0.5, max_delay=3.0, backend=None, polling=True):
+        self.roots = [r for r in roots if os.path.isdir(r)]
+        self.on_batch = on_batch
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.backend = backend
+        self.polling = polling
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def active(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if not self.roots:
+            return self
+        if self.backend is None and not self.polling and not has_native_backend():
+            return self
+        self._thread = threading.Thread(target=self._run, name='FileWatcher', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self.backend is not None:
+            self.backend.close()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _run(self):
+        if self.backend is None:
+            try:
+                backend = make_backend(self.roots, polling=self.polling)
+            except OSError:
+                return
+            if backend is None:
+                return
+            self.backend = backend
+            if self._stop.is_set():
+                # stop() ran while the backend was being built
+                backend.close()
+                return
+        pending = {}
+        first = last = None
+        while not self._stop.is_set():
+            try:
+                events = self.backend.read(self.debounce / 2 if pending else 1.0)
+            except (OSError, ValueError):
+                if self._stop.is_set():
+                    break
+                raise
+            now = time.monotonic()
+            for kind, path in events:
+                coalesce(pending, kind, path)
+                last = now
+                if first is None:
+                    first = now
+            if pending and (now - last >= self.debounce or now - first >= self.max_delay):
+                batch = list((kind, path) for path, kind in pending.items())
+                pending = {}
+                first = last = None
+                try:
+                    self.on_batch(batch)
+                except Exception:
+                    # A failing consumer must not kill the watcher
+                    pass
+
+
+def dirty_dirs(events):
+    """Folders whose listings or files changed, for DiskIndex.refresh(dirty=...)."""
+    return {os.path.normcase(os.path.dirname(path)) for kind, path in events if kind != OVERFLOW}
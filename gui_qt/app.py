@@ -1,4 +1,4 @@
-from PySide6.QtCore import Qt, QSize
+from PySide6.QtCore import Qt, QSize, QThread
 from PySide6.QtGui import QFont, QPixmap
 from PySide6.QtWidgets import (
     QMainWindow,
@@ -14,6 +14,7 @@ from PySide6.QtWidgets import (
 from core.scanner import Scanner
 from core.cleaner import Cleaner
 from core.analyzer import Analyzer
+from core.history import MetricsHistory
 from core.utils import is_admin
 
 from gui_qt.theme import FONT_BODY, FONT_DISPLAY, THEME, asset_path, get_stylesheet
@@ -21,6 +22,7 @@ from gui_qt.widgets.illustrations import make_nav_icon
 from gui_qt.views.dashboard_view import DashboardView
 from gui_qt.views.cleaner_view import CleanerView
 from gui_qt.views.tools_view import ToolsView
+from gui_qt.workers import MetricsSampler
 
 class CleanerApp(QMainWindow):
     def __init__(self):
@@ -30,6 +32,7 @@ class CleanerApp(QMainWindow):
         self.scanner = Scanner()
         self.cleaner = Cleaner()
         self.analyzer = Analyzer()
+        self._start_metrics_sampler()
 
         self.setWindowTitle("Cleaner Wannabe")
         self.resize(1200, 760)
@@ -45,6 +48,26 @@ class CleanerApp(QMainWindow):
         self.btn_cleaner.clicked.connect(lambda: self._set_active_nav(self.btn_cleaner))
         self.btn_tools.clicked.connect(lambda: self._set_active_nav(self.btn_tools))
 
+    def _start_metrics_sampler(self):
+        try:
+            self.metrics_history = MetricsHistory()
+        except OSError:
+            self.metrics_history = None
+        self.metrics_thread = QThread()
+        self.metrics_sampler = MetricsSampler(history=self.metrics_history)
+        self.metrics_sampler.moveToThread(self.metrics_thread)
+        self.metrics_thread.started.connect(self.metrics_sampler.run)
+        self.metrics_thread.start()
+
+    def closeEvent(self, event):
+        self.cleaner_view.stop_watching()
+        self.tools_view.stop_watching()
+        # Blocks until the sampler has stopped its timer and flushed the history
+        self.metrics_sampler.stop()
+        self.metrics_thread.quit()
+        self.metrics_thread.wait(2000)
+        super().closeEvent(event)
+
     def _build_sidebar(self):
         root = QWidget()
         self.root_layout = QHBoxLayout(root)
@@ -115,6 +138,7 @@ class CleanerApp(QMainWindow):
         self.dashboard_view = DashboardView(main_app=self)
         self.cleaner_view = CleanerView(self.scanner, self.cleaner)
         self.tools_view = ToolsView(self.analyzer)
+        self.cleaner_view.reclaimable_changed.connect(self.dashboard_view.set_reclaimable)
 
         self.stack.addWidget(self.dashboard_view)
         self.stack.addWidget(self.cleaner_view)
@@ -95,7 +95,7 @@ def get_stylesheet() -> str:
     QFrame#Card {{
         background: {THEME["bg_panel"]};
         border-radius: 16px;
-        /* The drop shadow is handled programmatically via QGraphicsDropShadowEffect */
+        /* The drop shadow is a cached pixmap, see gui_qt/widgets/shadows.py */
     }}
     QFrame#HeroCard {{
         background: qlineargradient(
@@ -1,3 +1,5 @@
+import os
+
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -15,28 +17,55 @@ from PySide6.QtWidgets import (
     QSplitter,
     QMessageBox,
     QHeaderView,
-    QGraphicsDropShadowEffect
+    QFileDialog,
+    QApplication
 )
-from PySide6.QtCore import Qt, QThread
-from PySide6.QtGui import QFont, QColor
-
-from core.utils import format_size
+from PySide6.QtCore import Qt, QThread, Signal, QRegularExpression
+from PySide6.QtGui import QFont, QColor, QRegularExpressionValidator
+
+from core import instrument
+from core.ages import refilter
+from core.results import STORE, scan_summary
+from core.scanfile import EXTENSION, save
+from core.rules import apply_events
+from core.spill import SpillLog
+from core.throttle import Throttle
+from core.utils import format_size, get_app_data_dir
 from gui_qt.theme import FONT_DISPLAY, FONT_BODY
 from gui_qt.widgets.illustrations import CatIllustration
-from gui_qt.workers import ScanWorker, CleanWorker
+from gui_qt.widgets.logview import LogSink, SpillLogDialog
+from gui_qt.widgets.quarantine import QuarantineDialog
+from gui_qt.widgets.shadows import apply_shadow
+from gui_qt.workers import ScanWorker, CleanWorker, LoadScanWorker, WatchBridge
 
 class CleanerView(QWidget):
+    # Bytes the current scan results would free; kept live by the watcher
+    reclaimable_changed = Signal(object)
+
     def __init__(self, scanner, cleaner):
         super().__init__()
         self.scanner = scanner
         self.cleaner = cleaner
         
+        # Results live in the ResultStore; scan_results is the stored dict, not a copy
+        self.scan_handle = None
         self.scan_results = {}
+        self.scan_summary = {}
         self.clean_targets = {}
+        self.clean_quarantined = False
         self.is_scanning = False
         self.is_cleaning = False
+        self.scan_min_age_days = 0
+        # Results read from a scan file are re-checked before cleaning
+        self.scan_loaded = False
+        # The instrument.Recorder of the last scan or clean, with "Record timings" on
+        self.recorder = None
+        self.watch = None
+        self.watch_walks = []
 
         self._build_ui()
+        # Drop expired quarantine sessions without holding up startup
+        self.cleaner.quarantine.start_purge()
 
     def _page_header(self, title, subtitle):
         container = QWidget()
@@ -68,11 +97,7 @@ class CleanerView(QWidget):
         hero_layout = QHBoxLayout(hero)
         hero_layout.setContentsMargins(20, 16, 20, 16)
         hero_layout.setSpacing(16)
-        hero_shadow = QGraphicsDropShadowEffect(hero)
-        hero_shadow.setBlurRadius(24)
-        hero_shadow.setOffset(0, 6)
-        hero_shadow.setColor(QColor(90, 62, 43, 50))
-        hero.setGraphicsEffect(hero_shadow)
+        apply_shadow(hero, blur=24, offset=(0, 6), color=QColor(90, 62, 43, 50), radius=20)
 
         hero_art = CatIllustration()
         hero_layout.addWidget(hero_art)
@@ -108,11 +133,7 @@ class CleanerView(QWidget):
         options_panel = QFrame()
         options_panel.setObjectName("Card")
 
-        os_shadow = QGraphicsDropShadowEffect(options_panel)
-        os_shadow.setBlurRadius(20)
-        os_shadow.setOffset(0, 4)
-        os_shadow.setColor(QColor(0, 0, 0, 8))
-        options_panel.setGraphicsEffect(os_shadow)
+        apply_shadow(options_panel)
 
         options_layout = QVBoxLayout(options_panel)
         options_layout.setContentsMargins(16, 16, 16, 16)
@@ -157,12 +178,44 @@ class CleanerView(QWidget):
         self.safe_mode_check.setChecked(True)
         self.safe_mode_check.setStyleSheet("color: #5a463b;")
         options_layout.addWidget(self.safe_mode_check)
+        self.quarantine_check = QCheckBox("Quarantine (fast, restorable)")
+        self.quarantine_check.setToolTip(
+            "Move files aside on the same drive instead of the Recycle Bin. "
+            f"Kept for {self.cleaner.quarantine.retention_days} day(s)."
+        )
+        self.quarantine_check.setStyleSheet("color: #5a463b;")
+        self.quarantine_check.toggled.connect(lambda on: self.safe_mode_check.setEnabled(not on))
+        options_layout.addWidget(self.quarantine_check)
+        self.background_check = QCheckBox("Background Mode (gentle on disk)")
+        self.background_check.setToolTip(
+            "Scan and clean at low priority and a limited rate, slowing down further while the disk is busy."
+        )
+        self.background_check.setStyleSheet("color: #5a463b;")
+        options_layout.addWidget(self.background_check)
+
+        self.timing_check = QCheckBox("Record timings")
+        self.timing_check.setToolTip(
+            "Time each phase and count folders, files and errors. The report goes to the log; "
+            "Export Trace saves it for chrome://tracing."
+        )
+        self.timing_check.setStyleSheet("color: #5a463b;")
+        options_layout.addWidget(self.timing_check)
 
         options_layout.addWidget(QLabel("Safety Filters"))
         self.age_combo = QComboBox()
+        self.age_combo.setEditable(True)
+        self.age_combo.setInsertPolicy(QComboBox.NoInsert)
         self.age_combo.addItems(["Any time", "1 day", "7 days", "30 days"])
+        self.age_combo.setValidator(QRegularExpressionValidator(
+            QRegularExpression(r"(?i)any( time)?|\d{1,4}( days?)?"), self.age_combo
+        ))
+        # Applied once an edit is finished, not on every keystroke
+        self.age_combo.textActivated.connect(self._on_age_changed)
+        self.age_combo.lineEdit().editingFinished.connect(self._on_age_changed)
         options_layout.addWidget(self.age_combo)
-        age_hint = QLabel("Only clean files older than the selected age.")
+        age_hint = QLabel("Only clean files older than the selected age (any number of days). "
+                          "Changing it after a scan re-filters the results.")
+        age_hint.setWordWrap(True)
         age_hint.setObjectName("Muted")
         options_layout.addWidget(age_hint)
 
@@ -171,6 +224,18 @@ class CleanerView(QWidget):
         self.scan_btn.clicked.connect(self.start_scan)
         options_layout.addWidget(self.scan_btn)
 
+        file_row = QHBoxLayout()
+        self.open_scan_btn = QPushButton("Open Scan…")
+        self.open_scan_btn.setObjectName("Ghost")
+        self.open_scan_btn.setToolTip("Load results saved earlier, e.g. by 'python -m core scan --save'.")
+        self.open_scan_btn.clicked.connect(self._open_scan)
+        file_row.addWidget(self.open_scan_btn)
+        save_scan_btn = QPushButton("Save Scan…")
+        save_scan_btn.setObjectName("Ghost")
+        save_scan_btn.clicked.connect(self._save_scan)
+        file_row.addWidget(save_scan_btn)
+        options_layout.addLayout(file_row)
+
         self.scan_progress = QProgressBar()
         self.scan_progress.setRange(0, 100)
         self.scan_progress.setValue(0)
@@ -182,11 +247,7 @@ class CleanerView(QWidget):
         results_panel = QFrame()
         results_panel.setObjectName("Card")
 
-        rs_shadow = QGraphicsDropShadowEffect(results_panel)
-        rs_shadow.setBlurRadius(20)
-        rs_shadow.setOffset(0, 4)
-        rs_shadow.setColor(QColor(0, 0, 0, 8))
-        results_panel.setGraphicsEffect(rs_shadow)
+        apply_shadow(results_panel)
 
         results_layout = QVBoxLayout(results_panel)
         results_layout.setContentsMargins(16, 16, 16, 16)
@@ -213,23 +274,39 @@ class CleanerView(QWidget):
         self.summary_total.setObjectName("Muted")
         results_layout.addWidget(self.summary_total)
 
+        log_row = QHBoxLayout()
         log_title = QLabel("Activity Log")
         log_title.setFont(QFont(FONT_BODY, 12, QFont.Bold))
-        results_layout.addWidget(log_title)
+        log_row.addWidget(log_title)
+        log_row.addStretch(1)
+        self.show_errors_btn = QPushButton("Show All Errors")
+        self.show_errors_btn.setObjectName("Ghost")
+        self.show_errors_btn.setEnabled(False)
+        self.show_errors_btn.clicked.connect(self._show_all_errors)
+        log_row.addWidget(self.show_errors_btn)
+        restore_btn = QPushButton("Restore…")
+        restore_btn.setObjectName("Ghost")
+        restore_btn.clicked.connect(self._show_quarantine)
+        log_row.addWidget(restore_btn)
+        self.export_trace_btn = QPushButton("Export Trace…")
+        self.export_trace_btn.setObjectName("Ghost")
+        self.export_trace_btn.setEnabled(False)
+        self.export_trace_btn.clicked.connect(self._export_trace)
+        log_row.addWidget(self.export_trace_btn)
+        results_layout.addLayout(log_row)
         self.log_box = QPlainTextEdit()
         self.log_box.setReadOnly(True)
         results_layout.addWidget(self.log_box, 1)
+        # Every message also goes to disk; the box keeps the recent ones
+        self.log_spill = SpillLog(os.path.join(get_app_data_dir("logs"), "activity.log"))
+        self.log_sink = LogSink(self.log_box, self.log_spill)
 
         self.clean_btn = QPushButton("Clean Files")
         self.clean_btn.setObjectName("PrimaryPill")
         self.clean_btn.setEnabled(False)
         self.clean_btn.clicked.connect(self.start_clean)
         self.clean_btn.setMinimumHeight(44)
-        clean_shadow = QGraphicsDropShadowEffect(self.clean_btn)
-        clean_shadow.setBlurRadius(24)
-        clean_shadow.setOffset(0, 8)
-        clean_shadow.setColor(QColor(90, 62, 43, 90))
-        self.clean_btn.setGraphicsEffect(clean_shadow)
+        apply_shadow(self.clean_btn, blur=24, offset=(0, 8), color=QColor(90, 62, 43, 90), radius=None)
         results_layout.addWidget(self.clean_btn)
 
         splitter.addWidget(options_panel)
@@ -250,15 +327,38 @@ class CleanerView(QWidget):
             cb.setChecked(False)
 
     def _parse_age_days(self, text):
-        if not text or "any" in text.lower():
+        """Days in an age text; 0 for "Any time", None for text that is not an age yet."""
+        text = text.strip().lower()
+        if text.startswith("any"):
             return 0
         try:
             return int(text.split()[0])
-        except Exception:
-            return 0
+        except (IndexError, ValueError):
+            return None
+
+    def _age_days(self):
+        """The age box's threshold. Unfinished text is put back to the threshold in use, never to "Any time"."""
+        days = self._parse_age_days(self.age_combo.currentText())
+        if days is None:
+            days = self.scan_min_age_days
+            self.age_combo.setEditText("Any time" if not days else f"{days} day{'s' if days != 1 else ''}")
+        return days
+
+    def _append_log(self, text, error=False):
+        self.log_sink.append(text, error)
+        if error:
+            self.show_errors_btn.setEnabled(True)
+
+    def _clear_log(self):
+        self.log_sink.clear()
+        self.show_errors_btn.setEnabled(False)
 
-    def _append_log(self, text):
-        self.log_box.appendPlainText(text)
+    def _show_all_errors(self):
+        self.log_sink.flush()
+        SpillLogDialog(self.log_spill, errors_only=True, title="Errors", parent=self).exec()
+
+    def _show_quarantine(self):
+        QuarantineDialog(self.cleaner.quarantine, parent=self).exec()
 
     def _set_scan_status(self, text, progress=None):
         self.scan_status.setText(text)
@@ -292,16 +392,15 @@ class CleanerView(QWidget):
     def _populate_summary_tree(self):
         self.summary_tree.blockSignals(True)
         self.summary_tree.clear()
-        for cat, data in self.scan_results.items():
-            files = data.get("files", [])
-            size = data.get("size", 0)
-            skipped = data.get("skipped_recent", 0)
+        for cat, data in self.scan_summary.items():
+            count = data["items"]
+            skipped = data["skipped_recent"]
             item = QTreeWidgetItem(
-                [cat, str(len(files)), format_size(size), str(skipped) if skipped else ""]
+                [cat, str(count), format_size(data["size"]), str(skipped) if skipped else ""]
             )
             item.setData(0, Qt.UserRole, cat)
             item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-            item.setCheckState(0, Qt.Checked if files else Qt.Unchecked)
+            item.setCheckState(0, Qt.Checked if count else Qt.Unchecked)
             self.summary_tree.addTopLevelItem(item)
         self.summary_tree.blockSignals(False)
         self._update_clean_totals()
@@ -319,8 +418,8 @@ class CleanerView(QWidget):
 
     def _update_clean_totals(self):
         selected = self._get_selected_scan_results()
-        total_size = sum(d.get("size", 0) for d in selected.values())
-        total_files = sum(len(d.get("files", [])) for d in selected.values())
+        total_size = sum(self.scan_summary.get(cat, {}).get("size", 0) for cat in selected)
+        total_files = sum(self.scan_summary.get(cat, {}).get("items", 0) for cat in selected)
         self.summary_total.setText(f"Selected: {total_files} items ({format_size(total_size)})")
         self.clean_btn.setEnabled(bool(total_size) and not self.is_scanning and not self.is_cleaning)
 
@@ -328,19 +427,21 @@ class CleanerView(QWidget):
         cat = item.data(0, Qt.UserRole)
         if not cat:
             return
-        data = self.scan_results.get(cat, {})
-        items = data.get("items", [])
-        if not items:
-            items = [{"path": p, "size": None} for p in data.get("files", [])]
+        # Only the counts follow an age change; bring this category's list up to date
+        refilter(self.scan_results.get(cat, {}), self.scan_min_age_days)
+        items, total = STORE.page(self.scan_handle, (cat, "items"), 0, 200)
+        if not total:
+            paths, total = STORE.page(self.scan_handle, (cat, "files"), 0, 200)
+            items = [{"path": p, "size": None} for p in paths]
 
         dlg = QMessageBox(self)
         dlg.setWindowTitle(f"{cat} Details")
         preview = "\n".join(
-            f"{format_size(i.get('size')) if i.get('size') is not None else '':>10}  {i.get('path', '')}"
-            for i in items[:200]
+            f"{format_size(i.get('size')) if i.get('size') is not None else '':>10}  {i.get('original') or i.get('path', '')}"
+            for i in items
         )
-        if len(items) > 200:
-            preview += f"\n... Showing first 200 items of {len(items)} total."
+        if total > len(items):
+            preview += f"\n... Showing first {len(items)} items of {total} total."
         dlg.setText(preview or "No items to display.")
         dlg.exec()
 
@@ -353,17 +454,23 @@ class CleanerView(QWidget):
             QMessageBox.information(self, "Nothing Selected", "Select at least one scan category.")
             return
 
+        self.stop_watching()
         self.is_scanning = True
+        self.scan_loaded = False
         self.scan_btn.setEnabled(False)
         self.clean_btn.setEnabled(False)
         self.scan_progress.setValue(0)
         self._set_scan_status("Scanning...")
-        self.log_box.clear()
+        self._clear_log()
         self._append_log("--- Scanning System ---")
         self._show_scan_summary_empty("Scanning...")
         self._set_hero_summary(None, None, "Scanning... preparing a cozy cleanup plan.")
 
-        min_age_days = self._parse_age_days(self.age_combo.currentText())
+        min_age_days = self._age_days()
+        self._start_recording()
+        # The restore point is usually needed next; let it run alongside the scan
+        self.cleaner.prepare_safety()
+        self.scanner.throttle = self._make_throttle()
 
         self.scan_thread = QThread()
         self.scan_worker = ScanWorker(self.scanner, selected, min_age_days)
@@ -376,14 +483,130 @@ class CleanerView(QWidget):
         self.scan_thread.finished.connect(self.scan_thread.deleteLater)
         self.scan_thread.start()
 
+    def _scan_file_dir(self):
+        return get_app_data_dir("scans")
+
+    def _save_scan(self):
+        if not self.scan_results or self.is_scanning or self.is_cleaning:
+            QMessageBox.information(self, "Nothing to Save", "Run a scan first.")
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save Scan", os.path.join(self._scan_file_dir(), f"scan{EXTENSION}"),
+            f"Scan files (*{EXTENSION})"
+        )
+        if not path:
+            return
+        # Written here rather than on a worker, so the watcher cannot change the results mid-write
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            save(path, self.scan_results, self.scan_min_age_days)
+        except OSError as e:
+            self._append_log(f"Could not save the scan: {e}", error=True)
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        self._append_log(f"Saved the scan to {path}")
+
+    def _open_scan(self):
+        if self.is_scanning or self.is_cleaning:
+            return
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Open Scan", self._scan_file_dir(), f"Scan files (*{EXTENSION})"
+        )
+        if not path:
+            return
+
+        self.stop_watching()
+        self.is_scanning = True
+        self.scan_btn.setEnabled(False)
+        self.open_scan_btn.setEnabled(False)
+        self.clean_btn.setEnabled(False)
+        self._set_scan_status("Opening saved scan...", 0)
+        self._clear_log()
+        self._append_log(f"--- Opening {os.path.basename(path)} ---")
+        self._show_scan_summary_empty("Opening...")
+
+        self.load_thread = QThread()
+        self.load_worker = LoadScanWorker(path, self.scanner)
+        self.load_worker.moveToThread(self.load_thread)
+        self.load_thread.started.connect(self.load_worker.run)
+        self.load_worker.log.connect(self._append_log)
+        self.load_worker.finished.connect(self._on_load_finished)
+        self.load_worker.failed.connect(self._on_load_failed)
+        for signal in (self.load_worker.finished, self.load_worker.failed):
+            signal.connect(self.load_thread.quit)
+            signal.connect(self.load_worker.deleteLater)
+        self.load_thread.finished.connect(self.load_thread.deleteLater)
+        self.load_thread.start()
+
+    def _on_load_finished(self, handle, summary, min_age_days):
+        self.open_scan_btn.setEnabled(True)
+        self._on_scan_finished(handle, summary, min_age_days)
+        self.scan_loaded = True
+        self._append_log("Files changed since the scan was saved will be skipped when cleaning.")
+
+    def _on_load_failed(self, message):
+        self.is_scanning = False
+        self.scan_btn.setEnabled(True)
+        self.open_scan_btn.setEnabled(True)
+        self._set_scan_status("Could not open the scan", 0)
+        self._append_log(message, error=True)
+        self._show_scan_summary_empty()
+
+    def _start_recording(self):
+        self.recorder = instrument.enable() if self.timing_check.isChecked() else None
+        self.export_trace_btn.setEnabled(False)
+
+    def _finish_recording(self):
+        """Stops recording and logs the report, per category after the overall figures."""
+        if self.recorder is None or instrument.active() is not self.recorder:
+            return
+        instrument.disable()
+        self._append_log("\nTimings:")
+        for line in self.recorder.report():
+            self._append_log(f"- {line}")
+        for cat in self.recorder.categories():
+            for line in self.recorder.report(cat):
+                self._append_log(f"- [{cat}] {line}")
+        self.export_trace_btn.setEnabled(True)
+
+    def _export_trace(self):
+        if self.recorder is None:
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Trace", os.path.join(get_app_data_dir("logs"), "trace.json"), "Trace files (*.json)"
+        )
+        if not path:
+            return
+        try:
+            self.recorder.export_chrome_trace(path)
+        except OSError as e:
+            self._append_log(f"Could not export the trace: {e}", error=True)
+            return
+        self._append_log(f"Trace saved to {path} (open it in chrome://tracing or Perfetto)")
+
+    def _make_throttle(self):
+        return Throttle() if self.background_check.isChecked() else None
+
     def _on_scan_progress(self, idx, total, cat):
         if total:
             self._set_scan_status(f"Scanning {cat} ({idx}/{total})", idx / total)
 
-    def _on_scan_finished(self, results, min_age_days):
+    def _release_scan(self):
+        if self.scan_handle is not None:
+            STORE.release(self.scan_handle)
+        self.scan_handle = None
+        self.scan_results = {}
+        self.scan_summary = {}
+
+    def _on_scan_finished(self, handle, summary, min_age_days):
         self.is_scanning = False
         self.scan_btn.setEnabled(True)
-        self.scan_results = results
+        self._release_scan()
+        self.scan_handle = handle
+        self.scan_results = STORE.get(handle, {})
+        self.scan_summary = summary
+        self.scan_min_age_days = min_age_days
 
         total_size = 0
         total_files = 0
@@ -392,17 +615,19 @@ class CleanerView(QWidget):
         report_lines = []
         errors = []
 
-        for cat, data in self.scan_results.items():
-            size = data.get("size", 0)
-            files = data.get("files", [])
-            skipped = data.get("skipped_recent", 0)
+        for cat, data in self.scan_summary.items():
+            size = data["size"]
+            count = data["items"]
+            skipped = data["skipped_recent"]
             skipped_recent += skipped
-            skipped_recent_size += data.get("skipped_recent_size", 0)
+            skipped_recent_size += data["skipped_recent_size"]
             total_size += size
-            total_files += len(files)
-            summary = f"[{cat}] Found {len(files)} items ({format_size(size)})"
+            total_files += count
+            summary = f"[{cat}] Found {count} items ({format_size(size)})"
             if skipped:
                 summary += f" • Skipped {skipped} recent"
+            if data["retained"]:
+                summary += f" • Kept newest {data['retained']} ({format_size(data['retained_size'])})"
             report_lines.append(summary)
             if data.get("error"):
                 errors.append(f"[{cat}] {data.get('error')}")
@@ -423,7 +648,8 @@ class CleanerView(QWidget):
         if errors:
             self._append_log("\nWarnings:")
             for err in errors:
-                self._append_log(f"- {err}")
+                self._append_log(f"- {err}", error=True)
+        self._finish_recording()
 
         if total_size > 0:
             self._set_scan_status("Scan complete", 1)
@@ -433,6 +659,83 @@ class CleanerView(QWidget):
             self._set_scan_status("No junk found", 0)
             self._set_hero_summary(None, None, "All clear. Your system looks tidy.")
             self._show_scan_summary_empty()
+        self.reclaimable_changed.emit(total_size)
+        # The age may have been changed while the scan ran
+        self._on_age_changed()
+        self._start_watching(list(self.scan_summary.keys()))
+
+    def _start_watching(self, categories):
+        self.stop_watching()
+        self.watch_walks = self.scanner.watch_plan(categories)
+        if not self.watch_walks:
+            return
+        self.watch = WatchBridge([walk.root for walk in self.watch_walks])
+        self.watch.batch.connect(self._on_watch_batch)
+        self.watch.start()
+
+    def stop_watching(self):
+        if self.watch is not None:
+            self.watch.stop()
+            self.watch.deleteLater()
+            self.watch = None
+
+    def _on_watch_batch(self, events):
+        if self.is_scanning or self.is_cleaning or not self.scan_results:
+            return
+        for kind, path in events:
+            if kind == "overflow":
+                self._append_log(f"Too many changes under {path} to track; rescan for exact totals.")
+        unchecked = self._unchecked_categories()
+        changed = apply_events(self.scan_results, events, self.watch_walks, self.scan_min_age_days)
+        if not changed:
+            return
+        self.scan_summary = scan_summary(self.scan_results, self.scan_min_age_days)
+        self._refresh_summary(unchecked)
+
+    def _on_age_changed(self, _text=None):
+        """Re-counts the last scan for a new age threshold, from the ages it recorded."""
+        if self.is_scanning or self.is_cleaning or not self.scan_results:
+            return
+        days = self._age_days()
+        if days == self.scan_min_age_days:
+            return
+        unchecked = self._unchecked_categories()
+        self.scan_min_age_days = days
+        self.scan_summary = scan_summary(self.scan_results, days)
+        total_files = sum(d["items"] for d in self.scan_summary.values())
+        total_size = sum(d["size"] for d in self.scan_summary.values())
+        skipped = sum(d["skipped_recent"] for d in self.scan_summary.values())
+        skipped_size = sum(d["skipped_recent_size"] for d in self.scan_summary.values())
+        line = f"Safety Filter: {total_files} items ({format_size(total_size)})"
+        if days:
+            line += f" older than {days} day(s); skipped {skipped} recent ({format_size(skipped_size)})."
+        else:
+            line += " of any age."
+        self._append_log(line)
+        self._refresh_summary(unchecked)
+
+    def _unchecked_categories(self):
+        unchecked = set()
+        for i in range(self.summary_tree.topLevelItemCount()):
+            item = self.summary_tree.topLevelItem(i)
+            if item.data(0, Qt.UserRole) and item.checkState(0) != Qt.Checked:
+                unchecked.add(item.data(0, Qt.UserRole))
+        return unchecked
+
+    def _refresh_summary(self, unchecked):
+        total_size = sum(d["size"] for d in self.scan_summary.values())
+        total_files = sum(d["items"] for d in self.scan_summary.values())
+        if total_size > 0:
+            self._set_hero_summary(total_size, total_files, None)
+            self._populate_summary_tree()
+            for i in range(self.summary_tree.topLevelItemCount()):
+                item = self.summary_tree.topLevelItem(i)
+                if item.data(0, Qt.UserRole) in unchecked:
+                    item.setCheckState(0, Qt.Unchecked)
+        else:
+            self._set_hero_summary(None, None, "All clear. Your system looks tidy.")
+            self._show_scan_summary_empty()
+        self.reclaimable_changed.emit(total_size)
 
     def start_clean(self):
         if self.is_cleaning:
@@ -441,14 +744,16 @@ class CleanerView(QWidget):
         if not self.scan_results:
             QMessageBox.information(self, "Nothing to Clean", "Run a scan first.")
             return
+        # Counts must match the age box even if its edit was never finished
+        self._on_age_changed()
 
         targets = self._get_selected_scan_results()
         if not targets:
             QMessageBox.information(self, "Nothing Selected", "Select at least one category from the summary.")
             return
 
-        total_size = sum(d.get("size", 0) for d in targets.values())
-        total_files = sum(len(d.get("files", [])) for d in targets.values())
+        total_size = sum(self.scan_summary.get(cat, {}).get("size", 0) for cat in targets)
+        total_files = sum(self.scan_summary.get(cat, {}).get("items", 0) for cat in targets)
         if total_size <= 0:
             QMessageBox.information(self, "Nothing to Clean", "No junk was found in the last scan.")
             return
@@ -461,16 +766,28 @@ class CleanerView(QWidget):
         if confirm != QMessageBox.Yes:
             return
 
+        self.stop_watching()
         self.is_cleaning = True
         self.clean_targets = targets
+        self.clean_quarantined = self.quarantine_check.isChecked()
         self.clean_btn.setEnabled(False)
         self.scan_btn.setEnabled(False)
         self._set_scan_status("Cleaning...", 0)
         self._append_log("\n--- Cleaning ---")
         self._set_hero_summary(None, None, "Cleaning in progress... stay comfy.")
+        self._start_recording()
 
         self.clean_thread = QThread()
-        self.clean_worker = CleanWorker(self.cleaner, targets, self.safe_mode_check.isChecked())
+        self.clean_worker = CleanWorker(
+            self.cleaner,
+            targets,
+            self.safe_mode_check.isChecked(),
+            self.scanner.low_risk_categories(),
+            quarantine=self.clean_quarantined,
+            throttle=self._make_throttle(),
+            min_age_days=self.scan_min_age_days,
+            revalidate=self.scan_loaded,
+        )
         self.clean_worker.moveToThread(self.clean_thread)
         self.clean_thread.started.connect(self.clean_worker.run)
         self.clean_worker.log.connect(self._append_log)
@@ -490,14 +807,21 @@ class CleanerView(QWidget):
         self.scan_btn.setEnabled(True)
         self.clean_btn.setEnabled(False)
         self._set_scan_status("Cleaning complete", 1)
-        self._append_log(f"\nDone! Freed {format_size(total_size)} ({total_items} items).")
-        self.scan_results = {}
+        if self.clean_quarantined:
+            # Nothing is freed until the session is restored or purged
+            self._append_log(f"\nDone! Quarantined {format_size(total_size)} ({total_items} items); "
+                             f"the space is freed when the quarantine is purged.")
+        else:
+            self._append_log(f"\nDone! Freed {format_size(total_size)} ({total_items} items).")
+        self._release_scan()
         self.clean_targets = {}
-        self._set_hero_summary(None, None, "Cleanup complete. Enjoy the extra space.")
+        self._set_hero_summary(None, None, "Cleanup complete. Restore it any time from the quarantine."
+                               if self.clean_quarantined else "Cleanup complete. Enjoy the extra space.")
         self._show_scan_summary_empty()
+        self.reclaimable_changed.emit(0)
 
         if errors:
-            self._append_log("\nErrors:")
+            self._append_log(f"\nErrors ({len(errors)}):")
             for err in errors:
-                self._append_log(f"- {err}")
-
+                self._append_log(f"- {err}", error=True)
+        self._finish_recording()
@@ -1,6 +1,6 @@
 import os
+import time
 import datetime
-import psutil
 
 from PySide6.QtWidgets import (
     QWidget,
@@ -9,21 +9,31 @@ from PySide6.QtWidgets import (
     QLabel,
     QComboBox,
     QFrame,
-    QPushButton,
-    QGraphicsDropShadowEffect
+    QPushButton
 )
-from PySide6.QtCore import QTimer, Qt
-from PySide6.QtGui import QFont, QColor
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QFont
 
+from core.scheduler import history_path, pid_alive, read_history, read_status, status_path
+from core.utils import format_size
 from gui_qt.theme import FONT_DISPLAY, FONT_BODY
 from gui_qt.widgets.cards import StatCard
+from gui_qt.widgets.shadows import apply_shadow
 
 class DashboardView(QWidget):
     def __init__(self, main_app):
         super().__init__()
         self.main_app = main_app
+        self.metrics = main_app.metrics_sampler
         self._build_ui()
-        self._start_dashboard_timer()
+        self.metrics.sampled.connect(self._update_dashboard_stats)
+        self.metrics.drives_ready.connect(self._set_available_drives)
+        # The scheduler runs in its own process; follow its status files while visible
+        self._schedule_stamp = None
+        self._schedule_pid = None
+        self.schedule_timer = QTimer(self)
+        self.schedule_timer.setInterval(5000)
+        self.schedule_timer.timeout.connect(self._refresh_schedule)
 
     def _page_header(self, title, subtitle):
         container = QWidget()
@@ -46,17 +56,15 @@ class DashboardView(QWidget):
             return "Good Afternoon, User"
         return "Good Evening, User"
 
-    def _get_available_drives(self):
-        drives = []
-        try:
-            for partition in psutil.disk_partitions():
-                if "fixed" in partition.opts or "removable" in partition.opts:
-                    drives.append(partition.device)
-        except Exception:
-            drives.append("C:\\")
-        if not drives:
-            drives.append("C:\\")
-        return sorted(set(drives))
+    def _set_available_drives(self, drives):
+        current = self.drive_combo.currentText()
+        self.drive_combo.blockSignals(True)
+        self.drive_combo.clear()
+        self.drive_combo.addItems(drives)
+        if current in drives:
+            self.drive_combo.setCurrentText(current)
+        self.drive_combo.blockSignals(False)
+        self.metrics.set_drive(self.drive_combo.currentText())
 
     def _build_ui(self):
         layout = QVBoxLayout(self)
@@ -75,11 +83,7 @@ class DashboardView(QWidget):
         drive_card = QFrame()
         drive_card.setObjectName("Card")
 
-        ds = QGraphicsDropShadowEffect(drive_card)
-        ds.setBlurRadius(20)
-        ds.setOffset(0, 4)
-        ds.setColor(QColor(0, 0, 0, 8))
-        drive_card.setGraphicsEffect(ds)
+        apply_shadow(drive_card)
 
         drive_layout = QHBoxLayout(drive_card)
         drive_layout.setContentsMargins(12, 8, 12, 8)
@@ -87,8 +91,7 @@ class DashboardView(QWidget):
         drive_label = QLabel("Monitor")
         drive_label.setObjectName("Muted")
         self.drive_combo = QComboBox()
-        self.drive_combo.addItems(self._get_available_drives())
-        self.drive_combo.currentTextChanged.connect(self._update_dashboard_stats)
+        self.drive_combo.currentTextChanged.connect(self.metrics.set_drive)
         drive_layout.addWidget(drive_label)
         drive_layout.addWidget(self.drive_combo)
         header_row.addWidget(drive_card)
@@ -103,6 +106,18 @@ class DashboardView(QWidget):
         stats.addWidget(self.disk_card)
         layout.addLayout(stats)
 
+        self.trend_label = QLabel("Storage trend: collecting history...")
+        self.trend_label.setObjectName("Muted")
+        layout.addWidget(self.trend_label)
+
+        self.reclaimable_label = QLabel("Reclaimable: run a scan to find out")
+        self.reclaimable_label.setObjectName("Muted")
+        layout.addWidget(self.reclaimable_label)
+
+        self.schedule_label = QLabel("Scheduled cleaning: not set up")
+        self.schedule_label.setObjectName("Muted")
+        layout.addWidget(self.schedule_label)
+
         actions_label = QLabel("Quick Actions")
         actions_label.setObjectName("Muted")
         actions_label.setFont(QFont(FONT_BODY, 11, QFont.Bold))
@@ -131,23 +146,89 @@ class DashboardView(QWidget):
         layout.addLayout(actions)
         layout.addStretch(1)
 
-    def _start_dashboard_timer(self):
-        self._update_dashboard_stats()
-        self.dashboard_timer = QTimer(self)
-        self.dashboard_timer.timeout.connect(self._update_dashboard_stats)
-        self.dashboard_timer.start(2000)
-
-    def _update_dashboard_stats(self):
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.metrics.subscribe()
+        self._refresh_trend()
+        self._refresh_schedule()
+        self.schedule_timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.metrics.unsubscribe()
+        self.schedule_timer.stop()
+
+    def _update_dashboard_stats(self, sample):
+        if 'cpu' in sample:
+            self.cpu_card.set_value(sample['cpu'])
+        if 'ram' in sample:
+            self.ram_card.set_value(sample['ram'])
+        if 'disk' in sample:
+            disk = sample['disk']
+            self.disk_card.set_value(disk, f"{disk}% Used")
+
+    def set_reclaimable(self, size):
+        if size:
+            self.reclaimable_label.setText(f"Reclaimable: {format_size(size)} (kept up to date)")
+        else:
+            self.reclaimable_label.setText("Reclaimable: nothing found in the last scan")
+
+    def _refresh_trend(self, days=7):
+        history = self.main_app.metrics_history
+        if history is None:
+            return
         try:
-            cpu = psutil.cpu_percent()
-            self.cpu_card.set_value(cpu)
-
-            ram = psutil.virtual_memory()
-            self.ram_card.set_value(ram.percent)
-
-            drive = self.drive_combo.currentText()
-            if os.path.exists(drive):
-                disk = psutil.disk_usage(drive)
-                self.disk_card.set_value(disk.percent, f"{disk.percent}% Used")
-        except Exception:
-            pass
+            data = history.query('1h', start=time.time() - days * 86400)
+        except OSError:
+            return
+        used = [v for v in data['disk_used'] if v]
+        if len(used) < 2:
+            return
+        change = used[-1] - used[0]
+        direction = "up" if change > 0 else "down"
+        # The history follows one drive, not the one picked above
+        drive = f" on {self.metrics.history_drive}" if self.metrics.history_drive else ""
+        self.trend_label.setText(
+            f"Storage trend{drive} ({days} days): used space {direction} {format_size(abs(change))}"
+        )
+
+    def _refresh_schedule(self):
+        stamp = []
+        for path in (status_path(), history_path()):
+            try:
+                stamp.append(os.path.getmtime(path))
+            except OSError:
+                stamp.append(None)
+        # A scheduler that dies mid-run leaves both files as they were
+        if self._schedule_pid is not None:
+            stamp.append(pid_alive(self._schedule_pid))
+        if stamp == self._schedule_stamp:
+            return
+        self._schedule_stamp = stamp
+        status = read_status()
+        self._schedule_pid = status.get('pid') if status and status.get('state') == 'running' else None
+        if status is None:
+            self.schedule_label.setText("Scheduled cleaning: not set up")
+            return
+        last = read_history(limit=1)
+        if status.get('state') == 'running' and pid_alive(status.get('pid')):
+            text = f"Scheduled cleaning: running {status.get('job', '')}..."
+        elif status.get('state') == 'running':
+            # The scheduler died mid-run and never wrote its status back
+            text = f"Scheduled cleaning: {status.get('job', '')} was interrupted"
+        elif status.get('state') == 'stopped':
+            text = "Scheduled cleaning: scheduler stopped"
+        else:
+            due = min(status.get('next_due', {}).values(), default=None)
+            text = "Scheduled cleaning: waiting"
+            if due and due <= time.time():
+                text += ", next job runs when the PC is idle"
+            elif due:
+                text += f", next due {datetime.datetime.fromtimestamp(due):%b %d %H:%M}"
+        if last:
+            run = last[-1]
+            when = datetime.datetime.fromtimestamp(run.get('started', 0))
+            # Quarantined files only free their space once the session is purged
+            verb = "quarantined" if run.get('quarantine_session') else "freed"
+            text += f" · last run {when:%b %d %H:%M} {verb} {format_size(run.get('size', 0))}"
+        self.schedule_label.setText(text)
@@ -14,23 +14,38 @@ from PySide6.QtWidgets import (
     QHeaderView,
     QTabWidget,
     QFileDialog,
-    QMessageBox,
-    QGraphicsDropShadowEffect
+    QMessageBox
 )
-from PySide6.QtGui import QFont, QColor
-
-from core.utils import format_size
+from PySide6.QtCore import Qt, QThread
+from PySide6.QtGui import QFont
+
+from core.duplicates import annotate_files
+from core.metrics import list_fixed_drives
+from core.results import STORE
+from core.utils import format_size, get_app_data_dir
+from core.watcher import OVERFLOW, dirty_dirs
 from gui_qt.theme import FONT_DISPLAY
-from gui_qt.workers import LargeFilesWorker, DuplicatesWorker, AppsWorker
+from gui_qt.widgets.shadows import apply_shadow
+from gui_qt.workers import LargeFilesWorker, DuplicatesWorker, AppsWorker, WatchBridge
 
 class ToolsView(QWidget):
+    # Duplicate groups added to the tree at a time
+    DUP_PAGE = 200
+
     def __init__(self, analyzer):
         super().__init__()
         self.analyzer = analyzer
         
         self.is_scanning_dupes = False
+        self.dup_similar = False
+        self.dup_handle = None
+        self.dup_groups = []
+        self.dup_shown = 0
         self.is_scanning_large = False
         self.is_loading_apps = False
+        self.disk_index = None
+        self.lf_watch = None
+        self.lf_dirty = set()
 
         self._build_ui()
 
@@ -48,17 +63,7 @@ class ToolsView(QWidget):
         return container
 
     def _get_default_drive(self):
-        import psutil
-        drives = []
-        try:
-            for partition in psutil.disk_partitions():
-                if "fixed" in partition.opts or "removable" in partition.opts:
-                    drives.append(partition.device)
-        except Exception:
-            drives.append("C:\\")
-        if not drives:
-            drives.append("C:\\")
-        return sorted(set(drives))[0]
+        return list_fixed_drives()[0]
 
     def _get_default_pictures(self):
         root = os.environ.get("USERPROFILE") or os.path.expanduser("~")
@@ -80,11 +85,7 @@ class ToolsView(QWidget):
         self.tools_tabs = QTabWidget()
         self.tools_tabs.setDocumentMode(True)
 
-        tab_shadow = QGraphicsDropShadowEffect(self.tools_tabs)
-        tab_shadow.setBlurRadius(20)
-        tab_shadow.setOffset(0, 4)
-        tab_shadow.setColor(QColor(0, 0, 0, 8))
-        self.tools_tabs.setGraphicsEffect(tab_shadow)
+        apply_shadow(self.tools_tabs, radius=12)
 
         layout.addWidget(self.tools_tabs, 1)
 
@@ -117,6 +118,7 @@ class ToolsView(QWidget):
         size_row = QHBoxLayout()
         self.lf_size_combo = QComboBox()
         self.lf_size_combo.addItems(["100 MB", "250 MB", "500 MB", "1 GB"])
+        self.lf_size_combo.currentTextChanged.connect(self._show_large_files)
         size_row.addWidget(QLabel("Minimum size:"))
         size_row.addWidget(self.lf_size_combo)
         size_row.addStretch(1)
@@ -127,19 +129,34 @@ class ToolsView(QWidget):
         self.lf_scan_btn.clicked.connect(self._scan_large_files)
         layout.addWidget(self.lf_scan_btn)
 
-        self.lf_table = QTableWidget(0, 4)
-        self.lf_table.setHorizontalHeaderLabels(["Size", "Name", "Path", "Action"])
+        self.lf_table = QTableWidget(0, 5)
+        self.lf_table.setHorizontalHeaderLabels(["Size", "On Disk", "Name", "Path", "Action"])
         self.lf_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
         self.lf_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
-        self.lf_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
-        self.lf_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeToContents)
+        self.lf_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeToContents)
+        self.lf_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        self.lf_table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeToContents)
         self.lf_table.setEditTriggers(QTableWidget.NoEditTriggers)
         self.lf_table.setAlternatingRowColors(True)
         self.lf_table.verticalHeader().setVisible(False)
         self.lf_table.setShowGrid(False)
         layout.addWidget(self.lf_table, 1)
 
+        folders_label = QLabel("Folder Sizes")
+        folders_label.setObjectName("Muted")
+        layout.addWidget(folders_label)
+
+        self.lf_folder_tree = QTreeWidget()
+        self.lf_folder_tree.setHeaderLabels(["Folder", "Size"])
+        self.lf_folder_tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.lf_folder_tree.header().setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        self.lf_folder_tree.setAlternatingRowColors(True)
+        self.lf_folder_tree.setUniformRowHeights(True)
+        self.lf_folder_tree.itemExpanded.connect(self._expand_folder_item)
+        layout.addWidget(self.lf_folder_tree, 1)
+
         self.tools_tabs.addTab(tab, "Large Files")
+        self._show_disk_index(self.analyzer.load_disk_index(self.lf_path.text()))
 
     def _build_startup_tab(self):
         tab = QWidget()
@@ -176,7 +193,7 @@ class ToolsView(QWidget):
         layout.setContentsMargins(16, 16, 16, 16)
         layout.setSpacing(12)
 
-        hint = QLabel("Find identical files and clean up safe duplicates.")
+        hint = QLabel("Find identical files or resized/re-encoded copies of photos.")
         hint.setObjectName("Muted")
         layout.addWidget(hint)
 
@@ -191,6 +208,14 @@ class ToolsView(QWidget):
         path_row.addWidget(btn_change)
         layout.addLayout(path_row)
 
+        mode_row = QHBoxLayout()
+        mode_row.addWidget(QLabel("Match:"))
+        self.dup_mode_combo = QComboBox()
+        self.dup_mode_combo.addItems(["Identical files", "Similar images"])
+        mode_row.addWidget(self.dup_mode_combo)
+        mode_row.addStretch(1)
+        layout.addLayout(mode_row)
+
         self.dup_scan_btn = QPushButton("🔍 Scan Duplicates")
         self.dup_scan_btn.setObjectName("Primary")
         self.dup_scan_btn.clicked.connect(self._scan_duplicates)
@@ -201,12 +226,20 @@ class ToolsView(QWidget):
         self.dup_tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
         self.dup_tree.setRootIsDecorated(False)
         self.dup_tree.setAlternatingRowColors(True)
+        self.dup_tree.itemDoubleClicked.connect(self._on_duplicate_item_activated)
         layout.addWidget(self.dup_tree, 1)
 
+        dup_actions = QHBoxLayout()
+        self.dup_link_btn = QPushButton("Replace with Hard Links")
+        self.dup_link_btn.setObjectName("Ghost")
+        self.dup_link_btn.setToolTip("Keeps every path but stores identical files only once.")
+        self.dup_link_btn.clicked.connect(self._link_selected_duplicates)
+        dup_actions.addWidget(self.dup_link_btn)
         delete_selected = QPushButton("Delete Selected")
         delete_selected.setObjectName("Danger")
         delete_selected.clicked.connect(self._delete_selected_duplicates)
-        layout.addWidget(delete_selected)
+        dup_actions.addWidget(delete_selected, 1)
+        layout.addLayout(dup_actions)
 
         self.tools_tabs.addTab(tab, "Duplicates")
 
@@ -244,7 +277,47 @@ class ToolsView(QWidget):
     def _choose_large_files_path(self):
         path = QFileDialog.getExistingDirectory(self, "Select Folder to Scan")
         if path:
+            self.stop_watching()
             self.lf_path.setText(path)
+            self._show_disk_index(self.analyzer.load_disk_index(path))
+
+    def _show_disk_index(self, index):
+        if self.disk_index is not None and self.disk_index is not index:
+            self.disk_index.close()
+        self.disk_index = index
+        self.lf_folder_tree.clear()
+        self._show_large_files()
+        if index is None:
+            item = QTreeWidgetItem(["Scan a folder to see which folders use the most space.", ""])
+            item.setFlags(Qt.ItemIsEnabled)
+            self.lf_folder_tree.addTopLevelItem(item)
+            return
+        root = self._folder_item(0)
+        self.lf_folder_tree.addTopLevelItem(root)
+        root.setExpanded(True)
+
+    def _folder_item(self, dir_id):
+        index = self.disk_index
+        label = index.root if dir_id == 0 else index.dir_names[dir_id]
+        item = QTreeWidgetItem([label, format_size(index.dir_total[dir_id])])
+        item.setData(0, Qt.UserRole, dir_id)
+        if index.children(dir_id):
+            # Placeholder so the expand arrow shows; real children load on demand
+            item.addChild(QTreeWidgetItem(["", ""]))
+        return item
+
+    def _expand_folder_item(self, item):
+        dir_id = item.data(0, Qt.UserRole)
+        if self.disk_index is None or dir_id is None:
+            return
+        if item.childCount() != 1 or item.child(0).data(0, Qt.UserRole) is not None:
+            return
+        item.takeChildren()
+        children = sorted(
+            self.disk_index.children(dir_id), key=self.disk_index.dir_total.__getitem__, reverse=True
+        )
+        for child in children[:200]:
+            item.addChild(self._folder_item(child))
 
     def _parse_size_mb(self, label):
         text = label.strip().upper()
@@ -266,15 +339,17 @@ class ToolsView(QWidget):
             QMessageBox.warning(self, "Invalid Path", "Select a valid folder or drive to scan.")
             return
 
-        self.is_scanning_large = True
+        self.stop_watching()
         self.lf_scan_btn.setEnabled(False)
         self.lf_scan_btn.setText("Scanning...")
-        self.lf_table.setRowCount(0)
-
-        min_size_mb = self._parse_size_mb(self.lf_size_combo.currentText())
+        # Release the mapped catalog so the worker can refresh and replace it
+        self._show_disk_index(None)
+        self._run_large_files_worker(scan_path)
 
+    def _run_large_files_worker(self, scan_path, dirty=None):
+        self.is_scanning_large = True
         self.lf_thread = QThread()
-        self.lf_worker = LargeFilesWorker(self.analyzer, scan_path, min_size_mb)
+        self.lf_worker = LargeFilesWorker(self.analyzer, scan_path, dirty)
         self.lf_worker.moveToThread(self.lf_thread)
         self.lf_thread.started.connect(self.lf_worker.run)
         self.lf_worker.finished.connect(self._on_large_files_finished)
@@ -283,22 +358,76 @@ class ToolsView(QWidget):
         self.lf_thread.finished.connect(self.lf_thread.deleteLater)
         self.lf_thread.start()
 
-    def _on_large_files_finished(self, files):
+    def _on_large_files_finished(self, index):
         self.is_scanning_large = False
         self.lf_scan_btn.setEnabled(True)
         self.lf_scan_btn.setText("🔍 Scan for Files")
-
+        if index is None:
+            QMessageBox.warning(self, "Scan Failed", "Could not scan the selected folder.")
+        self._show_disk_index(index)
+        if index is None:
+            return
+        if self.lf_watch is None:
+            self._start_watching(index.root)
+        if self.lf_dirty:
+            dirty, self.lf_dirty = self.lf_dirty, set()
+            self._run_large_files_worker(index.root, dirty)
+
+    def _start_watching(self, path):
+        # Whole drives are too big to poll, so only native change notifications are used
+        self.lf_watch = WatchBridge([path], debounce=2.0, polling=False)
+        self.lf_watch.batch.connect(self._on_large_files_changed)
+        self.lf_watch.start()
+        if not self.lf_watch.active:
+            self.stop_watching()
+
+    def stop_watching(self):
+        if self.lf_watch is not None:
+            self.lf_watch.stop()
+            self.lf_watch.deleteLater()
+            self.lf_watch = None
+        self.lf_dirty = set()
+
+    def _on_large_files_changed(self, events):
+        if self.disk_index is None:
+            return
+        # Saving the catalog must not trigger another refresh when it lives inside the tree
+        own = get_app_data_dir()
+        events = [(kind, path) for kind, path in events if not path.startswith(own)]
+        if not events:
+            return
+        self.lf_dirty |= dirty_dirs(events)
+        if any(kind == OVERFLOW for kind, _path in events):
+            # Changes were lost; fall back to the folder mtime check everywhere
+            self.lf_dirty = set()
+        if not self.is_scanning_large:
+            dirty, self.lf_dirty = self.lf_dirty, set()
+            self._run_large_files_worker(self.disk_index.root, dirty)
+
+    def _show_large_files(self, *_args):
         self.lf_table.setRowCount(0)
-        for path, size in files[:50]:
+        if self.disk_index is None:
+            return
+        # Threshold changes are a lookup in the saved catalog, not a rescan
+        min_size_mb = self._parse_size_mb(self.lf_size_combo.currentText())
+        files = self.analyzer.find_large_files(
+            self.lf_path.text(), min_size_mb=min_size_mb, index=self.disk_index
+        )
+        # Sparse files and hard links take less space than their size says
+        for path, size, allocated, link_of in annotate_files(files[:50]):
             row = self.lf_table.rowCount()
             self.lf_table.insertRow(row)
+            name = os.path.basename(path)
+            if link_of:
+                name += f"  (hard link of {os.path.basename(link_of)})"
             self.lf_table.setItem(row, 0, QTableWidgetItem(format_size(size)))
-            self.lf_table.setItem(row, 1, QTableWidgetItem(os.path.basename(path)))
-            self.lf_table.setItem(row, 2, QTableWidgetItem(os.path.dirname(path)))
+            self.lf_table.setItem(row, 1, QTableWidgetItem(format_size(allocated)))
+            self.lf_table.setItem(row, 2, QTableWidgetItem(name))
+            self.lf_table.setItem(row, 3, QTableWidgetItem(os.path.dirname(path)))
             btn = QPushButton("Delete")
             btn.setObjectName("Danger")
             btn.clicked.connect(lambda _, p=path: self._confirm_delete_file(p))
-            self.lf_table.setCellWidget(row, 3, btn)
+            self.lf_table.setCellWidget(row, 4, btn)
 
     def _confirm_delete_file(self, filepath):
         if not filepath:
@@ -363,7 +492,8 @@ class ToolsView(QWidget):
         self.dup_tree.clear()
 
         self.dup_thread = QThread()
-        self.dup_worker = DuplicatesWorker(self.analyzer, scan_path)
+        self.dup_similar = self.dup_mode_combo.currentText() == "Similar images"
+        self.dup_worker = DuplicatesWorker(self.analyzer, scan_path, self.dup_similar)
         self.dup_worker.moveToThread(self.dup_thread)
         self.dup_thread.started.connect(self.dup_worker.run)
         self.dup_worker.finished.connect(self._on_duplicates_finished)
@@ -372,24 +502,92 @@ class ToolsView(QWidget):
         self.dup_thread.finished.connect(self.dup_thread.deleteLater)
         self.dup_thread.start()
 
-    def _on_duplicates_finished(self, dupes):
+    def _on_duplicates_finished(self, handle, count):
         self.is_scanning_dupes = False
         self.dup_scan_btn.setEnabled(True)
         self.dup_scan_btn.setText("🔍 Scan Duplicates")
         self.dup_tree.clear()
-
-        if not dupes:
+        if self.dup_handle is not None:
+            STORE.release(self.dup_handle)
+        self.dup_handle = handle
+        self.dup_groups = STORE.get(handle, [])
+        self.dup_shown = 0
+        self.dup_link_btn.setEnabled(not self.dup_similar and bool(count))
+
+        if not count:
             item = QTreeWidgetItem(["No duplicates found."])
             item.setFlags(Qt.ItemIsEnabled)
             self.dup_tree.addTopLevelItem(item)
             return
-
-        for _, paths in dupes.items():
-            group = QTreeWidgetItem([f"Match Found ({len(paths)} copies)"])
+        self._show_duplicate_page()
+
+    def _show_duplicate_page(self):
+        """Adds the next page of groups; a trailing row loads more when double-clicked."""
+        last = self.dup_tree.topLevelItem(self.dup_tree.topLevelItemCount() - 1)
+        if last is not None and last.data(0, Qt.UserRole) == -1:
+            self.dup_tree.takeTopLevelItem(self.dup_tree.topLevelItemCount() - 1)
+
+        groups, total = STORE.page(self.dup_handle, (), self.dup_shown, self.DUP_PAGE)
+        label = "Similar Images" if self.dup_similar else "Match Found"
+        for idx, found in enumerate(groups, start=self.dup_shown):
+            paths = found["paths"]
+            text = f"{label} ({len(paths)} copies, {format_size(found['reclaimable'])} reclaimable)"
+            if len(found["inodes"]) < len(paths):
+                text += " • some are already hard links"
+            group = QTreeWidgetItem([text])
+            group.setData(0, Qt.UserRole, idx)
             self.dup_tree.addTopLevelItem(group)
             for path in paths:
                 child = QTreeWidgetItem([path])
                 group.addChild(child)
+        self.dup_shown += len(groups)
+
+        if self.dup_shown < total:
+            more = QTreeWidgetItem([f"Show more… ({self.dup_shown} of {total} groups shown)"])
+            more.setData(0, Qt.UserRole, -1)
+            more.setFlags(Qt.ItemIsEnabled)
+            self.dup_tree.addTopLevelItem(more)
+
+    def _on_duplicate_item_activated(self, item, _column):
+        if item.parent() is None and item.data(0, Qt.UserRole) == -1:
+            self._show_duplicate_page()
+
+    def _link_selected_duplicates(self):
+        selected = set()
+        for item in self.dup_tree.selectedItems():
+            header = item.parent() or item
+            idx = header.data(0, Qt.UserRole)
+            if idx is not None and idx >= 0:
+                selected.add(idx)
+        if not selected:
+            QMessageBox.information(self, "No Selection", "Select duplicate groups to replace with hard links.")
+            return
+
+        groups = [self.dup_groups[idx] for idx in sorted(selected)]
+        linkable = sum(g["linkable"] for g in groups)
+        confirm = QMessageBox.question(
+            self,
+            "Replace with Hard Links",
+            f"Keep one copy of {len(groups)} group(s) and turn the other paths into hard links to it?\n\n"
+            f"About {format_size(linkable)} will be freed. Editing any of the paths afterwards "
+            f"changes all of them.",
+        )
+        if confirm != QMessageBox.Yes:
+            return
+
+        total_linked = 0
+        total_freed = 0
+        errors = []
+        for found in groups:
+            linked, freed, errs = self.analyzer.link_duplicates(found["paths"], keep=found["inodes"][0][0])
+            total_linked += linked
+            total_freed += freed
+            errors.extend(errs)
+        message = f"Linked {total_linked} file(s), freeing {format_size(total_freed)}."
+        if errors:
+            message += "\n\nSkipped:\n" + "\n".join(errors[:20])
+        QMessageBox.information(self, "Hard Links Created", message)
+        self._scan_duplicates()
 
     def _delete_selected_duplicates(self):
         items = self.dup_tree.selectedItems()
@@ -1,6 +1,7 @@
-from PySide6.QtWidgets import QFrame, QVBoxLayout, QLabel, QProgressBar, QGraphicsDropShadowEffect
+from PySide6.QtWidgets import QFrame, QVBoxLayout, QLabel, QProgressBar
 from PySide6.QtGui import QFont, QColor
 from gui_qt.theme import FONT_DISPLAY
+from gui_qt.widgets.shadows import apply_shadow
 
 class StatCard(QFrame):
     def __init__(self, title: str, parent=None):
@@ -8,11 +9,7 @@ class StatCard(QFrame):
         self.setObjectName("Card")
 
         # Soft Premium Drop Shadow
-        shadow = QGraphicsDropShadowEffect(self)
-        shadow.setBlurRadius(20)
-        shadow.setOffset(0, 4)
-        shadow.setColor(QColor(0, 0, 0, 8)) # Extremely subtle
-        self.setGraphicsEffect(shadow)
+        apply_shadow(self, blur=20, offset=(0, 4), color=QColor(0, 0, 0, 8)) # Extremely subtle
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
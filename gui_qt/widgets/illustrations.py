@@ -35,29 +35,66 @@ def make_nav_icon(kind: str, color_hex: str) -> QPixmap:
     return pix
 
 class CatIllustration(QWidget):
+    """The Cleaner hero art: the cat and its junk bobbing in a slow loop.
+
+    The loop is FRAMES pictures of the current size, each painted once on
+    first use and then only blitted; the smoothly scaled cat is cached
+    per size too. The timer runs only while the widget is shown.
+    """
+    FRAMES = 32
+    PERIOD_MS = 4700
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setMinimumSize(220, 160)
         self.pixmap = QPixmap(asset_path("cat.png"))
-        self.phase = 0.0
+        self.frame = 0
+        self._frames = []
+        self._frames_key = None
+        self._scaled = None
+        self._scaled_key = None
         self.timer = QTimer(self)
+        self.timer.setInterval(self.PERIOD_MS // self.FRAMES)
         self.timer.timeout.connect(self._tick)
-        self.timer.start(60)
 
     def sizeHint(self):
         return QSize(220, 160)
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.timer.start()
+
+    def hideEvent(self, event):
+        # Also sent when the window is minimised or another view is shown
+        super().hideEvent(event)
+        self.timer.stop()
+
     def _tick(self):
-        self.phase += 0.08
-        if self.phase > 6.28:
-            self.phase = 0.0
+        self.frame = (self.frame + 1) % self.FRAMES
         self.update()
 
-    def paintEvent(self, _event):
-        painter = QPainter(self)
+    def _scaled_cat(self, w, h, dpr):
+        key = (w, h, dpr)
+        if key != self._scaled_key:
+            pix = self.pixmap.scaled(
+                int(w * 0.84 * dpr), int(h * 0.84 * dpr), Qt.KeepAspectRatio, Qt.SmoothTransformation
+            )
+            pix.setDevicePixelRatio(dpr)
+            self._scaled = pix
+            self._scaled_key = key
+        return self._scaled
+
+    def _render_frame(self, index, w, h, dpr):
+        frame = QPixmap(int(w * dpr), int(h * dpr))
+        frame.setDevicePixelRatio(dpr)
+        frame.fill(Qt.transparent)
+        painter = QPainter(frame)
+        self._paint_scene(painter, w, h, 2 * math.pi * index / self.FRAMES, dpr)
+        painter.end()
+        return frame
+
+    def _paint_scene(self, painter, w, h, phase, dpr):
         painter.setRenderHint(QPainter.Antialiasing)
-        w = self.width()
-        h = self.height()
 
         # Soft bubble background uses translucent white
         bubble = QColor(255, 255, 255, 160)
@@ -69,7 +106,7 @@ class CatIllustration(QWidget):
         # Floating junk elements dynamically pulled from theme-ish colors
         painter.setPen(Qt.NoPen)
         paper = QColor(THEME["bg_sidebar"]) # "#F3EBE1"
-        float_offset = 2.5 * math.sin(self.phase)
+        float_offset = 2.5 * math.sin(phase)
         for x, y, angle in [(40, 18, -10), (150, 24, 12), (120, 88, -6)]:
             painter.save()
             painter.translate(x, y + float_offset)
@@ -97,11 +134,22 @@ class CatIllustration(QWidget):
         painter.drawRoundedRect(QRectF(w * 0.75, h * 0.68 + float_offset, 26, 10), 6, 6)
 
         if not self.pixmap.isNull():
-            max_w = int(w * 0.84)
-            max_h = int(h * 0.84)
-            pix = self.pixmap.scaled(
-                max_w, max_h, Qt.KeepAspectRatio, Qt.SmoothTransformation
-            )
-            x = (w - pix.width()) / 2
-            y = (h - pix.height()) / 2 + 4 + 2 * math.sin(self.phase)
+            pix = self._scaled_cat(w, h, dpr)
+            x = (w - pix.width() / dpr) / 2
+            y = (h - pix.height() / dpr) / 2 + 4 + 2 * math.sin(phase)
             painter.drawPixmap(int(x), int(y), pix)
+
+    def paintEvent(self, _event):
+        w = self.width()
+        h = self.height()
+        dpr = self.devicePixelRatioF()
+        key = (w, h, dpr)
+        if key != self._frames_key:
+            # Resized: the old frames are dropped and redrawn as they come up
+            self._frames = [None] * self.FRAMES
+            self._frames_key = key
+        frame = self._frames[self.frame]
+        if frame is None:
+            frame = self._frames[self.frame] = self._render_frame(self.frame, w, h, dpr)
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, frame)
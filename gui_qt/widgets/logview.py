@@ -0,0 +1,100 @@
+from collections import deque
+
+from PySide6.QtCore import QObject, QTimer
+from PySide6.QtWidgets import QDialog, QHBoxLayout, QLabel, QPlainTextEdit, QPushButton, QVBoxLayout
+
+
+class LogSink(QObject):
+    """Batches messages for a QPlainTextEdit and keeps its history bounded.
+
+    Messages wait in a ring buffer and reach the widget in one append at
+    most every `interval_ms`, instead of one layout pass each. If more
+    than `ring_size` arrive between flushes only the newest are shown,
+    with a note; the widget itself keeps `max_blocks` lines. With a
+    SpillLog attached every message is also written to disk for the
+    full-log viewer. Use from the GUI thread only.
+    """
+
+    def __init__(self, widget, spill=None, interval_ms=100, ring_size=1000, max_blocks=5000):
+        super().__init__(widget)
+        self.widget = widget
+        self.spill = spill
+        self.widget.setMaximumBlockCount(max_blocks)
+        self._ring = deque(maxlen=ring_size)
+        self._dropped = 0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+
+    def append(self, text, error=False):
+        if self.spill is not None:
+            self.spill.append(text, error)
+        if len(self._ring) == self._ring.maxlen:
+            self._dropped += 1
+        self._ring.append(text)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        self._timer.stop()
+        if not self._ring:
+            return
+        lines = list(self._ring)
+        self._ring.clear()
+        if self._dropped:
+            lines.insert(0, f"... {self._dropped} more message(s) not shown here (see the full log)")
+            self._dropped = 0
+        self.widget.appendPlainText("\n".join(lines))
+
+    def clear(self):
+        self._timer.stop()
+        self._ring.clear()
+        self._dropped = 0
+        self.widget.clear()
+        if self.spill is not None:
+            self.spill.reset()
+
+
+class SpillLogDialog(QDialog):
+    """Pages through a SpillLog from disk, `page_size` messages at a time."""
+
+    def __init__(self, spill, errors_only=False, title="Full Log", page_size=500, parent=None):
+        super().__init__(parent)
+        self.spill = spill
+        self.errors_only = errors_only
+        self.page_size = page_size
+        self.start = 0
+        self.setWindowTitle(title)
+        self.resize(760, 520)
+
+        layout = QVBoxLayout(self)
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        layout.addWidget(self.text, 1)
+
+        nav = QHBoxLayout()
+        self.prev_btn = QPushButton("◀ Previous")
+        self.prev_btn.clicked.connect(lambda: self._show(self.start - self.page_size))
+        self.next_btn = QPushButton("Next ▶")
+        self.next_btn.clicked.connect(lambda: self._show(self.start + self.page_size))
+        self.position = QLabel()
+        self.position.setObjectName("Muted")
+        nav.addWidget(self.prev_btn)
+        nav.addWidget(self.position, 1)
+        nav.addWidget(self.next_btn)
+        layout.addLayout(nav)
+        self._show(0)
+
+    def _total(self):
+        return self.spill.error_count if self.errors_only else len(self.spill)
+
+    def _show(self, start):
+        total = self._total()
+        self.start = max(0, min(start, max(total - 1, 0)))
+        messages = self.spill.page(self.start, self.page_size, errors_only=self.errors_only)
+        self.text.setPlainText("\n".join(messages))
+        end = self.start + len(messages)
+        self.position.setText(f"{self.start + 1 if messages else 0}–{end} of {total}")
+        self.prev_btn.setEnabled(self.start > 0)
+        self.next_btn.setEnabled(end < total)
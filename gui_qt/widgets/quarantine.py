@@ -0,0 +1,100 @@
+import datetime
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (
+    QDialog,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QMessageBox,
+    QPushButton,
+    QTreeWidget,
+    QTreeWidgetItem,
+    QVBoxLayout,
+)
+
+from core.utils import format_size
+
+# (session id, category or None for the whole session)
+TARGET_ROLE = Qt.UserRole
+
+
+class QuarantineDialog(QDialog):
+    """Lists quarantine sessions by category and restores the selected one."""
+
+    def __init__(self, quarantine, parent=None):
+        super().__init__(parent)
+        self.quarantine = quarantine
+        self.setWindowTitle("Quarantine")
+        self.resize(640, 420)
+
+        layout = QVBoxLayout(self)
+        hint = QLabel(
+            f"Cleaned files kept for {quarantine.retention_days} day(s). "
+            "Restore a whole session or a single category."
+        )
+        hint.setObjectName("Muted")
+        layout.addWidget(hint)
+
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["Session / Category", "Items", "Size"])
+        self.tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.tree.header().setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        self.tree.header().setSectionResizeMode(2, QHeaderView.ResizeToContents)
+        self.tree.itemSelectionChanged.connect(self._update_buttons)
+        layout.addWidget(self.tree, 1)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch(1)
+        self.restore_btn = QPushButton("Restore Selected")
+        self.restore_btn.setObjectName("Primary")
+        self.restore_btn.clicked.connect(self._restore_selected)
+        close_btn = QPushButton("Close")
+        close_btn.setObjectName("Ghost")
+        close_btn.clicked.connect(self.accept)
+        buttons.addWidget(self.restore_btn)
+        buttons.addWidget(close_btn)
+        layout.addLayout(buttons)
+        self._reload()
+
+    def _reload(self):
+        self.tree.clear()
+        for session in reversed(self.quarantine.sessions()):
+            created = session["created"]
+            top = QTreeWidgetItem([
+                f"{datetime.datetime.fromtimestamp(created):%Y-%m-%d %H:%M}" if created is not None else session["id"],
+                str(session["items"]),
+                format_size(session["size"]),
+            ])
+            top.setData(0, TARGET_ROLE, (session["id"], None))
+            for category, (items, size) in sorted(session["categories"].items()):
+                child = QTreeWidgetItem([category or "(uncategorized)", str(items), format_size(size)])
+                child.setData(0, TARGET_ROLE, (session["id"], category))
+                top.addChild(child)
+            self.tree.addTopLevelItem(top)
+        if not self.tree.topLevelItemCount():
+            empty = QTreeWidgetItem(["Nothing in quarantine", "", ""])
+            empty.setFlags(Qt.ItemIsEnabled)
+            self.tree.addTopLevelItem(empty)
+        self._update_buttons()
+
+    def _update_buttons(self):
+        item = self.tree.currentItem()
+        self.restore_btn.setEnabled(bool(item and item.isSelected() and item.data(0, TARGET_ROLE)))
+
+    def _restore_selected(self):
+        item = self.tree.currentItem()
+        target = item.data(0, TARGET_ROLE) if item else None
+        if not target:
+            return
+        session_id, category = target
+        count, size, errors = self.quarantine.restore(session_id, category)
+        message = f"Restored {count} items ({format_size(size)})."
+        if errors:
+            shown = "\n".join(errors[:10])
+            more = f"\n... and {len(errors) - 10} more" if len(errors) > 10 else ""
+            message += f"\n\n{len(errors)} could not be restored:\n{shown}{more}"
+            QMessageBox.warning(self, "Restore", message)
+        else:
+            QMessageBox.information(self, "Restore", message)
+        self._reload()
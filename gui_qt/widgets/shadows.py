@@ -0,0 +1,109 @@
+"""Drop shadows drawn from cached pixmaps.
+
+QGraphicsDropShadowEffect blurs an offscreen copy of the whole widget on
+every repaint. Cards are rounded rectangles, so their shadow only depends
+on the blur, corner radius and colour: it is blurred once into a small
+nine-slice tile and stretched to the card, which turns repaints and
+resizes into a few pixmap blits.
+"""
+from PySide6.QtCore import Qt, QRectF
+from PySide6.QtGui import QColor, QImage, QPainter, QPixmap
+from PySide6.QtWidgets import QGraphicsBlurEffect, QGraphicsEffect, QGraphicsPixmapItem, QGraphicsScene
+
+_TILES = {}  # (blur, radius, rgba, dpr) -> QPixmap
+
+
+def _render_tile(blur, radius, color, dpr):
+    size = 2 * (blur + radius) + 1
+    shape = QImage(round(size * dpr), round(size * dpr), QImage.Format_ARGB32_Premultiplied)
+    shape.fill(Qt.transparent)
+    painter = QPainter(shape)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.scale(dpr, dpr)
+    painter.setPen(Qt.NoPen)
+    painter.setBrush(color)
+    painter.drawRoundedRect(QRectF(blur, blur, 2 * radius + 1, 2 * radius + 1), radius, radius)
+    painter.end()
+
+    # Qt's own blur, run once through a throwaway scene
+    scene = QGraphicsScene()
+    item = QGraphicsPixmapItem(QPixmap.fromImage(shape))
+    effect = QGraphicsBlurEffect()
+    effect.setBlurRadius(blur * dpr)
+    effect.setBlurHints(QGraphicsBlurEffect.QualityHint)
+    item.setGraphicsEffect(effect)
+    scene.addItem(item)
+    blurred = QImage(shape.size(), QImage.Format_ARGB32_Premultiplied)
+    blurred.fill(Qt.transparent)
+    painter = QPainter(blurred)
+    scene.render(painter, QRectF(blurred.rect()), QRectF(shape.rect()))
+    painter.end()
+
+    tile = QPixmap.fromImage(blurred)
+    tile.setDevicePixelRatio(dpr)
+    return tile
+
+
+def shadow_tile(blur, radius, color, dpr=1.0):
+    """The blurred nine-slice tile for a shadow, rendered on first use."""
+    color = QColor(color)
+    key = (blur, radius, color.rgba(), dpr)
+    tile = _TILES.get(key)
+    if tile is None:
+        tile = _TILES[key] = _render_tile(blur, radius, color, dpr)
+    return tile
+
+
+def draw_shadow(painter, rect, blur, radius, color):
+    """Paints the shadow of a rounded rect, spreading `blur` pixels around it."""
+    radius = int(min(radius, rect.width() / 2, rect.height() / 2))
+    dpr = painter.device().devicePixelRatioF() if painter.device() else 1.0
+    tile = shadow_tile(blur, radius, color, dpr)
+    corner = blur + radius
+    outer = QRectF(rect).adjusted(-blur, -blur, blur, blur)
+    xs = (outer.left(), outer.left() + corner, outer.right() - corner, outer.right())
+    ys = (outer.top(), outer.top() + corner, outer.bottom() - corner, outer.bottom())
+    # Tile slices: fixed corners, a one-pixel middle row and column that stretch
+    cuts = (0, corner, corner + 1, 2 * corner + 1)
+    for i in range(3):
+        for j in range(3):
+            target = QRectF(xs[i], ys[j], xs[i + 1] - xs[i], ys[j + 1] - ys[j])
+            if target.width() <= 0 or target.height() <= 0:
+                continue
+            source = QRectF(cuts[i] * dpr, cuts[j] * dpr,
+                            (cuts[i + 1] - cuts[i]) * dpr, (cuts[j + 1] - cuts[j]) * dpr)
+            painter.drawPixmap(target, tile, source)
+
+
+class CachedShadowEffect(QGraphicsEffect):
+    """Drop-in for QGraphicsDropShadowEffect on rounded-rect widgets.
+
+    radius=None follows the widget's height, for pill-shaped buttons.
+    """
+
+    def __init__(self, blur=20, offset=(0, 4), color=QColor(0, 0, 0, 8), radius=16, parent=None):
+        super().__init__(parent)
+        self.blur = blur
+        self.offset = offset
+        self.color = QColor(color)
+        self.radius = radius
+
+    def _shadow_rect(self, rect):
+        dx, dy = self.offset
+        return rect.translated(dx, dy)
+
+    def boundingRectFor(self, rect):
+        shadow = self._shadow_rect(rect).adjusted(-self.blur, -self.blur, self.blur, self.blur)
+        return rect.united(shadow)
+
+    def draw(self, painter):
+        rect = self.sourceBoundingRect(Qt.LogicalCoordinates)
+        radius = rect.height() / 2 if self.radius is None else self.radius
+        draw_shadow(painter, self._shadow_rect(rect), self.blur, radius, self.color)
+        self.drawSource(painter)
+
+
+def apply_shadow(widget, blur=20, offset=(0, 4), color=QColor(0, 0, 0, 8), radius=16):
+    effect = CachedShadowEffect(blur, offset, color, radius, parent=widget)
+    widget.setGraphicsEffect(effect)
+    return effect
@@ -1,85 +1,194 @@
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QObject, Qt, QThread, QTimer, Signal
+from core.ages import refilter
+from core.duplicates import summarize
+from core.results import STORE, scan_summary
+from core.scanfile import confine, load, revalidate
+from core.safety import split_by_risk
+from core.throttle import lower_thread_priority
+from core.metrics import MetricsRing, history_drive, list_fixed_drives, read_disk_usage, read_system_metrics
+from core.watcher import FileWatcher
 from core.utils import format_size
 
 
 class ScanWorker(QObject):
+    """Scans on a thread; emits finished(handle, summary, min_age_days).
+
+    The results themselves go to the ResultStore, since sending them
+    through the signal would convert every path on the GUI thread.
+    """
     progress = Signal(int, int, str)
-    finished = Signal(dict, int)
+    finished = Signal(int, object, int)
 
-    def __init__(self, scanner, selected, min_age_days):
+    def __init__(self, scanner, selected, min_age_days, store=None):
         super().__init__()
         self.scanner = scanner
         self.selected = selected
         self.min_age_days = min_age_days
+        self.store = STORE if store is None else store
 
     def run(self):
+        if self.scanner.throttle is not None:
+            lower_thread_priority()
+
         def _progress(idx, total, cat, _data):
             self.progress.emit(idx, total, cat)
 
         results = self.scanner.scan_selected(
             self.selected, progress_cb=_progress, min_age_days=self.min_age_days
         )
-        self.finished.emit(results, self.min_age_days)
+        # Sort the age indexes here rather than on the first age change or watcher batch in the view
+        for data in results.values():
+            if data.get('ages') is not None:
+                data['ages'].freeze(track=True)
+        handle = self.store.put(results)
+        self.finished.emit(handle, scan_summary(results), self.min_age_days)
 
 
 class CleanWorker(QObject):
+    """Cleans the selected categories, low-risk ones first.
+
+    The restore point (usually started when the scan began) is only
+    waited for before the first category outside `low_risk`. With
+    `quarantine` set, files are staged in one quarantine session; with
+    a `throttle` the thread runs at idle priority within its limits.
+    With `min_age_days`, each category's file list is first rebuilt for
+    that age threshold (the view only re-counts when the age changes);
+    with `revalidate` (a scan read from a file), files changed since the
+    scan are dropped from it too.
+    """
     progress = Signal(int, int, str, int, int)
     log = Signal(str)
-    finished = Signal(int, int, list)
+    finished = Signal(int, int, object)
 
-    def __init__(self, cleaner, targets, use_recycle):
+    def __init__(self, cleaner, targets, use_recycle, low_risk=(), quarantine=False, throttle=None,
+                 min_age_days=None, revalidate=False):
         super().__init__()
         self.cleaner = cleaner
         self.targets = targets
         self.use_recycle = use_recycle
+        self.low_risk = set(low_risk)
+        self.quarantine = quarantine
+        self.throttle = throttle
+        self.min_age_days = min_age_days
+        self.revalidate = revalidate
 
     def run(self):
-        ok, msg = self.cleaner.run_safety_checks()
-        if not ok:
-            self.log.emit(f"Restore point warning: {msg}")
+        if self.throttle is not None:
+            lower_thread_priority()
+        if self.min_age_days is not None:
+            for cat, data in self.targets.items():
+                if not self.revalidate:
+                    refilter(data, self.min_age_days)
+                    continue
+                count, size = revalidate(data, self.min_age_days)
+                if count:
+                    self.log.emit(f"[{cat}] Skipped {count} items ({format_size(size)}) changed since the scan")
+        low, high = split_by_risk(list(self.targets), self.low_risk)
 
         total_items = 0
         total_size = 0
         errors = []
 
+        session = self.cleaner.begin_quarantine() if self.quarantine else None
         total_cats = len(self.targets)
-        for idx, (cat, data) in enumerate(self.targets.items(), start=1):
-            count, size, errs = self.cleaner.clean_category(cat, data, self.use_recycle)
-            total_items += count
-            total_size += size
-            if errs:
-                errors.extend(errs)
-            self.log.emit(f"[{cat}] Cleaned {count} items ({format_size(size)})")
-            self.progress.emit(idx, total_cats, cat, count, size)
+        try:
+            for idx, cat in enumerate(low + high, start=1):
+                if idx == len(low) + 1:
+                    ok, msg = self.cleaner.run_safety_checks()
+                    if not ok:
+                        self.log.emit(f"Restore point warning: {msg}")
+                count, size, errs = self.cleaner.clean_category(
+                    cat, self.targets[cat], self.use_recycle, session, self.throttle
+                )
+                total_items += count
+                total_size += size
+                if errs:
+                    errors.extend(errs)
+                self.log.emit(f"[{cat}] Cleaned {count} items ({format_size(size)})")
+                self.progress.emit(idx, total_cats, cat, count, size)
+        finally:
+            if session is not None:
+                session.close()
+        if session is not None and session.items:
+            self.log.emit(f"Quarantined {session.items} items in session {session.id} (use Restore to undo)")
+        if self.throttle is not None and self.throttle.slept:
+            self.log.emit(f"Background mode: paused {self.throttle.slept:.1f}s to keep the disk responsive")
 
         self.finished.emit(total_items, total_size, errors)
 
 
+class LoadScanWorker(QObject):
+    """Reads a saved scan file; emits finished(handle, summary, min_age_days) like ScanWorker, or failed(message).
+
+    Saved paths the scanner's current rules would not match are dropped
+    (see scanfile.confine), with a log line per category.
+    """
+    log = Signal(str)
+    finished = Signal(int, object, int)
+    failed = Signal(str)
+
+    def __init__(self, path, scanner, store=None):
+        super().__init__()
+        self.path = path
+        self.scanner = scanner
+        self.store = STORE if store is None else store
+
+    def run(self):
+        try:
+            results, header = load(self.path)
+        except (OSError, ValueError) as e:
+            self.failed.emit(str(e))
+            return
+        min_age_days = header['min_age_days']
+        dropped = confine(results, self.scanner.watch_plan(list(results)), self.scanner.recycle_bin_roots(),
+                          min_age_days)
+        for cat, (count, size) in dropped.items():
+            self.log.emit(f"[{cat}] Ignored {count} saved entries ({format_size(size)}) that its rules do not match")
+        for data in results.values():
+            if data.get('ages') is not None:
+                data['ages'].freeze(track=True)
+        self.finished.emit(self.store.put(results), scan_summary(results), min_age_days)
+
+
 class LargeFilesWorker(QObject):
-    finished = Signal(list)
+    finished = Signal(object)
 
-    def __init__(self, analyzer, path, min_size_mb):
+    def __init__(self, analyzer, path, dirty=None):
         super().__init__()
         self.analyzer = analyzer
         self.path = path
-        self.min_size_mb = min_size_mb
+        self.dirty = dirty
 
     def run(self):
-        files = self.analyzer.find_large_files(self.path, min_size_mb=self.min_size_mb)
-        self.finished.emit(files)
+        try:
+            index = self.analyzer.refresh_disk_index(self.path, dirty=self.dirty)
+        except Exception:
+            index = None
+        self.finished.emit(index)
 
 
 class DuplicatesWorker(QObject):
-    finished = Signal(dict)
+    """Finds duplicate groups; emits finished(handle, group count) with the groups in the ResultStore."""
+    finished = Signal(int, int)
 
-    def __init__(self, analyzer, path):
+    def __init__(self, analyzer, path, similar=False, store=None):
         super().__init__()
         self.analyzer = analyzer
         self.path = path
+        self.similar = similar
+        self.store = STORE if store is None else store
 
     def run(self):
-        dupes = self.analyzer.find_duplicates(self.path)
-        self.finished.emit(dupes)
+        if self.similar:
+            try:
+                found = self.analyzer.find_similar_images(self.path)
+            except Exception:
+                # Pillow missing or the search failed; finished must still be emitted
+                found = {}
+            groups = [summarize(paths, key) for key, paths in found.items()]
+        else:
+            groups = self.analyzer.analyze_duplicates(self.path)
+        self.finished.emit(self.store.put(groups), len(groups))
 
 
 class AppsWorker(QObject):
@@ -92,3 +201,148 @@ class AppsWorker(QObject):
     def run(self):
         apps = self.analyzer.get_installed_programs()
         self.finished.emit(apps)
+
+
+class MetricsSampler(QObject):
+    """Samples system metrics on its own thread while at least one view subscribes.
+
+    Only values that changed since the previous sample are emitted, and every
+    sample is kept in a ring buffer so views can draw short histories without
+    sampling again. With a history store attached, sampling continues at a
+    slow rate while nobody is subscribed so long-term trends have no gaps.
+    The history always records `history_drive` (the system drive), whichever
+    drive the dashboard shows, so its used space compares like with like.
+    """
+    sampled = Signal(dict)
+    drives_ready = Signal(list)
+    # Calls from the GUI thread arrive through these, so only the sampler
+    # thread ever touches the timer, the subscriber count or the drive
+    _subscribe = Signal(int)
+    _drive = Signal(str)
+    _stop = Signal()
+
+    def __init__(self, interval_ms=2000, history_size=300, history=None, idle_interval_ms=60000):
+        super().__init__()
+        self.interval_ms = interval_ms
+        self.idle_interval_ms = idle_interval_ms
+        self.ring = MetricsRing(history_size)
+        self.history = history
+        self.drive = None
+        self.history_drive = None
+        self._subscribers = 0
+        self._last = {}
+        self._timer = None
+        self._subscribe.connect(self._on_subscribe)
+        self._drive.connect(self._on_set_drive)
+        # stop() returns once the timer is gone and the history flushed
+        self._stop.connect(self._on_stop, Qt.BlockingQueuedConnection)
+
+    def run(self):
+        self._timer = QTimer()
+        self._timer.setInterval(self.interval_ms)
+        self._timer.timeout.connect(self._sample)
+        drives = list_fixed_drives()
+        if self.drive is None and drives:
+            self.drive = drives[0]
+        self.history_drive = history_drive(drives)
+        self.drives_ready.emit(drives)
+        if self._subscribers:
+            self._on_wake()
+        else:
+            self._on_sleep()
+
+    def stop(self):
+        """Stops sampling; call from the GUI thread before quitting the sampler's thread."""
+        if self.thread().isRunning() and self.thread() is not QThread.currentThread():
+            self._stop.emit()
+        else:
+            self._on_stop()
+
+    def subscribe(self):
+        self._subscribe.emit(1)
+
+    def unsubscribe(self):
+        self._subscribe.emit(-1)
+
+    def set_drive(self, drive):
+        self._drive.emit(drive)
+
+    def _on_subscribe(self, delta):
+        was = self._subscribers
+        self._subscribers = max(0, was + delta)
+        if self._subscribers and not was:
+            self._on_wake()
+        elif was and not self._subscribers:
+            self._on_sleep()
+
+    def _on_set_drive(self, drive):
+        self.drive = drive
+        self._last.pop('disk', None)
+        if self._subscribers:
+            self._on_wake()
+
+    def _on_wake(self):
+        if self._timer is None:
+            return
+        self._sample()
+        self._timer.start(self.interval_ms)
+
+    def _on_sleep(self):
+        if self._timer is None:
+            return
+        if self.history is not None:
+            self._timer.start(self.idle_interval_ms)
+        else:
+            self._timer.stop()
+
+    def _on_stop(self):
+        if self._timer is not None:
+            self._timer.stop()
+            # The timer has no parent, so dropping it here deletes it on this thread
+            self._timer = None
+        if self.history is not None:
+            try:
+                self.history.flush()
+            except OSError:
+                pass
+            self.history = None
+
+    def _sample(self):
+        sample = read_system_metrics(self.drive)
+        self.ring.append(sample)
+        if self.history is not None:
+            record = sample
+            if self.drive != self.history_drive:
+                record = {k: v for k, v in sample.items() if k not in ('disk', 'disk_used')}
+                record.update(read_disk_usage(self.history_drive))
+            try:
+                self.history.add(record)
+            except OSError:
+                pass
+        if not self._subscribers:
+            return
+        delta = {k: v for k, v in sample.items() if k != 'ts' and self._last.get(k) != v}
+        if delta:
+            self._last.update(delta)
+            delta['ts'] = sample['ts']
+            self.sampled.emit(delta)
+
+
+class WatchBridge(QObject):
+    """Runs a FileWatcher and re-emits its debounced batches on the GUI thread."""
+    batch = Signal(object)
+
+    def __init__(self, roots, debounce=0.5, polling=True):
+        super().__init__()
+        self.watcher = FileWatcher(roots, self.batch.emit, debounce=debounce, polling=polling)
+
+    @property
+    def active(self):
+        return self.watcher.active
+
+    def start(self):
+        self.watcher.start()
+        return self
+
+    def stop(self):
+        self.watcher.stop()
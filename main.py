@@ -1,5 +1,6 @@
 import sys
 import os
+import multiprocessing
 import importlib.util
 from pathlib import Path
 
@@ -26,13 +27,20 @@ def _prepare_pyside6_dlls():
         os.environ["PATH"] = ";".join(filtered)
 
 
-_prepare_pyside6_dlls()
+def main():
+    _prepare_pyside6_dlls()
+    # Imported here, not at module level: spawned pool workers (image hashing,
+    # process scans) re-import this file as __mp_main__ and only need core
+    from PySide6.QtWidgets import QApplication
+    from gui_qt.app import CleanerApp
 
-from PySide6.QtWidgets import QApplication  # noqa: E402
-from gui_qt.app import CleanerApp  # noqa: E402
-
-if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = CleanerApp()
     window.show()
-    sys.exit(app.exec())
+    return app.exec()
+
+
+if __name__ == "__main__":
+    # Image hashing runs on a process pool; frozen builds need this to spawn workers
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,94 @@
+import unittest
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.ages import AgeIndex, age_summary, refilter
+from core.results import scan_summary
+from core.rules import compile_rules, scan_rules
+from core.session import ScanSession
+
+DAY = 86400
+
+class TestAgeIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = AgeIndex(now=100 * DAY)
+        for age, size in ((30, 1000), (1, 10), (10, 100), (5, 50)):
+            self.index.add((100 - age) * DAY, size, f'f{age}')
+        self.index.pin(2, 7)
+
+    def test_summary_for_any_threshold(self):
+        self.assertEqual(self.index.summary(0), (4, 1160, 2, 7))
+        self.assertEqual(self.index.summary(7), (2, 1100, 4, 67))
+        self.assertEqual(self.index.summary(14), (1, 1000, 5, 167))
+        self.assertEqual(self.index.summary(365), (0, 0, 6, 1167))
+
+    def test_eligible_and_discard(self):
+        paths, sizes = self.index.eligible(3)
+        self.assertEqual(paths, ['f30', 'f10', 'f5'])
+        self.assertEqual(list(sizes), [1000, 100, 50])
+        self.assertEqual(self.index.discard({'f10', 'missing'}), 1)
+        self.assertEqual(self.index.summary(3), (2, 1050, 3, 17))
+
+    def test_changes_after_freeze_are_kept_aside(self):
+        self.index.freeze(track=True)
+        self.index.discard({'f10'})
+        self.index.add(90 * DAY, 5, 'g10')
+        self.index.add(99 * DAY, 3, 'g1')
+        # Summaries fold in the pending changes without touching the sorted arrays
+        self.assertEqual(self.index.summary(3), (3, 1055, 4, 20))
+        self.assertEqual(len(self.index.paths), 4)
+        self.assertIn('g10', self.index)
+        self.assertNotIn('f10', self.index)
+        self.assertEqual(self.index.eligible(3)[0], ['f30', 'g10', 'f5'])
+        self.assertEqual(self.index.discard({'g1', 'f30'}), 2)
+        self.assertEqual(self.index.summary(0), (3, 65, 2, 7))
+
+class TestRefilter(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.session = ScanSession({'CACHE': self.test_dir}, admin=False)
+        self.paths = {}
+        for age in (1, 5, 10, 30):
+            path = os.path.join(self.test_dir, f'{age}.tmp')
+            with open(path, 'wb') as f:
+                f.write(b'x' * age)
+            old = time.time() - age * DAY - 60
+            os.utime(path, (old, old))
+            self.paths[age] = path
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_threshold_below_and_above_the_scan(self):
+        rules = compile_rules([{'category': 'Cache', 'roots': ['%CACHE%'], 'globs': ['*.tmp']}])
+        for backend in ('serial', 'process'):
+            results = scan_rules(rules, self.session, min_age_days=7, backend=backend)
+            data = results['Cache']
+            self.assertEqual((len(data['files']), data['skipped_recent']), (2, 2))
+
+            counts = scan_summary(results, 0)['Cache']
+            self.assertEqual((counts['items'], counts['size'], counts['skipped_recent']), (4, 46, 0))
+            self.assertTrue(refilter(data, 3))
+            self.assertEqual(sorted(data['files']), sorted([self.paths[5], self.paths[10], self.paths[30]]))
+            self.assertEqual((data['size'], data['skipped_recent'], data['skipped_recent_size']), (45, 1, 1))
+            self.assertEqual(data['items'][0], {'path': self.paths[30], 'size': 30})
+
+            refilter(data, 20)
+            self.assertEqual(data['files'], [self.paths[30]])
+            self.assertEqual(age_summary(data, 20)['skipped_recent'], 3)
+
+    def test_rule_floor_is_kept(self):
+        rules = compile_rules([{'category': 'Cache', 'roots': ['%CACHE%'], 'globs': ['*.tmp'],
+                                'min_age_days': 7}])
+        data = scan_rules(rules, self.session)['Cache']
+        self.assertEqual(age_summary(data, 0)['items'], 2)
+        self.assertEqual(age_summary(data, 0)['skipped_recent_size'], 6)
+        self.assertFalse(refilter({'files': []}, 0))
+
+if __name__ == '__main__':
+    unittest.main()
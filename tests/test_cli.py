@@ -0,0 +1,90 @@
+import unittest
+import io
+import os
+import sys
+import json
+import subprocess
+from contextlib import redirect_stdout, redirect_stderr
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import cli
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+class TestCli(unittest.TestCase):
+    def _run(self, argv):
+        out = io.StringIO()
+        with redirect_stdout(out), redirect_stderr(io.StringIO()):
+            code = cli.main(argv)
+        return code, out.getvalue()
+
+    def test_list_ndjson(self):
+        code, out = self._run(['list'])
+        names = [json.loads(line)['name'] for line in out.splitlines()]
+        self.assertEqual(code, cli.EXIT_OK)
+        self.assertIn('System Temp', names)
+
+    def test_unknown_category_is_usage_error(self):
+        code, _ = self._run(['scan', '-c', 'Not A Category'])
+        self.assertEqual(code, cli.EXIT_USAGE)
+
+    @patch('core.scanner.Scanner.scan_selected')
+    def test_scan_json_and_error_exit(self, mock_scan):
+        def _fake(categories, progress_cb=None, min_age_days=None):
+            results = {'System Temp': {'files': ['a'], 'size': 5, 'error': 'boom'}}
+            progress_cb(1, 1, 'System Temp', results['System Temp'])
+            return results
+        mock_scan.side_effect = _fake
+        code, out = self._run(['scan', '-c', 'system temp', '--format', 'json'])
+        records = json.loads(out)
+        self.assertEqual(code, cli.EXIT_ERRORS)
+        self.assertEqual(records[0]['error'], 'boom')
+        self.assertEqual(records[-1]['type'], 'summary')
+
+    @patch('core.scanner.Scanner.scan_selected')
+    def test_clean_dry_run_does_not_delete(self, mock_scan):
+        mock_scan.return_value = {'System Temp': {'files': ['x', 'y'], 'size': 10}}
+        # A dry run must not even load the cleaner
+        with patch.dict(sys.modules, {'core.cleaner': None}):
+            code, out = self._run(['clean', '--all', '--dry-run'])
+        summary = json.loads(out.splitlines()[-1])
+        self.assertEqual(code, cli.EXIT_OK)
+        self.assertEqual(summary['items'], 2)
+        self.assertTrue(summary['dry_run'])
+
+    def test_closed_pipe_ends_scan(self):
+        import shutil
+        import tempfile
+        from core.scanner import Scanner
+        from core.session import ScanSession
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        with open(os.path.join(test_dir, 'a.tmp'), 'wb') as f:
+            f.write(b'x')
+        rules = [{'category': name, 'roots': ['%JUNK%'], 'globs': ['*.tmp']} for name in ('One', 'Two')]
+        scanner = Scanner(rules=rules, session=ScanSession({'JUNK': test_dir}, admin=False))
+
+        class _ClosedPipe(io.StringIO):
+            def write(self, _text):
+                raise BrokenPipeError()
+
+        args = cli.build_parser().parse_args(['scan', '--all'])
+        # Not turned into an error of the category being reported
+        with self.assertRaises(BrokenPipeError):
+            cli._scan(scanner, ['One', 'Two'], args, cli._Emitter('ndjson', _ClosedPipe()))
+
+    def test_never_imports_qt(self):
+        code = "import sys, runpy; sys.argv=['core','list']\n" \
+               "try:\n    runpy.run_module('core', run_name='__main__')\nexcept SystemExit:\n    pass\n" \
+               "assert not any(m.startswith('PySide6') for m in sys.modules)\n" \
+               "# Pools, subprocesses and rule regexes are only loaded by the commands that use them\n" \
+               "assert not {'multiprocessing', 'concurrent.futures', 'subprocess'} & set(sys.modules)\n" \
+               "from core.rules import DEFAULT_RULES, compile_rules\n" \
+               "assert 'match' not in vars(compile_rules(DEFAULT_RULES)[2].matcher)"
+        result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.diskindex import DiskIndex
+
+class TestDiskIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self._write('root.bin', 5)
+        self._write(os.path.join('a', 'one.bin'), 100)
+        self._write(os.path.join('a', 'deep', 'two.bin'), 300)
+        self._write(os.path.join('b', 'three.bin'), 50)
+        os.makedirs(os.path.join(self.test_dir, 'empty'))
+        self.index = DiskIndex.build(self.test_dir, workers=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, rel, size):
+        path = os.path.join(self.test_dir, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+
+    def test_rollup(self):
+        self.assertEqual(self.index.total_size, 455)
+        self.assertEqual(self.index.size_under(os.path.join(self.test_dir, 'a')), 400)
+        self.assertEqual(self.index.size_under(os.path.join(self.test_dir, 'missing')), 0)
+
+    def test_top_folders(self):
+        top = self.index.top_folders(2)
+        self.assertEqual(top[0], (os.path.join(self.test_dir, 'a'), 400))
+        self.assertEqual(top[1], (os.path.join(self.test_dir, 'b'), 50))
+        nested = self.index.top_folders(1, under=os.path.join(self.test_dir, 'a'))
+        self.assertEqual(nested, [(os.path.join(self.test_dir, 'a', 'deep'), 300)])
+
+    def test_largest_files_under(self):
+        files = self.index.largest_files(5, under=os.path.join(self.test_dir, 'a'))
+        self.assertEqual([os.path.basename(p) for p, _ in files], ['two.bin', 'one.bin'])
+        self.assertEqual(self.index.largest_files(1)[0][1], 300)
+
+    def test_save_and_load(self):
+        path = os.path.join(self.test_dir, 'saved.idx')
+        self.index.save(path)
+        loaded = DiskIndex.load(path)
+        self.assertEqual(loaded.root, self.test_dir)
+        self.assertEqual(loaded.top_folders(3), self.index.top_folders(3))
+        self.assertEqual(loaded.largest_files(3), self.index.largest_files(3))
+
+    def test_files_over_threshold(self):
+        self.assertEqual([size for _, size in self.index.files_over(50)], [300, 100])
+        self.assertEqual(self.index.files_over(1000), [])
+        under_b = self.index.files_over(0, under=os.path.join(self.test_dir, 'b'))
+        self.assertEqual(under_b, [(os.path.join(self.test_dir, 'b', 'three.bin'), 50)])
+
+    def test_refresh_rereads_changed_folders_only(self):
+        self._write(os.path.join('b', 'new.bin'), 70)
+        os.remove(os.path.join(self.test_dir, 'a', 'one.bin'))
+        old = os.path.getmtime(os.path.join(self.test_dir, 'a', 'deep'))
+        # An unchanged folder keeps its listing even if a file was rewritten in place
+        self._write(os.path.join('a', 'deep', 'two.bin'), 10)
+        os.utime(os.path.join(self.test_dir, 'a', 'deep'), (old, old))
+        refreshed = self.index.refresh()
+        self.assertEqual(refreshed.size_under(os.path.join(self.test_dir, 'b')), 120)
+        self.assertEqual(refreshed.size_under(os.path.join(self.test_dir, 'a')), 300)
+        self.assertEqual(refreshed.total_size, 425)
+
+    def test_loaded_index_is_mapped(self):
+        fd, path = tempfile.mkstemp(suffix='.idx')
+        os.close(fd)
+        try:
+            self.index.save(path)
+            loaded = DiskIndex.load(path)
+            self.assertIsInstance(loaded.file_size, memoryview)
+            self.assertEqual(loaded.files_over(50), self.index.files_over(50))
+            self.assertEqual(loaded.refresh().total_size, self.index.total_size)
+            loaded.close()
+        finally:
+            os.remove(path)
+
+if __name__ == '__main__':
+    unittest.main()
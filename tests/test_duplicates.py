@@ -0,0 +1,107 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.duplicates import (
+    allocated_size, annotate_files, find_duplicate_groups, link_duplicates, summarize
+)
+
+class TestDuplicates(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, name, data):
+        path = os.path.join(self.test_dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def _link(self, src, name):
+        path = os.path.join(self.test_dir, name)
+        os.link(src, path)
+        return path
+
+    def test_hard_links_are_not_duplicates(self):
+        original = self._write('a.bin', b'x' * 8192)
+        self._link(original, 'b.bin')
+        self.assertEqual(find_duplicate_groups(self.test_dir), [])
+
+    def test_reclaimable_counts_each_file_once(self):
+        data = os.urandom(16384)
+        a = self._write('a.bin', data)
+        a_link = self._link(a, 'a_link.bin')
+        b = self._write('b.bin', data)
+        groups = find_duplicate_groups(self.test_dir)
+        self.assertEqual(len(groups), 1)
+        group = groups[0]
+        self.assertEqual(sorted(group['paths']), sorted([a, a_link, b]))
+        # The linked pair is kept; only the lone copy is reclaimable
+        self.assertEqual(sorted(group['inodes'][0]), sorted([a, a_link]))
+        self.assertEqual(group['reclaimable'], allocated_size(os.stat(b)))
+        self.assertEqual(group['linkable'], group['reclaimable'])
+
+    def test_links_outside_group_free_nothing(self):
+        data = os.urandom(4096)
+        a = self._write('a.bin', data)
+        b = self._write('b.bin', data)
+        self._link(b, 'elsewhere.bin')
+        group = summarize([a, b])
+        self.assertEqual(group['reclaimable'], 0)
+
+    @unittest.skipUnless(hasattr(os, 'symlink'), "symlinks not supported")
+    def test_symlinks_are_not_copies(self):
+        data = os.urandom(4096)
+        a = self._write('a.bin', data)
+        b = self._write('b.bin', data)
+        try:
+            os.symlink(a, os.path.join(self.test_dir, 'c.bin'))
+        except OSError:
+            self.skipTest("cannot create symlinks")
+        group = summarize([a, b, os.path.join(self.test_dir, 'c.bin')])
+        self.assertEqual(group['paths'], [a, b])
+
+    def test_sparse_file_allocation(self):
+        path = os.path.join(self.test_dir, 'sparse.bin')
+        with open(path, 'wb') as f:
+            f.seek(64 * 1024 * 1024 - 1)
+            f.write(b'\0')
+        st = os.stat(path)
+        if not hasattr(st, 'st_blocks'):
+            self.skipTest("platform does not report allocated blocks")
+        self.assertLess(allocated_size(st), st.st_size)
+        (_path, size, allocated, link_of), = annotate_files([(path, st.st_size)])
+        self.assertEqual(size, st.st_size)
+        self.assertLess(allocated, size)
+        self.assertIsNone(link_of)
+
+    def test_annotate_marks_hard_links(self):
+        a = self._write('a.bin', b'y' * 4096)
+        b = self._link(a, 'b.bin')
+        annotated = annotate_files([(a, 4096), (b, 4096)])
+        self.assertEqual(annotated[1][2:], (0, a))
+
+    def test_link_duplicates(self):
+        data = os.urandom(8192)
+        a = self._write('a.bin', data)
+        b = self._write('b.bin', data)
+        changed = self._write('c.bin', os.urandom(8192))
+        freed_expected = allocated_size(os.stat(b))
+
+        linked, freed, errors = link_duplicates([a, b, changed])
+        self.assertEqual((linked, freed), (1, freed_expected))
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(os.path.samefile(a, b))
+        self.assertFalse(os.path.samefile(a, changed))
+        with open(b, 'rb') as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(sorted(os.listdir(self.test_dir)), ['a.bin', 'b.bin', 'c.bin'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import os
+import sys
+import math
+import shutil
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.history import MetricsHistory, RECORD
+
+class TestMetricsHistory(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _feed(self, history, seconds, step=2, start=0.0):
+        ts = start
+        while ts < start + seconds:
+            history.add({'ts': ts, 'cpu': 10.0, 'ram': 20.0, 'disk': 30.0, 'disk_used': int(ts)})
+            ts += step
+
+    def test_rollups_cascade(self):
+        history = MetricsHistory(self.test_dir)
+        self._feed(history, 2 * 3600 + 120)
+        minutes = history.query('1m')
+        hours = history.query('1h')
+        self.assertEqual(list(hours['ts']), [0.0, 3600.0])
+        self.assertEqual(list(hours['samples']), [1800, 1800])
+        self.assertEqual(minutes['samples'][0], 30)
+        self.assertAlmostEqual(hours['cpu'][0], 10.0)
+
+    def test_query_range(self):
+        history = MetricsHistory(self.test_dir)
+        self._feed(history, 600)
+        result = history.query('1m', start=120, end=300)
+        self.assertEqual(list(result['ts']), [120.0, 180.0, 240.0])
+
+    def test_retention_bounds_file(self):
+        history = MetricsHistory(self.test_dir, tiers={'1m': (60, 10)})
+        self._feed(history, 3600)
+        self.assertLessEqual(len(history.query('1m')['ts']), 13)
+        self.assertEqual(history.query('1m')['ts'][-1], 3480.0)
+
+    def test_reopen_recovers_open_hour(self):
+        history = MetricsHistory(self.test_dir)
+        self._feed(history, 1800)
+        history.flush()
+        reopened = MetricsHistory(self.test_dir)
+        self._feed(reopened, 1800, start=1800)
+        self._feed(reopened, 120, start=3600)
+        self.assertEqual(list(reopened.query('1h')['samples']), [1800])
+        # The minute flushed early was rewritten in place, not appended again
+        minutes = reopened.query('1m')
+        self.assertEqual(len(minutes['ts']), len(set(minutes['ts'])))
+
+    def test_flush_mid_minute_then_continue(self):
+        history = MetricsHistory(self.test_dir)
+        self._feed(history, 30)
+        history.flush()
+        self.assertEqual(list(history.query('1m')['samples']), [15])
+        self._feed(history, 30, start=30)
+        history.flush()
+        self.assertEqual(list(history.query('1m')['samples']), [30])
+        reopened = MetricsHistory(self.test_dir)
+        self._feed(reopened, 120, start=60)
+        self.assertEqual(list(reopened.query('1m')['samples']), [30, 30])
+
+    def test_missing_fields_are_not_averaged_as_zero(self):
+        history = MetricsHistory(self.test_dir)
+        for ts in range(0, 3600 + 120, 30):
+            sample = {'ts': float(ts), 'cpu': 40.0}
+            # Disk only every other sample, RAM never
+            if ts % 60 == 0:
+                sample.update(disk=50.0, disk_used=10)
+            history.add(sample)
+        minute = history.query('1m')
+        self.assertEqual(minute['disk'][0], 50.0)
+        self.assertTrue(math.isnan(minute['ram'][0]))
+        hour = history.query('1h')
+        self.assertEqual(list(hour['samples']), [120])
+        self.assertEqual((hour['cpu'][0], hour['disk'][0]), (40.0, 50.0))
+        self.assertTrue(math.isnan(hour['ram'][0]))
+
+    def test_torn_record_is_dropped(self):
+        history = MetricsHistory(self.test_dir)
+        self._feed(history, 180)
+        with open(os.path.join(self.test_dir, 'metrics_1m.bin'), 'ab') as f:
+            f.write(b'\0' * (RECORD.size // 2))
+        reopened = MetricsHistory(self.test_dir)
+        self.assertEqual(len(reopened.query('1m')['ts']), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import os
+import sys
+import random
+import shutil
+import tempfile
+import subprocess
+from array import array
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.imagehash import MultiIndex, group_similar, hamming, hash_images, list_images
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+class TestImageHash(unittest.TestCase):
+    def test_multi_index_matches_brute_force(self):
+        rng = random.Random(7)
+        hashes = [rng.getrandbits(64) for _ in range(300)]
+        # Plant near copies at known distances
+        for i in range(0, 300, 10):
+            hashes[i + 1] = hashes[i] ^ sum(1 << b for b in rng.sample(range(64), 6))
+        index = MultiIndex(6)
+        for item, value in enumerate(hashes):
+            index.add(value, item)
+        for value in hashes[:50]:
+            expected = {i for i, other in enumerate(hashes) if hamming(value, other) <= 6}
+            self.assertEqual({item for item, _dist in index.search(value)}, expected)
+
+    def test_group_similar(self):
+        base = 0x0123456789ABCDEF
+        hashes = array('Q', [base, base ^ 0b111, 0xFFFF0000FFFF0000, base ^ (0b11 << 60), 0])
+        groups = group_similar(hashes, max_distance=4)
+        self.assertEqual([sorted(g) for g in groups], [[0, 1, 3]])
+
+    def test_unreadable_images_are_skipped(self):
+        test_dir = tempfile.mkdtemp()
+        try:
+            for name in ('a.jpg', 'b.PNG', 'notes.txt'):
+                with open(os.path.join(test_dir, name), 'wb') as f:
+                    f.write(b'not an image')
+            paths = list_images(test_dir)
+            self.assertEqual(sorted(os.path.basename(p) for p in paths), ['a.jpg', 'b.PNG'])
+            kept, hashes = hash_images(paths, workers=1)
+            self.assertEqual((kept, len(hashes)), ([], 0))
+        finally:
+            shutil.rmtree(test_dir)
+
+    @unittest.skipIf(Image is None, "Pillow not installed")
+    def test_resized_copy_is_similar(self):
+        from core.imagehash import dhash, phash
+        test_dir = tempfile.mkdtemp()
+        try:
+            img = Image.new('L', (256, 256))
+            img.putdata([(x * y) % 256 for y in range(256) for x in range(256)])
+            original = os.path.join(test_dir, 'original.png')
+            copy = os.path.join(test_dir, 'copy.jpg')
+            img.save(original)
+            img.resize((128, 128)).save(copy, quality=70)
+            other = os.path.join(test_dir, 'other.png')
+            img.rotate(90).save(other)
+            for fn in (dhash, phash):
+                self.assertLessEqual(hamming(fn(original), fn(copy)), 6)
+                self.assertGreater(hamming(fn(original), fn(other)), 6)
+        finally:
+            shutil.rmtree(test_dir)
+
+    def test_spawned_workers_skip_the_gui(self):
+        # Spawned pool workers run main.py as __mp_main__; they must not load Qt
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        code = ("import sys, runpy\n"
+                "runpy.run_path('main.py', run_name='__mp_main__')\n"
+                "assert not any(m.startswith(('PySide6', 'gui_qt')) for m in sys.modules)")
+        result = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import os
+import sys
+import json
+import errno
+import shutil
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import instrument
+from core.cleaner import Cleaner
+from core.quarantine import Quarantine
+from core.rules import compile_rules, scan_rules
+from core.session import ScanSession
+
+class TestInstrument(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache = os.path.join(self.test_dir, 'cache')
+        for folder in ('a', 'b'):
+            os.makedirs(os.path.join(self.cache, folder))
+            for i in range(3):
+                with open(os.path.join(self.cache, folder, f'{i}.tmp'), 'wb') as f:
+                    f.write(b'x' * 10)
+        self.rules = compile_rules([{'category': 'Cache', 'roots': ['%CACHE%'], 'globs': ['*.tmp']}])
+        self.session = ScanSession({'CACHE': self.cache}, admin=False)
+
+    def tearDown(self):
+        instrument.disable()
+        shutil.rmtree(self.test_dir)
+
+    def test_disabled_records_nothing(self):
+        self.assertIsNone(instrument.active())
+        with instrument.span('scan', 'Cache') as span:
+            instrument.count('files', 5)
+        self.assertIs(span, instrument._NULL_SPAN)
+
+    def test_scan_and_clean_counters(self):
+        for backend in ('serial', 'process'):
+            rec = instrument.enable()
+            results = scan_rules(self.rules, self.session, backend=backend)
+            instrument.disable()
+            counters = rec.metrics('Cache')['counters']
+            self.assertEqual(counters['stat calls'], 6, backend)
+            self.assertEqual(rec.metrics()['counters']['entries seen'], 8, backend)
+
+        rec = instrument.enable()
+        cleaner = Cleaner(quarantine=Quarantine(os.path.join(self.test_dir, 'quarantine')))
+        cleaner.clean_category('Cache', results['Cache'])
+        instrument.disable()
+        latency = rec.metrics('Cache')['latency']['unlink']
+        self.assertEqual(latency['count'], 6)
+        self.assertLessEqual(latency['p50'], latency['max'])
+        self.assertEqual(rec.timers[('Cache', 'clean')][0], 1)
+        self.assertTrue(any(line.startswith('unlink: 6 x') for line in rec.report('Cache')))
+
+    def test_errors_by_errno_and_trace_export(self):
+        rec = instrument.enable()
+        instrument.error(FileNotFoundError(errno.ENOENT, 'gone'), 'stat', 'Cache')
+        instrument.error(PermissionError(errno.EACCES, 'denied'), 'stat', 'Cache')
+        instrument.error(FileNotFoundError(errno.ENOENT, 'gone'), 'stat', 'Cache')
+        with instrument.span('walk', root=self.cache):
+            instrument.count('dirs listed', 3)
+        self.assertEqual(rec.metrics('Cache')['errors'], {'stat ENOENT': 2, 'stat EACCES': 1})
+
+        path = os.path.join(self.test_dir, 'trace.json')
+        rec.export_chrome_trace(path)
+        with open(path, encoding='utf-8') as f:
+            events = json.load(f)['traceEvents']
+        self.assertEqual([e['ph'] for e in events], ['X', 'C'])
+        self.assertEqual(events[0]['args'], {'root': self.cache})
+        self.assertEqual(events[1]['args'], {'dirs listed': 3})
+
+if __name__ == '__main__':
+    unittest.main()
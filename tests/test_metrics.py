@@ -0,0 +1,42 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from unittest.mock import patch
+
+from core.metrics import MetricsRing, history_drive
+
+class TestMetricsRing(unittest.TestCase):
+    def test_latest_and_history(self):
+        ring = MetricsRing(capacity=4)
+        self.assertEqual(ring.latest(), {})
+        for i in range(3):
+            ring.append({'ts': float(i), 'cpu': i * 10.0, 'ram': 50.0, 'disk': 70.0})
+        self.assertEqual(len(ring), 3)
+        self.assertEqual(ring.latest()['cpu'], 20.0)
+        self.assertEqual(list(ring.history('cpu')), [0.0, 10.0, 20.0])
+
+    def test_wraps_around_capacity(self):
+        ring = MetricsRing(capacity=3)
+        for i in range(5):
+            ring.append({'ts': float(i), 'cpu': float(i)})
+        self.assertEqual(len(ring), 3)
+        self.assertEqual(list(ring.history('cpu')), [2.0, 3.0, 4.0])
+        self.assertEqual(list(ring.history('ts', limit=2)), [3.0, 4.0])
+
+    def test_missing_metric_carries_forward(self):
+        ring = MetricsRing(capacity=3)
+        ring.append({'ts': 1.0, 'cpu': 5.0, 'disk': 40.0})
+        ring.append({'ts': 2.0, 'cpu': 6.0})
+        self.assertEqual(ring.latest()['disk'], 40.0)
+    def test_history_follows_the_system_drive(self):
+        with patch.dict(os.environ, {'SystemDrive': 'D:'}):
+            self.assertEqual(history_drive(['C:\\', 'D:\\']), 'D:\\')
+        with patch.dict(os.environ, {'SystemDrive': 'Z:'}):
+            self.assertEqual(history_drive(['C:\\', 'D:\\']), 'C:\\')
+        self.assertIsNone(history_drive([]))
+
+if __name__ == '__main__':
+    unittest.main()
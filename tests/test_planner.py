@@ -0,0 +1,144 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.planner import execute_walk, plan_walks, shard_walk
+from core.session import ScanSession
+from core.rules import compile_rules, scan_rules
+
+class TestPlanner(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.env = {'LOCALAPPDATA': self.test_dir, 'TEMP': os.path.join(self.test_dir, 'Temp')}
+
+        self.session = ScanSession(self.env, admin=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _touch(self, *parts):
+        path = os.path.join(self.test_dir, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'data')
+        return path
+
+    def test_nested_roots_fold_into_one_walk(self):
+        rules = compile_rules([
+            {'category': 'Profile', 'roots': ['%LOCALAPPDATA%\\Browser'], 'globs': ['*.tmp']},
+            {'category': 'Cache', 'roots': ['%LOCALAPPDATA%\\Browser\\Cache']},
+            {'category': 'Temp', 'roots': ['%TEMP%', '%LOCALAPPDATA%/Temp']},
+        ])
+        walks = plan_walks(rules, self.session)
+        self.assertEqual(len(walks), 2)
+        browser = [w for w in walks if w.root.endswith('Browser')][0]
+        self.assertEqual(browser.categories, {'Profile', 'Cache'})
+
+    def test_nested_rules_only_apply_below_their_root(self):
+        top = self._touch('Browser', 'x.tmp')
+        top_other = self._touch('Browser', 'x.dat')
+        cached = self._touch('Browser', 'Cache', 'blob.tmp')
+        cached_other = self._touch('Browser', 'Cache', 'blob.bin')
+        rules = compile_rules([
+            {'category': 'Profile', 'roots': ['%LOCALAPPDATA%\\Browser'], 'globs': ['*.tmp']},
+            {'category': 'Cache', 'roots': ['%LOCALAPPDATA%\\Browser\\Cache']},
+        ])
+        results = scan_rules(rules, self.session)
+        self.assertEqual(sorted(results['Profile']['files']), sorted([top, cached]))
+        self.assertEqual(sorted(results['Cache']['files']), sorted([cached, cached_other]))
+        self.assertNotIn(top_other, results['Profile']['files'])
+
+    def test_sibling_sorting_between_nested_roots(self):
+        # "a-x" sorts between "a" and "a/b" as a plain string
+        nested = self._touch('a', 'b', 'f.tmp')
+        rules = compile_rules([
+            {'category': 'A', 'roots': ['%LOCALAPPDATA%\\a'], 'globs': ['*.log']},
+            {'category': 'AX', 'roots': ['%LOCALAPPDATA%\\a-x']},
+            {'category': 'B', 'roots': ['%LOCALAPPDATA%\\a\\b'], 'globs': ['*.tmp']},
+        ])
+        os.makedirs(os.path.join(self.test_dir, 'a-x'))
+        walks = plan_walks(rules, self.session)
+        self.assertEqual(len(walks), 2)
+        self.assertEqual(scan_rules(rules, self.session)['B']['files'], [nested])
+
+    @unittest.skipUnless(hasattr(os, 'symlink'), "symlinks not supported")
+    def test_directories_listed_once(self):
+        self._touch('Temp', 'a', 'f.tmp')
+        try:
+            os.symlink(os.path.join(self.test_dir, 'Temp'), os.path.join(self.test_dir, 'Temp', 'a', 'loop'),
+                       target_is_directory=True)
+        except OSError:
+            self.skipTest("cannot create symlinks")
+        rules = compile_rules([{'category': 'Temp', 'roots': ['%TEMP%']}])
+        listed = []
+        for walk in plan_walks(rules, self.session):
+            execute_walk(walk, lambda entry, _active: listed.append(entry.path))
+        self.assertEqual([os.path.basename(p) for p in listed], ['f.tmp'])
+
+    def test_pooled_backends_match_serial(self):
+        self._touch('Browser', 'x.tmp')
+        self._touch('Browser', 'Cache', 'blob.tmp')
+        self._touch('Browser', 'Cache', 'deep', 'blob.bin')
+        self._touch('Browser', 'Other', 'y.tmp')
+        self._touch('Temp', 'z.log')
+        rules = compile_rules([
+            {'category': 'Profile', 'roots': ['%LOCALAPPDATA%\\Browser'], 'globs': ['*.tmp']},
+            {'category': 'Cache', 'roots': ['%LOCALAPPDATA%\\Browser\\Cache']},
+            {'category': 'Temp', 'roots': ['%TEMP%']},
+        ])
+        serial = scan_rules(rules, self.session)
+        for backend in ('thread', 'process'):
+            pooled = scan_rules(rules, self.session, backend=backend, workers=2)
+            self.assertEqual(list(pooled), list(serial))
+            for cat, res in serial.items():
+                self.assertEqual(sorted(pooled[cat]['files']), sorted(res['files']))
+                self.assertEqual(pooled[cat]['size'], res['size'])
+                self.assertEqual(sorted(i['path'] for i in pooled[cat]['items']), sorted(res['files']))
+    def test_flat_and_nested_folders_are_split(self):
+        names = [f'{i:02d}.tmp' for i in range(10)]
+        for name in names:
+            self._touch('Browser', 'Cache', 'Cache_Data', name)
+        self._touch('Browser', 'Cache', 'index')
+        self._touch('Browser', 'Cache', 'js', 'a', 'b.tmp')
+        rules = compile_rules([
+            {'category': 'Profile', 'roots': ['%LOCALAPPDATA%\\Browser'], 'globs': ['*.tmp']},
+            {'category': 'Cache', 'roots': ['%LOCALAPPDATA%\\Browser\\Cache']},
+        ])
+        [walk] = plan_walks(rules, self.session)
+        here = []
+        shards = shard_walk(walk, lambda entry, _active: here.append(entry.path), set(), min_shards=5, chunk=3)
+        self.assertEqual([os.path.basename(p) for p in here], ['index'])
+        # Ten files in slices of three, then the js subtree
+        self.assertEqual([shard.names for shard in shards],
+                         [('', '03.tmp'), ('03.tmp', '06.tmp'), ('06.tmp', '09.tmp'), ('09.tmp', None), None])
+        self.assertEqual({shard.categories == {'Profile', 'Cache'} for shard in shards}, {True})
+
+        # Every file is walked exactly once, with the rules it has in a serial walk
+        expected = []
+        execute_walk(walk, lambda entry, active: expected.append((entry.path, len(active))))
+        found = [(path, 2) for path in here]
+        for shard in shards:
+            execute_walk(shard, lambda entry, active: found.append((entry.path, len(active))))
+        self.assertEqual(sorted(found), sorted(expected))
+
+    def test_pooled_scan_reports_each_category_once(self):
+        for i in range(10):
+            self._touch('Browser', 'Cache', f'{i}.tmp')
+        self._touch('Temp', 'z.log')
+        rules = compile_rules([
+            {'category': 'Cache', 'roots': ['%LOCALAPPDATA%\\Browser\\Cache']},
+            {'category': 'Temp', 'roots': ['%TEMP%']},
+            {'category': 'Empty', 'roots': ['%LOCALAPPDATA%\\Missing']},
+        ])
+        reported = []
+        results = scan_rules(rules, self.session, backend='thread', workers=2,
+                             on_category_done=lambda cat, res: reported.append((cat, len(res['files']))))
+        self.assertEqual(sorted(reported), [('Cache', 10), ('Empty', 0), ('Temp', 1)])
+        self.assertEqual(len(results['Cache']['files']), 10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+import os
+import sys
+import time
+import errno
+import shutil
+import tempfile
+import subprocess
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.quarantine import Quarantine, QuarantineUnavailable
+
+class TestQuarantine(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.quarantine = Quarantine(os.path.join(self.test_dir, 'quarantine'))
+        self.junk = os.path.join(self.test_dir, 'junk')
+        os.makedirs(os.path.join(self.junk, 'cache'))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _make(self, name, size):
+        path = os.path.join(self.junk, name)
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+        return path
+
+    def _stage_session(self, now=None):
+        paths = {
+            'Chrome Cache': [self._make(os.path.join('cache', f'{i}.bin'), 10) for i in range(3)],
+            'System Temp': [self._make('a.tmp', 5)],
+        }
+        with self.quarantine.begin(now=now) as session:
+            for cat, files in paths.items():
+                for path in files:
+                    session.stage(path, cat)
+        return session, paths
+
+    def test_stage_and_restore_by_category(self):
+        session, paths = self._stage_session()
+        self.assertEqual((session.items, session.size), (4, 35))
+        self.assertFalse(any(os.path.exists(p) for files in paths.values() for p in files))
+
+        [listed] = self.quarantine.sessions()
+        self.assertEqual(listed['id'], session.id)
+        self.assertEqual(listed['categories'], {'Chrome Cache': (3, 30), 'System Temp': (1, 5)})
+
+        self.assertEqual(self.quarantine.restore(session.id, 'Chrome Cache'), (3, 30, []))
+        self.assertTrue(all(os.path.isfile(p) for p in paths['Chrome Cache']))
+        self.assertEqual(self.quarantine.sessions()[0]['items'], 1)
+
+        self.assertEqual(self.quarantine.restore(session.id), (1, 5, []))
+        self.assertEqual(self.quarantine.sessions(), [])
+        self.assertEqual(os.listdir(self.quarantine.directory), [])
+
+    def test_restore_keeps_files_whose_path_was_taken(self):
+        session, _paths = self._stage_session()
+        self._make('a.tmp', 1)
+        count, _size, errors = self.quarantine.restore(session.id)
+        self.assertEqual(count, 3)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(self.quarantine.sessions()[0]['categories'], {'System Temp': (1, 5)})
+
+    def test_purge_old_sessions(self):
+        self._stage_session(now=time.time() - 10 * 86400)
+        self.assertEqual(self.quarantine.purge(), (1, 35))
+        self.assertEqual(self.quarantine.sessions(), [])
+        self._stage_session()
+        self.quarantine.start_purge().join(5)
+        self.assertEqual(len(self.quarantine.sessions()), 1)
+
+    def test_empty_session_leaves_nothing(self):
+        self.quarantine.begin().close()
+        self.assertEqual(os.listdir(self.quarantine.directory), [])
+
+    def test_other_mount_of_same_device_is_unavailable(self):
+        path = self._make('a.tmp', 5)
+        with self.quarantine.begin() as session:
+            with patch('core.quarantine.os.rename', side_effect=OSError(errno.EXDEV, 'Invalid cross-device link')):
+                with self.assertRaises(QuarantineUnavailable):
+                    session.stage(path, 'System Temp')
+            # The entry written ahead of the rename is taken back out
+            self.assertEqual(self.quarantine._read(session.id)[1], [])
+        self.assertTrue(os.path.isfile(path))
+
+    def test_crash_mid_session_keeps_files_restorable(self):
+        paths = [self._make(f'{i}.tmp', 10) for i in range(5)]
+        code = ("import os, sys; sys.path.insert(0, sys.argv[1])\n"
+                "from core.quarantine import Quarantine\n"
+                "session = Quarantine(sys.argv[2]).begin()\n"
+                "for path in sys.argv[3:]:\n    session.stage(path, 'Temp')\n"
+                "os._exit(1)\n")
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        subprocess.run([sys.executable, '-c', code, root, self.quarantine.directory] + paths, check=False)
+        [listed] = self.quarantine.sessions()
+        self.assertEqual(listed['items'], 5)
+        self.assertEqual(self.quarantine.purge(), (0, 0))
+        self.assertEqual(self.quarantine.restore(listed['id']), (5, 50, []))
+        self.assertTrue(all(os.path.isfile(p) for p in paths))
+
+    def test_session_without_header_is_kept(self):
+        session_dir = os.path.join(self.quarantine.directory, 'broken')
+        os.makedirs(os.path.join(session_dir, 'files'))
+        open(os.path.join(session_dir, 'manifest.jsonl'), 'w').close()
+        self.assertIsNone(self.quarantine.sessions()[0]['created'])
+        self.assertEqual(self.quarantine.purge(older_than_days=0), (0, 0))
+        self.assertTrue(os.path.isdir(session_dir))
+
+if __name__ == '__main__':
+    unittest.main()
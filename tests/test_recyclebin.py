@@ -0,0 +1,94 @@
+import unittest
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import recyclebin
+from core.recyclebin import build_info, info_path_for, parse_info
+from core.scanner import Scanner
+
+class TestRecycleBin(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.bin = os.path.join(self.test_dir, '$Recycle.Bin')
+        self.sid = os.path.join(self.bin, 'S-1-5-21-1000')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _recycle(self, ident, original, size=10, age_days=0, version=2, folder=False):
+        os.makedirs(self.sid, exist_ok=True)
+        ext = os.path.splitext(original)[1]
+        data_path = os.path.join(self.sid, f'$R{ident}{ext}')
+        if folder:
+            os.makedirs(os.path.join(data_path, 'inner'))
+            with open(os.path.join(data_path, 'inner', 'a.txt'), 'wb') as f:
+                f.write(b'x' * size)
+        else:
+            with open(data_path, 'wb') as f:
+                f.write(b'x' * size)
+        deleted = time.time() - age_days * 86400
+        with open(os.path.join(self.sid, f'$I{ident}{ext}'), 'wb') as f:
+            f.write(build_info(size, deleted, original, version=version))
+        return data_path
+
+    def test_parse_v1_and_v2_headers(self):
+        deleted = 1700000000.0
+        for version in (1, 2):
+            data = build_info(4096, deleted, 'C:\\Users\\me\\Desktop\\report.docx', version=version)
+            size, when, original = parse_info(data)
+            self.assertEqual(size, 4096)
+            self.assertAlmostEqual(when, deleted, places=3)
+            self.assertEqual(original, 'C:\\Users\\me\\Desktop\\report.docx')
+        self.assertEqual(len(build_info(1, deleted, 'C:\\a', version=1)), 544)
+
+    def test_parse_rejects_bad_headers(self):
+        data = build_info(1, 0, 'C:\\a')
+        with self.assertRaises(ValueError):
+            parse_info(data[:10])
+        with self.assertRaises(ValueError):
+            parse_info(b'\x03' + data[1:])
+        with self.assertRaises(ValueError):
+            parse_info(data[:-1])
+
+    def test_scan_fake_bin_with_age_filter(self):
+        old = self._recycle('AB12CD', 'C:\\old.txt', size=100, age_days=30, version=1)
+        folder = self._recycle('EF34GH', 'D:\\project', size=50, age_days=10, folder=True)
+        self._recycle('IJ56KL', 'C:\\fresh.txt', size=7)
+        # A header without its data is an orphan left by a crash; not listed
+        with open(os.path.join(self.sid, '$IZZZZZZ.txt'), 'wb') as f:
+            f.write(build_info(1, 0, 'C:\\gone.txt'))
+        with open(os.path.join(self.sid, 'desktop.ini'), 'wb') as f:
+            f.write(b'[.ShellClassInfo]')
+
+        result = Scanner(rules=[], recycle_roots=[self.sid]).scan_recycle_bin(min_age_days=1)
+        self.assertEqual(sorted(result['files']), sorted([old, folder]))
+        self.assertEqual(result['size'], 150)
+        self.assertEqual((result['skipped_recent'], result['skipped_recent_size']), (1, 7))
+        originals = {item['path']: item['original'] for item in result['items']}
+        self.assertEqual(originals[old], 'C:\\old.txt')
+
+        removed, freed, errors, _originals = recyclebin.purge(result['items'])
+        self.assertEqual((removed, freed, errors), (2, 150, []))
+        self.assertFalse(os.path.exists(folder))
+        self.assertFalse(os.path.exists(info_path_for(old)))
+        self.assertEqual(recyclebin.scan([self.sid])['files'], [os.path.join(self.sid, '$RIJ56KL.txt')])
+
+    def test_roots_limited_to_current_user(self):
+        mine = self._recycle('AB12CD', 'C:\\mine.txt')
+        other = os.path.join(self.bin, 'S-1-5-21-2000')
+        os.makedirs(other)
+        with open(os.path.join(other, '$RXY.txt'), 'wb') as f:
+            f.write(b'theirs')
+        with open(os.path.join(other, '$IXY.txt'), 'wb') as f:
+            f.write(build_info(6, 0, 'C:\\theirs.txt'))
+        roots = recyclebin.default_roots(drives=[self.test_dir], sid='S-1-5-21-1000')
+        self.assertEqual(roots, [self.sid])
+        self.assertEqual(recyclebin.scan(roots)['files'], [mine])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.safety import SafetyManager, split_by_risk
+
+class TestRestorePoint(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.calls = []
+        self.output = ''
+        self.release = threading.Event()
+        self.release.set()
+        self.safety = SafetyManager(
+            runner=self._runner,
+            state_path=os.path.join(self.test_dir, 'safety.json'),
+            admin=True,
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _runner(self, args, **kwargs):
+        self.release.wait(5)
+        self.calls.append(args)
+        return subprocess.CompletedProcess(args, 0, self.output, '')
+
+    def test_recent_restore_point_is_reused(self):
+        self.assertEqual(self.safety.create_restore_point(), (True, "Restore Point Created"))
+        self.assertEqual(self.safety.create_restore_point(), (True, "Recent Restore Point Reused"))
+        self.assertEqual(len(self.calls), 1)
+        self.assertTrue(self.safety.restore_point_is_fresh())
+
+    def test_expired_window_creates_again(self):
+        self.safety.create_restore_point()
+        self.assertFalse(self.safety.restore_point_is_fresh(now=time.time() + 25 * 3600))
+        self.safety.restore_point_window = 0
+        self.safety.create_restore_point()
+        self.assertEqual(len(self.calls), 2)
+
+    def test_skipped_creation_keeps_the_real_time(self):
+        skipped = ("WARNING: A new system restore point cannot be created because one has "
+                   "already been created within the past 1440 minutes.\n")
+        # The existing point is 20 h old: reused for 4 more hours, not 24
+        made = time.time() - 20 * 3600
+        self.output = skipped + f"created-at:{int(made)}\n"
+        self.assertEqual(self.safety.create_restore_point(), (True, "Recent Restore Point Reused"))
+        self.assertEqual(self.safety.last_restore_point(), int(made))
+        self.assertFalse(self.safety.restore_point_is_fresh(now=made + 25 * 3600))
+
+        # Without the time, a skip records nothing rather than "now"
+        os.remove(self.safety._state_file())
+        self.output = skipped
+        self.assertEqual(self.safety.create_restore_point(), (True, "Recent Restore Point Reused"))
+        self.assertIsNone(self.safety.last_restore_point())
+
+    def test_started_in_background(self):
+        self.release.clear()
+        future = self.safety.start_restore_point()
+        self.assertIs(self.safety.start_restore_point(), future)
+        self.assertFalse(future.done())
+        self.release.set()
+        self.assertEqual(self.safety.wait_restore_point(timeout=5), (True, "Restore Point Created"))
+        # Nothing pending any more: the next wait checks freshness itself
+        self.assertEqual(self.safety.wait_restore_point(), (True, "Recent Restore Point Reused"))
+        self.assertEqual(len(self.calls), 1)
+
+    def test_not_admin(self):
+        self.safety.admin = False
+        self.assertEqual(self.safety.create_restore_point(), (False, "Not Admin"))
+        self.assertIsNone(self.safety.last_restore_point())
+
+    def test_split_by_risk(self):
+        low, high = split_by_risk(['Windows Update', 'Chrome Cache', 'Prefetch', 'User Temp'],
+                                  {'Chrome Cache', 'User Temp'})
+        self.assertEqual(low, ['Chrome Cache', 'User Temp'])
+        self.assertEqual(high, ['Windows Update', 'Prefetch'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import os
+import sys
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.results import ResultStore, scan_summary
+
+class TestResultStore(unittest.TestCase):
+    def test_put_get_page_release(self):
+        store = ResultStore()
+        results = {'Temp': {'files': ['a', 'b', 'c'], 'items': [{'path': p, 'size': 1} for p in 'abc'], 'size': 3}}
+        handle = store.put(results)
+        self.assertIs(store.get(handle), results)
+        self.assertEqual(store.page(handle, ('Temp', 'files'), 1, 5), (['b', 'c'], 3))
+        self.assertEqual(store.page(handle, ('Logs', 'files')), ([], 0))
+        store.release(handle)
+        self.assertIsNone(store.get(handle))
+        self.assertEqual(store.page(handle, ('Temp', 'files')), ([], 0))
+        store.release(handle)
+
+    def test_handles_unique_across_threads(self):
+        store = ResultStore()
+        handles = []
+
+        def _put():
+            for i in range(500):
+                handles.append(store.put(i))
+
+        threads = [threading.Thread(target=_put) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(set(handles)), 2000)
+        self.assertEqual(len(store), 2000)
+
+    def test_scan_summary(self):
+        summary = scan_summary({'Temp': {'files': ['a', 'b'], 'size': 30, 'skipped_recent': 1}})
+        self.assertEqual(summary['Temp']['items'], 2)
+        self.assertEqual(summary['Temp']['size'], 30)
+        self.assertEqual(summary['Temp']['skipped_recent'], 1)
+        self.assertEqual(summary['Temp']['retained'], 0)
+        self.assertIsNone(summary['Temp']['error'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+import unittest
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.session import ScanSession
+from core.ages import refilter
+from core.planner import plan_walks
+from core.rules import (
+    DEFAULT_RULES, NameMatcher, Retention, apply_events, compile_rules, expand_template, scan_rules
+)
+
+class TestRules(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.env = {
+            'SystemRoot': os.path.join(self.test_dir, 'Windows'),
+            'LOCALAPPDATA': os.path.join(self.test_dir, 'Local'),
+            'TEMP': os.path.join(self.test_dir, 'Local', 'Temp'),
+        }
+
+        self.session = ScanSession(self.env, admin=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _touch(self, *parts, size=10, age_days=0):
+        path = os.path.join(self.test_dir, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+        if age_days:
+            old = time.time() - age_days * 86400
+            os.utime(path, (old, old))
+        return path
+
+    def test_expand_template(self):
+        self.assertEqual(
+            expand_template('%SystemRoot%\\Logs', self.env),
+            os.path.join(self.env['SystemRoot'], 'Logs'),
+        )
+        self.assertIsNone(expand_template('%ProgramData%\\WER', self.env))
+
+    def test_default_rules_cover_all_categories(self):
+        categories = [rule.category for rule in compile_rules(DEFAULT_RULES)]
+        self.assertEqual(len(set(categories)), 11)
+
+    def test_predicates_and_admin(self):
+        logs = self._touch('Windows', 'Logs', 'cbs.LOG')
+        self._touch('Windows', 'Logs', 'keep.txt')
+        thumb = self._touch('Local', 'Microsoft', 'Windows', 'Explorer', 'ThumbCache_32.db')
+        self._touch('Local', 'Microsoft', 'Windows', 'Explorer', 'other.db')
+        rules = compile_rules(DEFAULT_RULES)
+
+        user = scan_rules(rules, ScanSession(self.env, admin=False))
+        self.assertEqual(user['Windows Logs']['files'], [])
+        self.assertEqual(user['Thumbnail Cache']['files'], [thumb])
+
+        admin = scan_rules(rules, ScanSession(self.env, admin=True))
+        self.assertEqual(admin['Windows Logs']['files'], [logs])
+
+    def test_age_and_size_limits(self):
+        old = self._touch('Local', 'Temp', 'old.tmp', size=50, age_days=10)
+        self._touch('Local', 'Temp', 'new.tmp', size=20)
+        self._touch('Local', 'Temp', 'huge.tmp', size=500, age_days=10)
+        rules = compile_rules([{'category': 'Temp', 'roots': ['%TEMP%'], 'globs': ['*.tmp'], 'max_size': 100}])
+        result = scan_rules(rules, self.session, min_age_days=7)['Temp']
+        self.assertEqual(result['files'], [old])
+        self.assertEqual(result['size'], 50)
+        self.assertEqual(result['skipped_recent'], 1)
+        self.assertEqual(result['skipped_recent_size'], 20)
+
+    def test_shared_root_walked_once_per_rule_set(self):
+        a = self._touch('Local', 'Temp', 'a.log')
+        b = self._touch('Local', 'Temp', 'b.tmp')
+        rules = compile_rules([
+            {'category': 'Logs', 'roots': ['%TEMP%'], 'extensions': ['.log']},
+            {'category': 'Tmp', 'roots': ['%TEMP%'], 'globs': ['*.tmp']},
+            {'category': 'Tmp', 'roots': ['%LOCALAPPDATA%/Temp'], 'prefixes': ['b']},
+        ])
+        done = []
+        results = scan_rules(rules, self.session, on_category_done=lambda cat, _data: done.append(cat))
+        self.assertEqual(results['Logs']['files'], [a])
+        self.assertEqual(results['Tmp']['files'], [b])
+        self.assertEqual(sorted(done), ['Logs', 'Tmp'])
+
+    def test_throttle_paces_each_file_in_process(self):
+        class _Counter:
+            calls = 0
+
+            def pace(self, files=1, nbytes=0):
+                self.calls += files
+
+        for i in range(5):
+            self._touch('Local', 'Temp', f'{i}.tmp')
+        throttle = _Counter()
+        rules = compile_rules([{'category': 'Tmp', 'roots': ['%TEMP%'], 'globs': ['*.tmp']}])
+        # A throttle keeps even a process-backed scan on this thread
+        results = scan_rules(rules, self.session, backend='process', throttle=throttle)
+        self.assertEqual(len(results['Tmp']['files']), 5)
+        self.assertEqual(throttle.calls, 5)
+
+    def test_name_matcher_shapes(self):
+        cases = [
+            (NameMatcher(['.log']), ['a.LOG', '.log'], ['alog', 'a.log.txt', 'log']),
+            (NameMatcher(['.tmp', '.cache', '.tar.gz']), ['x.Tmp', 'y.CACHE', 'z.TAR.GZ'], ['tmp', 'x.gz', 'xtmp']),
+            (NameMatcher(prefixes=['thumbcache_']), ['ThumbCache_32.db'], ['my_thumbcache_32.db']),
+            (NameMatcher(['.log'], globs=['report*.wer']), ['a.log', 'Report1.WER'], ['a.wer']),
+            (NameMatcher(), ['anything'], []),
+        ]
+        for matcher, hits, misses in cases:
+            for name in hits:
+                self.assertTrue(matcher.match(name), name)
+            for name in misses:
+                self.assertFalse(matcher.match(name), name)
+
+        import pickle
+        restored = pickle.loads(pickle.dumps(compile_rules(DEFAULT_RULES)[2]))
+        self.assertTrue(restored.matches('APP.PF'))
+        self.assertFalse(restored.matches('app.pfx'))
+
+    def test_unknown_rule_key_rejected(self):
+        with self.assertRaises(ValueError):
+            compile_rules([{'category': 'X', 'roots': [], 'bogus': 1}])
+
+    def test_retention_selects_newest(self):
+        def _select(policy, files):
+            keeper = Retention(policy)
+            evicted = []
+            for mtime, size, name in files:
+                evicted.extend(path for path, _s, _r in keeper.offer(mtime, size, name, False))
+            return sorted(path for _m, _s, path, _r in keeper.kept()), sorted(evicted)
+
+        # (mtime, size, name) in arbitrary arrival order
+        files = [(3, 8, 'p'), (5, 5, 'n'), (1, 2, 'o'), (2, 4, 'q')]
+        self.assertEqual(_select(('keep_newest_files', 2), files), (['n', 'p'], ['o', 'q']))
+        # The file crossing the limit is kept, so at least that much stays warm
+        self.assertEqual(_select(('keep_newest_bytes', 6), files), (['n', 'p'], ['o', 'q']))
+        # Oldest-first until the rest fits: 'o' alone would fit, but only a newest prefix is kept
+        self.assertEqual(_select(('quota_bytes', 10), files), (['n'], ['o', 'p', 'q']))
+        self.assertEqual(_select(('quota_bytes', 0), files), ([], ['n', 'o', 'p', 'q']))
+
+    def test_retention_in_scans(self):
+        cache = ('Local', 'Cache')
+        oldest = self._touch(*cache, 'a', 'oldest.bin', size=300, age_days=30)
+        older = self._touch(*cache, 'b', 'older.bin', size=300, age_days=20)
+        self._touch(*cache, 'a', 'newer.bin', size=300, age_days=10)
+        self._touch(*cache, 'newest.bin', size=300, age_days=5)
+        rules = compile_rules([{'category': 'Cache', 'roots': ['%LOCALAPPDATA%\\Cache'],
+                                'keep_newest_bytes': 500}])
+        for backend in ('serial', 'thread'):
+            result = scan_rules(rules, self.session, min_age_days=1, backend=backend)['Cache']
+            self.assertEqual(sorted(result['files']), sorted([oldest, older]))
+            self.assertEqual(result['size'], 600)
+            self.assertEqual((result['retained'], result['retained_size']), (2, 600))
+
+        with self.assertRaises(ValueError):
+            compile_rules([{'category': 'X', 'roots': [], 'quota_bytes': 1, 'keep_newest_files': 1}])
+
+    def test_retention_holds_across_watcher_batches(self):
+        cache = ('Local', 'Cache')
+        old = self._touch(*cache, 'old.bin', size=100, age_days=30)
+        kept = self._touch(*cache, 'kept.bin', size=100, age_days=20)
+        rules = compile_rules([{'category': 'Cache', 'roots': ['%LOCALAPPDATA%\\Cache'],
+                                'keep_newest_files': 1}])
+        results = scan_rules(rules, self.session, min_age_days=1)
+        walks = plan_walks(rules, self.session)
+        result = results['Cache']
+        self.assertEqual((result['files'], result['retained']), ([old], 1))
+
+        first = self._touch(*cache, 'first.bin', size=100, age_days=10)
+        self.assertEqual(apply_events(results, [('created', first)], walks, 1), {'Cache'})
+        second = self._touch(*cache, 'second.bin', size=100, age_days=5)
+        apply_events(results, [('created', second)], walks, 1)
+        # Still one file kept, and the ones pushed out of the window are cleanable
+        self.assertEqual((result['retained'], result['retained_size']), (1, 100))
+        refilter(result, 1)
+        self.assertEqual(sorted(result['files']), sorted([old, kept, first]))
+
+        os.remove(second)
+        apply_events(results, [('deleted', second)], walks, 1)
+        self.assertEqual((result['retained'], result['retained_size']), (0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+from contextlib import redirect_stdout, redirect_stderr
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import cli
+from core.planner import plan_walks
+from core.rules import compile_rules, scan_rules
+from core.scanfile import ScanFileError, confine, load, read_header, revalidate, save
+from core.session import ScanSession
+
+DAY = 86400
+
+class TestScanFile(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache = os.path.join(self.test_dir, 'cache')
+        self.paths = {}
+        for age in (1, 10, 30):
+            folder = os.path.join(self.cache, f'd{age % 2}')
+            os.makedirs(folder, exist_ok=True)
+            path = os.path.join(folder, f'{age}.tmp')
+            with open(path, 'wb') as f:
+                f.write(b'x' * age)
+            old = time.time() - age * DAY - 60
+            os.utime(path, (old, old))
+            self.paths[age] = path
+        self.rules = compile_rules([{'category': 'Cache', 'roots': ['%CACHE%'], 'globs': ['*.tmp']}])
+        self.session = ScanSession({'CACHE': self.cache}, admin=False)
+        self.results = scan_rules(self.rules, self.session, min_age_days=7)
+        self.results['Recycle Bin'] = {
+            'files': ['[Recycle Bin] a.txt'], 'items': [{'path': '[Recycle Bin] a.txt', 'size': 4, 'original': 'a.txt'}],
+            'size': 4, 'skipped_recent': 0, 'skipped_recent_size': 0, 'retained': 0, 'retained_size': 0,
+        }
+        self.results['Broken'] = {'files': [], 'items': [], 'size': 0, 'error': 'denied'}
+        self.file = os.path.join(self.test_dir, 'scan.cwscan')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_round_trip(self):
+        for compress in (True, False):
+            save(self.file, self.results, 7, compress=compress)
+            loaded, header = load(self.file)
+            self.assertEqual(header['min_age_days'], 7)
+            self.assertEqual(list(loaded), ['Cache', 'Recycle Bin', 'Broken'])
+            cache = loaded['Cache']
+            self.assertEqual(sorted(cache['files']), sorted(self.results['Cache']['files']))
+            self.assertEqual((cache['size'], cache['skipped_recent'], cache['skipped_recent_size']), (40, 1, 1))
+            self.assertEqual(loaded['Recycle Bin']['items'], self.results['Recycle Bin']['items'])
+            self.assertEqual(loaded['Broken']['error'], 'denied')
+        # The age filter can still change after loading
+        self.assertEqual(len(load(self.file, min_age_days=0)[0]['Cache']['files']), 3)
+        self.assertEqual(read_header(self.file)['entries'], 4)
+
+    def test_revalidate_checks_only_files_to_clean(self):
+        save(self.file, self.results, 7)
+        cache = load(self.file)[0]['Cache']
+        os.remove(self.paths[30])
+        with open(self.paths[10], 'ab') as f:
+            f.write(b'more')
+        # Recent, so not checked: still counted as skipped
+        os.remove(self.paths[1])
+        self.assertEqual(revalidate(cache, 7), (2, 40))
+        self.assertEqual(cache['files'], [])
+        self.assertEqual(cache['skipped_recent'], 1)
+
+    def test_confine_drops_paths_the_rules_do_not_match(self):
+        bin_root = os.path.join(self.test_dir, '$Recycle.Bin', 'S-1-5-21-1000')
+        outside = os.path.join(self.test_dir, 'precious.tmp')
+        self.results['Cache']['ages'].add(0, 5, outside)
+        self.results['Cache']['ages'].add(0, 6, os.path.join(self.cache, 'd0', 'keep.doc'))
+        self.results['Recycle Bin']['items'].append({'path': os.path.join(bin_root, '$RAB.txt'), 'size': 3})
+        self.results['Recycle Bin']['items'].append({'path': os.path.join(bin_root, 'desktop.ini'), 'size': 1})
+        self.results['Other'] = {'files': [outside], 'items': [{'path': outside, 'size': 5}], 'size': 5}
+        save(self.file, self.results, 7)
+        loaded = load(self.file)[0]
+
+        dropped = confine(loaded, plan_walks(self.rules, self.session), [bin_root], 7)
+        self.assertEqual(dropped, {'Cache': (2, 11), 'Recycle Bin': (2, 5), 'Other': (1, 5)})
+        self.assertNotIn(outside, loaded['Cache']['files'])
+        self.assertEqual(loaded['Cache']['size'], 40)
+        self.assertEqual(loaded['Recycle Bin']['files'], [os.path.join(bin_root, '$RAB.txt')])
+        self.assertEqual(loaded['Other']['files'], [])
+
+    def test_not_a_scan_file(self):
+        with open(self.file, 'wb') as f:
+            f.write(b'{"files": []}')
+        with self.assertRaises(ScanFileError):
+            load(self.file)
+
+    def test_cli_save_then_clean(self):
+        out = io.StringIO()
+        with redirect_stdout(out), redirect_stderr(io.StringIO()):
+            with patch.dict(os.environ, {'TEMP': self.cache}):
+                code = cli.main(['scan', '-c', 'System Temp', '--save', self.file])
+        self.assertEqual(code, cli.EXIT_OK)
+        self.assertEqual(json.loads(out.getvalue().splitlines()[-1])['saved'], self.file)
+
+        os.remove(self.paths[30])
+        out = io.StringIO()
+        with redirect_stdout(out), redirect_stderr(io.StringIO()):
+            with patch.dict(os.environ, {'TEMP': self.cache}):
+                code = cli.main(['clean', '--load', self.file, '--dry-run'])
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(records[0]['type'], 'warning')
+        self.assertEqual(records[-1]['items'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.cleaner import Cleaner
+from core.quarantine import Quarantine
+from core.scanner import Scanner
+from core.scheduler import (IdleDetector, ScheduledJob, Scheduler, SchedulerBusy, pid_alive,
+                            read_history, read_status)
+from core.session import ScanSession
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.junk = os.path.join(self.test_dir, 'junk')
+        os.makedirs(self.junk)
+        for i in range(3):
+            with open(os.path.join(self.junk, f'{i}.tmp'), 'wb') as f:
+                f.write(b'x' * 100)
+        self.history = os.path.join(self.test_dir, 'history.jsonl')
+        self.status = os.path.join(self.test_dir, 'status.json')
+        self.now = [1_000_000.0]
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _scheduler(self, jobs):
+        session = ScanSession({'JUNK': self.junk}, admin=False)
+        rules = [{'category': 'Junk', 'roots': ['%JUNK%'], 'globs': ['*.tmp']}]
+        return Scheduler(
+            jobs=[ScheduledJob(spec) for spec in jobs],
+            history_file=self.history,
+            status_file=self.status,
+            scanner_factory=lambda throttle: Scanner(rules=rules, session=session, throttle=throttle),
+            cleaner_factory=lambda: Cleaner(quarantine=Quarantine(os.path.join(self.test_dir, 'quarantine'))),
+            clock=lambda: self.now[0],
+        )
+
+    def test_job_validation(self):
+        with self.assertRaises(ValueError):
+            ScheduledJob({'name': 'x', 'categories': ['Junk'], 'every_day': 1})
+        with self.assertRaises(ValueError):
+            ScheduledJob({'name': 'x', 'categories': []})
+
+    def test_due_runs_record_history(self):
+        scheduler = self._scheduler([
+            {'name': 'Daily', 'categories': ['Junk'], 'every_hours': 24, 'throttle': False},
+            {'name': 'Idle', 'categories': ['Junk'], 'when_idle': True},
+        ])
+        [record] = scheduler.run_pending(idle=False)
+        self.assertEqual(record['job'], 'Daily')
+        self.assertEqual(record['categories'], {'Junk': {'items': 3, 'size': 300}})
+        self.assertIsNotNone(record['quarantine_session'])
+        self.assertEqual(os.listdir(self.junk), [])
+
+        self.now[0] += 3600
+        self.assertEqual([job.name for job in scheduler.due_jobs(idle=True)], ['Idle'])
+        self.now[0] += 24 * 3600
+        self.assertEqual(len(scheduler.due_jobs(idle=False)), 1)
+
+        # A new scheduler picks the last runs up from the history file
+        self.assertEqual(read_history(self.history)[0]['size'], 300)
+        self.assertEqual(self._scheduler([{'name': 'Daily', 'categories': ['Junk']}]).last_runs(),
+                         {'Daily': 1_000_000.0})
+        status = read_status(self.status)
+        self.assertEqual(status['state'], 'waiting')
+        self.assertEqual(status['next_due']['Daily'], 1_000_000.0 + 24 * 3600)
+
+    def test_one_scheduler_at_a_time(self):
+        resident = self._scheduler([{'name': 'Daily', 'categories': ['Junk']}])
+        other = self._scheduler([{'name': 'Daily', 'categories': ['Junk']}])
+        with resident.lock:
+            with self.assertRaises(SchedulerBusy):
+                other.run_pending(idle=False)
+            with self.assertRaises(SchedulerBusy):
+                other.run_job(other.jobs[0], 'manual')
+            self.assertEqual(len(os.listdir(self.junk)), 3)
+            # The holder itself still runs its jobs
+            [record] = resident.run_pending(idle=False)
+        self.assertEqual(record['items'], 3)
+        self.assertEqual(other.run_pending(idle=False), [])
+
+    def test_pid_alive(self):
+        self.assertTrue(pid_alive(os.getpid()))
+        self.assertFalse(pid_alive(None))
+        self.assertFalse(pid_alive(2 ** 22 + 1))
+
+    def test_idle_detector(self):
+        cpu = [5.0]
+        busy = [0.0]
+        clock = [0.0]
+
+        def _busy():
+            return busy[0]
+
+        idle = IdleDetector(samples=2, cpu_source=lambda: cpu[0], busy_source=_busy, clock=lambda: clock[0])
+        results = []
+        for cpu_now, busy_ms in ((5, 100), (5, 100), (50, 100), (5, 100), (5, 3000), (5, 100), (5, 100)):
+            clock[0] += 10
+            cpu[0] = cpu_now
+            busy[0] += busy_ms
+            results.append(idle.check())
+        self.assertEqual(results, [False, True, False, False, False, False, True])
+
+if __name__ == '__main__':
+    unittest.main()
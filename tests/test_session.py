@@ -0,0 +1,71 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.planner import plan_walks
+from core.rules import compile_rules
+from core.scanner import Scanner
+from core.session import ScanSession
+from core.utils import is_admin
+
+class TestScanSession(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.windows = os.path.join(self.test_dir, 'Windows')
+        os.makedirs(os.path.join(self.windows, 'Temp'))
+        os.makedirs(os.path.join(self.windows, 'Prefetch'))
+        with open(os.path.join(self.windows, 'Temp', 'junk.tmp'), 'w') as f:
+            f.write("junk")
+        with open(os.path.join(self.windows, 'Prefetch', 'APP.pf'), 'w') as f:
+            f.write("pf")
+        self.env = {'SystemRoot': self.windows, 'TEMP': os.path.join(self.windows, 'Temp')}
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_is_admin_is_cached(self):
+        self.assertIs(is_admin(), is_admin())
+        self.assertEqual(is_admin.cache_info().currsize, 1)
+
+    def test_known_roots_resolved_once(self):
+        session = ScanSession(self.env, admin=False)
+        self.assertEqual(session.roots, self.env)
+        self.assertEqual(session.expand('%SystemRoot%\\Temp'), os.path.join(self.windows, 'Temp'))
+        self.assertIn('%SystemRoot%\\Temp', session._expanded)
+
+    def test_roots_found_whatever_the_case(self):
+        # A copy of os.environ on Windows has every name upper-cased
+        session = ScanSession({'SYSTEMROOT': self.windows, 'temp': self.env['TEMP']}, admin=False)
+        self.assertEqual(session.roots, self.env)
+        self.assertEqual(session.expand('%SystemRoot%\\Temp'), os.path.join(self.windows, 'Temp'))
+        self.assertEqual(session.expand('%TEMP%'), self.env['TEMP'])
+
+    def test_admin_and_user_layouts(self):
+        user = Scanner(session=ScanSession(self.env, admin=False))
+        admin = Scanner(session=ScanSession(self.env, admin=True))
+        self.assertEqual(user.scan_prefetch()['files'], [])
+        self.assertEqual(len(admin.scan_prefetch()['files']), 1)
+
+    def test_same_real_path_is_walked_once(self):
+        # As admin, TEMP and %SystemRoot%\Temp are the same folder here
+        scanner = Scanner(session=ScanSession(self.env, admin=True))
+        result = scanner.scan_temp()
+        self.assertEqual(len(result['files']), 1)
+
+    @unittest.skipUnless(hasattr(os, 'symlink'), "symlinks not supported")
+    def test_linked_root_dedupes(self):
+        link = os.path.join(self.test_dir, 'TempLink')
+        try:
+            os.symlink(os.path.join(self.windows, 'Temp'), link, target_is_directory=True)
+        except OSError:
+            self.skipTest("cannot create symlinks")
+        session = ScanSession(dict(self.env, TEMP=link), admin=True)
+        rules = compile_rules([{'category': 'System Temp', 'roots': ['%TEMP%', '%SystemRoot%\\Temp']}])
+        self.assertEqual(len(plan_walks(rules, session)), 1)
+
+if __name__ == '__main__':
+    unittest.main()
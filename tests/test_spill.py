@@ -0,0 +1,41 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.spill import SpillLog
+
+class TestSpillLog(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.log = SpillLog(os.path.join(self.test_dir, 'logs', 'activity.log'))
+
+    def tearDown(self):
+        self.log.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_pages_messages_and_errors(self):
+        self.log.append("--- Cleaning ---")
+        for i in range(1200):
+            self.log.append(f"- Failed to delete C:\\locked\\{i}.tmp", error=True)
+        self.log.append("Done!\nFreed 0 B")
+        self.assertEqual(len(self.log), 1202)
+        self.assertEqual(self.log.error_count, 1200)
+        page = self.log.page(1000, 500, errors_only=True)
+        self.assertEqual(len(page), 200)
+        self.assertEqual(page[0], "- Failed to delete C:\\locked\\1000.tmp")
+        self.assertEqual(self.log.page(1201, 10), ["Done!\nFreed 0 B"])
+        self.assertEqual(self.log.page(5000), [])
+
+    def test_reset(self):
+        self.log.append("é", error=True)
+        self.log.reset()
+        self.log.append("fresh")
+        self.assertEqual(self.log.page(), ["fresh"])
+        self.assertEqual(self.log.error_count, 0)
+
+if __name__ == '__main__':
+    unittest.main()
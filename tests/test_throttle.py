@@ -0,0 +1,74 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.throttle import MIN_FACTOR, Throttle, TokenBucket
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+class TestTokenBucket(unittest.TestCase):
+    def test_rate_holds_over_time(self):
+        clock = FakeClock()
+        bucket = TokenBucket(100, clock=clock, sleep=clock.sleep)
+        for _ in range(1100):
+            bucket.take()
+        # The first 100 are the burst; the other 1000 take 10 seconds
+        self.assertAlmostEqual(clock.now, 10.0)
+
+    def test_overdraw_is_slept_off(self):
+        clock = FakeClock()
+        bucket = TokenBucket(1000, clock=clock, sleep=clock.sleep)
+        self.assertAlmostEqual(bucket.take(3000), 2.0)
+        self.assertEqual(TokenBucket(0).take(10 ** 9), 0.0)
+
+class TestThrottle(unittest.TestCase):
+    def _throttle(self, busy_per_sample):
+        clock = FakeClock()
+        busy = [0.0]
+
+        def _busy():
+            busy[0] += busy_per_sample
+            return busy[0]
+
+        throttle = Throttle(files_per_sec=1000, bytes_per_sec=10 ** 6, busy_threshold=0.5,
+                            sample_interval=0.5, busy_source=_busy, clock=clock, sleep=clock.sleep)
+        return throttle, clock
+
+    def test_backs_off_while_disk_busy(self):
+        # 450 ms of busy time per sample over >= 0.5 s of wall time is ~90% busy
+        throttle, clock = self._throttle(450)
+        for _ in range(20):
+            clock.now += 0.5
+            throttle.pace()
+        self.assertGreater(throttle.busy, 0.5)
+        self.assertEqual(throttle.factor, MIN_FACTOR)
+        self.assertAlmostEqual(throttle.files.rate, 1000 * MIN_FACTOR)
+
+    def test_quiet_disk_keeps_full_rate(self):
+        throttle, clock = self._throttle(10)
+        for _ in range(20):
+            clock.now += 0.5
+            throttle.pace(1, 4096)
+        self.assertEqual(throttle.factor, 1.0)
+        self.assertEqual(throttle.slept, 0.0)
+
+    def test_without_busy_counters(self):
+        clock = FakeClock()
+        throttle = Throttle(files_per_sec=10, busy_source=lambda: None, clock=clock, sleep=clock.sleep)
+        for _ in range(30):
+            throttle.pace()
+        self.assertEqual(throttle.factor, 1.0)
+        self.assertAlmostEqual(throttle.slept, 2.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,220 @@
+import unittest
+import os
+import sys
+import time
+import errno
+import shutil
+import tempfile
+import threading
+import unittest.mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.diskindex import DiskIndex
+from core.planner import plan_walks
+from core.ages import refilter
+from core.rules import apply_events, compile_rules, scan_rules
+from core.session import ScanSession
+from core.watcher import (
+    CREATED, DELETED, DELETED_DIR, MODIFIED, OVERFLOW, FileWatcher, InotifyBackend, PollingBackend, coalesce, dirty_dirs
+)
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = os.path.realpath(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, *parts, size=10, age_days=0):
+        path = os.path.join(self.test_dir, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+        if age_days:
+            old = time.time() - age_days * 86400
+            os.utime(path, (old, old))
+        return path
+
+    def test_coalesce(self):
+        pending = {}
+        coalesce(pending, CREATED, 'a')
+        coalesce(pending, MODIFIED, 'a')
+        self.assertEqual(pending, {'a': CREATED})
+        coalesce(pending, DELETED, 'a')
+        self.assertEqual(pending, {})
+        coalesce(pending, DELETED, 'b')
+        coalesce(pending, CREATED, 'b')
+        self.assertEqual(pending, {'b': MODIFIED})
+
+    def test_polling_backend(self):
+        kept = self._write('cache', 'kept.bin')
+        gone = self._write('cache', 'gone.bin')
+        backend = PollingBackend([self.test_dir], interval=0)
+        self._write('cache', 'kept.bin', size=20)
+        os.remove(gone)
+        new = self._write('cache', 'sub', 'new.bin')
+        events = set(backend.read(0))
+        self.assertEqual(events, {(MODIFIED, kept), (DELETED, gone), (CREATED, new)})
+        self.assertEqual(backend.read(0), [])
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), "inotify is Linux only")
+    def test_inotify_backend_follows_new_folders(self):
+        backend = InotifyBackend([self.test_dir])
+        try:
+            new = self._write('fresh', 'deep', 'a.bin')
+            seen = set()
+            deadline = time.time() + 2
+            while (CREATED, new) not in seen and time.time() < deadline:
+                seen.update(backend.read(0.1))
+            self.assertIn((CREATED, new), seen)
+            os.remove(new)
+            deadline = time.time() + 2
+            while (DELETED, new) not in seen and time.time() < deadline:
+                seen.update(backend.read(0.1))
+            self.assertIn((DELETED, new), seen)
+        finally:
+            backend.close()
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), "inotify is Linux only")
+    def test_inotify_folder_moved_out(self):
+        os.makedirs(os.path.join(self.test_dir, 'Temp', 'sub', 'deep'))
+        outside = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, outside)
+        backend = InotifyBackend([os.path.join(self.test_dir, 'Temp')])
+        try:
+            sub = os.path.join(self.test_dir, 'Temp', 'sub')
+            os.rename(sub, os.path.join(outside, 'sub'))
+            seen = []
+            deadline = time.time() + 2
+            while (DELETED_DIR, sub) not in seen and time.time() < deadline:
+                seen.extend(backend.read(0.1))
+            self.assertIn((DELETED_DIR, sub), seen)
+            self.assertEqual([path for path in backend._paths.values() if path.startswith(sub)], [])
+            # Writes in the moved folder are not reported under its old path
+            with open(os.path.join(outside, 'sub', 'deep', 'new.tmp'), 'wb') as f:
+                f.write(b'x')
+            self.assertEqual(backend.read(0.2), [])
+        finally:
+            backend.close()
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), "inotify is Linux only")
+    def test_inotify_watch_limit_reports_overflow(self):
+        os.makedirs(os.path.join(self.test_dir, 'a', 'b'))
+        backend = InotifyBackend([self.test_dir])
+        libc = backend._libc
+
+        class _OutOfWatches:
+            def inotify_add_watch(self, *_args):
+                return -1
+
+        try:
+            backend._libc, backend._get_errno = _OutOfWatches(), lambda: errno.ENOSPC
+            backend._watch_tree(os.path.join(self.test_dir, 'a'), report=True)
+            self.assertEqual(backend.read(0), [(OVERFLOW, self.test_dir)])
+        finally:
+            backend._libc = libc
+            backend.close()
+
+    def test_watcher_builds_backend_on_its_thread(self):
+        built = []
+
+        class _Backend(PollingBackend):
+            def __init__(self, roots):
+                built.append(threading.current_thread())
+                super().__init__(roots, interval=0.05)
+
+        with unittest.mock.patch('core.watcher.make_backend', lambda roots, polling: _Backend(roots)):
+            watcher = FileWatcher([self.test_dir], lambda batch: None).start()
+            try:
+                deadline = time.time() + 2
+                while not built and time.time() < deadline:
+                    time.sleep(0.01)
+            finally:
+                watcher.stop()
+        self.assertEqual(len(built), 1)
+        self.assertIsNot(built[0], threading.current_thread())
+
+    def test_watcher_debounces_bursts(self):
+        batches = []
+        done = threading.Event()
+
+        def _on_batch(batch):
+            batches.append(batch)
+            done.set()
+
+        backend = PollingBackend([self.test_dir], interval=0.05)
+        watcher = FileWatcher([self.test_dir], _on_batch, debounce=0.3, backend=backend).start()
+        try:
+            for i in range(20):
+                self._write(f'f{i}.tmp')
+            self.assertTrue(done.wait(5))
+        finally:
+            watcher.stop()
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(len(batches[0]), 20)
+
+    def test_apply_events_to_scan_results(self):
+        env = {'TEMP': os.path.join(self.test_dir, 'Temp')}
+        rules = compile_rules([{'category': 'System Temp', 'roots': ['%TEMP%']},
+                               {'category': 'Logs', 'roots': ['%TEMP%\\logs'], 'extensions': ['.log']}])
+        session = ScanSession(env, admin=False)
+        old = self._write('Temp', 'old.tmp', size=100, age_days=10)
+        grown = self._write('Temp', 'logs', 'a.log', size=50, age_days=10)
+        results = scan_rules(rules, session, min_age_days=1)
+        self.assertEqual(results['System Temp']['size'], 150)
+        self.assertEqual(results['Logs']['size'], 50)
+
+        walks = plan_walks(rules, session)
+        os.remove(old)
+        self._write('Temp', 'logs', 'a.log', size=80, age_days=10)
+        created = self._write('Temp', 'logs', 'b.log', size=5, age_days=10)
+        events = [(DELETED, old), (MODIFIED, grown), (CREATED, created),
+                  (CREATED, self._write('Temp', 'recent.tmp', size=7))]
+        changed = apply_events(results, events, walks, min_age_days=1)
+
+        self.assertEqual(changed, {'System Temp', 'Logs'})
+        # Indexed categories only keep counts current; their lists are rebuilt on demand
+        for data in results.values():
+            refilter(data, 1)
+        self.assertEqual(sorted(results['Logs']['files']), [grown, created])
+        self.assertEqual(results['Logs']['size'], 85)
+        self.assertEqual(sorted(results['System Temp']['files']), [grown, created])
+        self.assertEqual(results['System Temp']['size'], 85)
+        self.assertEqual(results['System Temp']['skipped_recent'], 1)
+        self.assertEqual(results['System Temp']['skipped_recent_size'], 7)
+
+    def test_apply_events_for_a_folder_moved_away(self):
+        env = {'TEMP': os.path.join(self.test_dir, 'Temp')}
+        rules = compile_rules([{'category': 'System Temp', 'roots': ['%TEMP%']}])
+        session = ScanSession(env, admin=False)
+        kept = self._write('Temp', 'keep.tmp', size=10, age_days=10)
+        for i in range(3):
+            self._write('Temp', 'sub', 'deep', f'{i}.tmp', size=100, age_days=10)
+        self._write('Temp', 'subway.tmp', size=5, age_days=10)
+        results = scan_rules(rules, session, min_age_days=1)
+        self.assertEqual(results['System Temp']['size'], 315)
+
+        sub = os.path.join(self.test_dir, 'Temp', 'sub')
+        changed = apply_events(results, [(DELETED_DIR, sub)], plan_walks(rules, session), min_age_days=1)
+        self.assertEqual(changed, {'System Temp'})
+        refilter(results['System Temp'], 1)
+        self.assertEqual(results['System Temp']['size'], 15)
+        self.assertEqual(sorted(results['System Temp']['files']),
+                         [kept, os.path.join(self.test_dir, 'Temp', 'subway.tmp')])
+
+    def test_index_refresh_uses_dirty_folders(self):
+        path = self._write('data', 'big.bin', size=100)
+        index = DiskIndex.build(self.test_dir)
+        folder_mtime = os.stat(os.path.dirname(path)).st_mtime
+        # Rewrite in place without changing the folder's mtime
+        with open(path, 'r+b') as f:
+            f.write(b'y' * 300)
+        os.utime(os.path.dirname(path), (folder_mtime, folder_mtime))
+
+        self.assertEqual(index.refresh().total_size, 100)
+        refreshed = index.refresh(dirty=dirty_dirs([(MODIFIED, path)]))
+        self.assertEqual(refreshed.total_size, 300)
+
+if __name__ == '__main__':
+    unittest.main()